@@ -0,0 +1,77 @@
+/**
+ * Golden corpus exporter for the differential fuzzer in validate_quiz_scoring.py
+ *
+ * Reads fuzzer input NDJSON on stdin (a header line, then one
+ * [digits, legacyV] row per answer map) and writes each row back with the
+ * TS scorer's output appended as a third element, in the header's field order.
+ * Output is written line by line, so the fuzzer can also drive this as its
+ * --oracle while shrinking a divergence.
+ *
+ * Run from app/ directory:
+ *   python3 scripts/validate_quiz_scoring.py --fuzz 1000000 --seed 1 --fuzz-inputs -o /tmp/fuzz-inputs.jsonl
+ *   npx tsx scripts/export-golden-corpus.ts < /tmp/fuzz-inputs.jsonl > /tmp/golden.jsonl
+ *   python3 scripts/validate_quiz_scoring.py --golden /tmp/golden.jsonl -o /tmp/divergences.jsonl \
+ *     --oracle "npx tsx scripts/export-golden-corpus.ts"
+ */
+
+import { createInterface } from "node:readline";
+import { scoreQuizFromAnswers } from "../src/lib/quiz/server/score-quiz";
+import { sanitizeScoresForDb } from "../src/lib/quiz/utils/answer-transform";
+import type { DBAnswerEntry, DBAnswerMap } from "../src/lib/quiz/types";
+
+interface Header {
+  format: number;
+  columns: string[];
+  scenarioQuestion: string;
+  scenarioKeys: (string | null)[];
+  fields: string[];
+}
+
+type InputRow = [digits: string, legacyV: number | null];
+
+/** Rebuild the DBAnswerMap a row of digits stands for: 0 = unanswered, scenario column = key code */
+function toAnswers(header: Header, [digits, legacyV]: InputRow): DBAnswerMap {
+  const answers: DBAnswerMap = {};
+  header.columns.forEach((questionId, i) => {
+    const code = digits.charCodeAt(i) - 48;
+    if (questionId === header.scenarioQuestion) {
+      const entry: DBAnswerEntry = { t: 0 };
+      const key = header.scenarioKeys[code];
+      if (key) entry.k = key;
+      // Older rows stored v on scenario entries too
+      if (legacyV !== null) entry.v = legacyV;
+      if (entry.k !== undefined || entry.v !== undefined) answers[questionId] = entry;
+    } else if (code > 0) {
+      answers[questionId] = { v: code, t: 0 };
+    }
+  });
+  return answers;
+}
+
+function lookup(value: unknown, path: string): unknown {
+  return path.split(".").reduce((node, key) => (node as Record<string, unknown>)[key], value);
+}
+
+function score(header: Header, row: InputRow): unknown[] {
+  const scored = scoreQuizFromAnswers(toAnswers(header, row));
+  const db = sanitizeScoresForDb(scored.results);
+  return header.fields.map((field) => {
+    if (field === "archetype") return scored.archetypeSlug;
+    if (field === "isBalanced") return scored.isBalanced;
+    return lookup(db, field);
+  });
+}
+
+let header: Header | null = null;
+const lines = createInterface({ input: process.stdin, crlfDelay: Infinity });
+
+lines.on("line", (line) => {
+  if (!line) return;
+  if (header === null) {
+    header = JSON.parse(line) as Header;
+    process.stdout.write(line + "\n");
+    return;
+  }
+  const row = JSON.parse(line) as InputRow;
+  process.stdout.write(JSON.stringify([row[0], row[1], score(header, row)]) + "\n");
+});
@@ -0,0 +1,5 @@
+"""
+Quiz scoring validation: a Python port of the app's quiz scoring and the tools built on it.
+
+validate_quiz_scoring.py is the command-line entry point; the suites live in quiz_scoring.tests.
+"""
@@ -0,0 +1,609 @@
+"""Population aggregates, single-answer sensitivity and stage-memoized parameter sweeps."""
+
+import json
+import math
+import multiprocessing
+import os
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from itertools import accumulate, compress, product
+from operator import add, ne
+from typing import Dict, IO, Iterable, Iterator, List, Optional, Sequence, Tuple, Any
+
+from .core import (
+    ARCHETYPE_SLUGS, ATTACHMENT_PRIORITY, BALANCED_THRESHOLD, COMMUNICATION_PRIORITY, EPSILON, MAX_ENTROPY_4,
+    SCENARIO_BONUS, axis_summary, compute_archetype_batch, entropy, _winner_from_axes, _winning_cell,
+)
+from .batch import MISSING, PLAN, RECORD_WIDTH, SCENARIO_COLUMN, SCENARIO_KEYS, ScoringPlan, _as_blob, _score_blob
+from .rescore import (
+    RESCORE_CHUNK_SIZE, RESCORE_STAGES, SHARDS_PER_WORKER, _WORKER_STATE, RescoreChunk, byte_shards, _decode_stage,
+    _init_worker, _iter_range_lines, _parse_stage, _read_chunks,
+)
+from .corpus import Corpus
+from .files import open_input
+
+def batch_dimensions(batch: Dict[str, Any]) -> Iterator[Tuple[str, array]]:
+    """(plan dimension name, score array) for every dimension of a score_batch result."""
+    for d, scores in batch['attachment']['scores'].items():
+        yield f'attachment.{d}', scores
+    for c, scores in batch['communication']['scores'].items():
+        yield f'communication.{c}', scores
+    yield 'confidence', batch['confidence']
+    yield 'emotional', batch['emotional']
+    yield 'intimacy.comfort', batch['intimacy']['comfort']
+    yield 'intimacy.boundaries', batch['intimacy']['boundaries']
+    love = batch['loveLanguages']
+    for l, scores in love['scores'].items():
+        yield f'love.{l}', scores
+    for l, split in love['giveReceive'].items():
+        yield f'give.{l}', split['give']
+        yield f'receive.{l}', split['receive']
+
+class PopulationStats:
+    """Constant-memory accumulator over scored rows; merge() combines shards exactly.
+
+    Tracks archetype frequency over all ARCHETYPE_SLUGS, a 0-100 histogram per
+    plan dimension, archetype confidence as a whole-percent histogram, the
+    isBalanced split and how often each love language lands at each rank.
+    """
+
+    def __init__(self, plan: ScoringPlan = PLAN):
+        self.rows = 0
+        self.errors = 0
+        self.archetypes = {slug: 0 for slug in ARCHETYPE_SLUGS}
+        self.histograms = {name: [0] * 101 for name in plan.dimensions}
+        self.confidence = [0] * 101
+        self.balanced = 0
+        self.love_ranks = {l: [0] * len(plan.love_order) for l in plan.love_order}
+
+    def add_batch(self, batch: Dict[str, Any], archetypes: Dict[str, Any]) -> None:
+        """Count every row of a score_batch result and its compute_archetype_batch result."""
+        self.rows += len(archetypes['slug'])
+        for slug, n in Counter(archetypes['slug']).items():
+            self.archetypes[slug] += n
+        for name, scores in batch_dimensions(batch):
+            histogram = self.histograms[name]
+            for score, n in Counter(scores).items():
+                histogram[score] += n
+        for pct, n in Counter(round(c * 100) for c in archetypes['confidence']).items():
+            self.confidence[pct] += n
+        self.balanced += archetypes['isBalanced'].count(True)
+        for ranked, n in Counter(batch['loveLanguages']['ranked']).items():
+            for rank, lang in enumerate(ranked):
+                self.love_ranks[lang][rank] += n
+
+    def merge(self, other: 'PopulationStats') -> 'PopulationStats':
+        """Add another accumulator's counts into this one."""
+        self.rows += other.rows
+        self.errors += other.errors
+        for slug, n in other.archetypes.items():
+            self.archetypes[slug] += n
+        for table, theirs in ((self.histograms, other.histograms), (self.love_ranks, other.love_ranks)):
+            for key, counts in theirs.items():
+                table[key] = list(map(add, table[key], counts))
+        self.confidence = list(map(add, self.confidence, other.confidence))
+        self.balanced += other.balanced
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON report; from_dict(to_dict()) round-trips, so saved reports stay mergeable."""
+        shares = [n / self.rows for n in self.archetypes.values()] if self.rows else []
+        return {
+            'rows': self.rows,
+            'errors': self.errors,
+            'archetypes': dict(self.archetypes),
+            'archetypeShare': dict(zip(self.archetypes, shares)),
+            # 1.0 = every archetype equally common
+            'archetypeEvenness': entropy(shares) / math.log2(len(ARCHETYPE_SLUGS)) if shares else 0.0,
+            'histograms': {name: list(counts) for name, counts in self.histograms.items()},
+            'confidencePercent': list(self.confidence),
+            'balanced': {'true': self.balanced, 'false': self.rows - self.balanced},
+            'loveRanks': {l: list(counts) for l, counts in self.love_ranks.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, report: Dict[str, Any]) -> 'PopulationStats':
+        stats = cls()
+        stats.rows = report['rows']
+        stats.errors = report['errors']
+        stats.archetypes.update(report['archetypes'])
+        stats.histograms.update((name, list(counts)) for name, counts in report['histograms'].items())
+        stats.confidence = list(report['confidencePercent'])
+        stats.balanced = report['balanced']['true']
+        stats.love_ranks.update((l, list(counts)) for l, counts in report['loveRanks'].items())
+        return stats
+
+def aggregate_stream(lines: Iterable[bytes], chunk_size: int = RESCORE_CHUNK_SIZE) -> PopulationStats:
+    """One pass over a JSONL export through the rescore stages, accumulating instead of serializing."""
+    stats = PopulationStats()
+    chunks: Iterator[RescoreChunk] = _read_chunks(lines, chunk_size)
+    for stage in RESCORE_STAGES[:-1]:
+        chunks = map(stage, chunks)
+    for chunk in chunks:
+        if chunk.errors:
+            # Error rows were scored as empty records; drop them before counting
+            keep = bytes(i not in chunk.errors for i in range(len(chunk.rows)))
+            chunk.batch = _select_rows(chunk.batch, keep)
+            chunk.archetypes = _select_rows(chunk.archetypes, keep)
+            stats.errors += len(chunk.errors)
+        stats.add_batch(chunk.batch, chunk.archetypes)
+    return stats
+
+def _select_rows(tree: Any, keep: bytes) -> Any:
+    """Filter every per-row sequence in a batch result by a 0/1 mask."""
+    if isinstance(tree, dict):
+        return {key: _select_rows(value, keep) for key, value in tree.items()}
+    selected = [value for value, flag in zip(tree, keep) if flag]
+    return array(tree.typecode, selected) if isinstance(tree, array) else selected
+
+def aggregate_corpus(corpus: Corpus, start: int = 0, end: Optional[int] = None,
+                     chunk_size: int = RESCORE_CHUNK_SIZE) -> PopulationStats:
+    """Accumulate rows [start, end) of a columnar corpus."""
+    stats = PopulationStats()
+    end = len(corpus) if end is None else end
+    for lo in range(start, end, chunk_size):
+        hi = min(lo + chunk_size, end)
+        matrix, scenario = corpus.valid(lo, hi)
+        batch = _score_blob(matrix, corpus.width, scenario, PLAN)
+        stats.errors += hi - lo - len(scenario)
+        stats.add_batch(batch, compute_archetype_batch(batch['attachment']['scores'],
+                                                       batch['communication']['scores']))
+    return stats
+
+def _aggregate_task(task: Tuple[str, int, int]) -> PopulationStats:
+    path, start, end = task
+    chunk_size = _WORKER_STATE['chunk_size']
+    if os.path.isdir(path):
+        with Corpus(path) as corpus:
+            return aggregate_corpus(corpus, start, end, chunk_size)
+    with open(path, 'rb') as f:
+        return aggregate_stream(_iter_range_lines(f, start, end), chunk_size)
+
+def aggregate_paths(paths: Sequence[str], workers: int = 1, chunk_size: int = RESCORE_CHUNK_SIZE) -> PopulationStats:
+    """Aggregate exports, corpus directories or stdin ('-') into one merged accumulator.
+
+    With workers > 1, files are split into newline-aligned byte ranges and
+    corpora into row ranges; each shard returns its own accumulator and the
+    shards are merged.
+    """
+    total = PopulationStats()
+    if workers <= 1:
+        for path in paths:
+            if os.path.isdir(path):
+                with Corpus(path) as corpus:
+                    total.merge(aggregate_corpus(corpus, chunk_size=chunk_size))
+            else:
+                with open_input(path) as infile:
+                    total.merge(aggregate_stream(infile, chunk_size))
+        return total
+
+    tasks = []
+    for path in paths:
+        if path == '-':
+            raise ValueError('parallel aggregation needs input files, not stdin')
+        if os.path.isdir(path):
+            with Corpus(path) as corpus:
+                rows = len(corpus)
+            step = max(chunk_size, -(-rows // (workers * SHARDS_PER_WORKER)))
+            tasks += [(path, lo, min(lo + step, rows)) for lo in range(0, rows, step)]
+        else:
+            tasks += [(path, start, end) for start, end in byte_shards(path, workers * SHARDS_PER_WORKER)]
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(chunk_size, False)) as pool:
+        for shard in pool.imap_unordered(_aggregate_task, tasks):
+            total.merge(shard)
+    return total
+
+# =============================================================================
+# SENSITIVITY ANALYSIS (single-answer flips)
+# =============================================================================
+
+# margin value for rows that no single-answer change can flip
+STABLE_MARGIN = 0
+# Adjusted value -> Likert deltas that stay within 1-5
+LIKERT_DELTAS = {a: tuple(d for d in range(1 - a, 6 - a) if d) for a in range(1, 6)}
+
+class SensitivityAnalyzer:
+    """Counts, per row, the single-answer changes that flip the archetype or a primary style.
+
+    Neighbors are every other value of each answered Likert question plus
+    every other scenario choice (including none). Only attachment and
+    communication questions can flip anything, and a change only moves one
+    dimension key by the Likert delta, so each dimension's neighbors are
+    grouped by resulting score and evaluated once per group instead of
+    rescoring ~200 variants. Outcomes are memoized across calls.
+    """
+
+    def __init__(self, plan: ScoringPlan = PLAN):
+        self.plan = plan
+        self.dims = ([plan.dimensions[f'attachment.{d}'] for d in plan.attachment_order]
+                     + [plan.dimensions[f'communication.{s}'] for s in plan.communication_order])
+        self.n_att = len(plan.attachment_order)
+        self.att_priority = [plan.attachment_order.index(d) for d in ATTACHMENT_PRIORITY]
+        self.comm_priority = [plan.communication_order.index(s) for s in COMMUNICATION_PRIORITY]
+        self.bonus = [plan.scenario_bonus_keys[s] for s in plan.communication_order]
+        self.codes = [MISSING] + sorted(SCENARIO_KEYS)
+        self._att_axes: Dict[Tuple[int, ...], Tuple[int, float, float, List[float]]] = {}
+        self._comm_axes: Dict[Tuple[int, ...], Tuple[int, float, float, List[float]]] = {}
+
+    @staticmethod
+    def _axis(memo: Dict[Tuple[int, ...], Tuple[int, float, float, List[float]]], scores: Tuple[int, ...],
+              priority: List[int]) -> Tuple[int, float, float, List[float]]:
+        entry = memo.get(scores)
+        if entry is None:
+            entry = memo[scores] = axis_summary([scores[i] for i in priority])
+        return entry
+
+    def outcome(self, att: Tuple[int, ...], comm: Tuple[int, ...]) -> Tuple[str, int, int]:
+        """(archetype slug, attachment primary index, communication primary index) for plan-order scores."""
+        winner = _winner_from_axes(self._axis(self._att_axes, att, self.att_priority),
+                                   self._axis(self._comm_axes, comm, self.comm_priority))
+        return ARCHETYPE_SLUGS[winner], att.index(max(att)), comm.index(max(comm))
+
+    def analyze(self, blob: bytes, width: int, scenario: Optional[bytes]) -> Dict[str, Any]:
+        """Per-row flip counts and margin for a row-major answer matrix (see _score_blob)."""
+        plan = self.plan
+        likert = len(plan.columns)
+        table = plan.score_table
+        unit = plan.count_unit
+        n_att = self.n_att
+        rows = len(blob) // width
+        cols = [blob[j::width].translate(plan.contributions[j]) for dim in self.dims for j in dim]
+        spans = []
+        start = 0
+        for dim in self.dims:
+            spans.append((start, start + len(dim)))
+            start += len(dim)
+        codes = scenario if scenario is not None else bytes(rows)
+
+        result: Dict[str, Any] = {
+            'slug': [], 'neighbors': array('H'), 'archetypeFlips': array('H'),
+            'attachmentFlips': array('H'), 'communicationFlips': array('H'), 'margin': array('B'),
+        }
+        for r, contrib in enumerate(zip(*cols)):
+            code = codes[r]
+            keys = [sum(contrib[a:b]) for a, b in spans]
+            bonus = [0] * n_att + [b[code] for b in self.bonus]
+            scores = [table[k + b] for k, b in zip(keys, bonus)]
+            base_slug, base_att, base_comm = self.outcome(tuple(scores[:n_att]), tuple(scores[n_att:]))
+            # (variant scores, neighbors producing them, smallest Likert step among those)
+            variants: List[Tuple[List[int], int, int]] = []
+            for d, (a, b) in enumerate(spans):
+                # Resulting score -> (neighbors reaching it, smallest Likert step among them)
+                groups: Dict[int, List[int]] = {}
+                offset = keys[d] + bonus[d]
+                for c in contrib[a:b]:
+                    if not c:
+                        continue
+                    for delta in LIKERT_DELTAS[c - unit]:
+                        group = groups.setdefault(table[offset + delta], [0, 4])
+                        group[0] += 1
+                        group[1] = min(group[1], abs(delta))
+                current = scores[d]
+                for score, (n, step) in groups.items():
+                    if score != current:
+                        variant = scores[:]
+                        variant[d] = score
+                        variants.append((variant, n, step))
+            for alt in self.codes:
+                if alt != code:
+                    variant = scores[:n_att] + [table[k + b[alt]] for k, b in zip(keys[n_att:], self.bonus)]
+                    variants.append((variant, 1, 1))
+
+            flips = att_flips = comm_flips = 0
+            margin = STABLE_MARGIN
+            for variant, n, step in variants:
+                slug, att_primary, comm_primary = self.outcome(tuple(variant[:n_att]), tuple(variant[n_att:]))
+                if slug != base_slug:
+                    flips += n
+                    if margin == STABLE_MARGIN or step < margin:
+                        margin = step
+                if att_primary != base_att:
+                    att_flips += n
+                if comm_primary != base_comm:
+                    comm_flips += n
+
+            answered = likert - blob[r * width:r * width + likert].count(MISSING)
+            result['slug'].append(base_slug)
+            result['neighbors'].append(4 * answered + len(self.codes) - 1)
+            result['archetypeFlips'].append(flips)
+            result['attachmentFlips'].append(att_flips)
+            result['communicationFlips'].append(comm_flips)
+            result['margin'].append(margin)
+        return result
+
+    def analyze_packed(self, records: Any) -> Dict[str, Any]:
+        """analyze() for compact records (Likert columns, then the scenario code)."""
+        width = len(self.plan.columns) + 1
+        blob = _as_blob(records, width)
+        return self.analyze(blob, width, blob[width - 1::width])
+
+class FragilityStats:
+    """Mergeable corpus-level histograms over SensitivityAnalyzer results."""
+
+    def __init__(self):
+        self.rows = 0
+        self.errors = 0
+        self.neighbors = 0
+        self.flips = 0
+        self.margin = [0] * 5
+        self.archetype_flips: Dict[int, int] = {}
+        self.primary_flips: Dict[int, int] = {}
+        self.by_slug = {slug: [0, 0] for slug in ARCHETYPE_SLUGS}
+
+    def add(self, result: Dict[str, Any]) -> None:
+        self.rows += len(result['slug'])
+        self.neighbors += sum(result['neighbors'])
+        self.flips += sum(result['archetypeFlips'])
+        for margin, n in Counter(result['margin']).items():
+            self.margin[margin] += n
+        for flips, n in Counter(result['archetypeFlips']).items():
+            self.archetype_flips[flips] = self.archetype_flips.get(flips, 0) + n
+        for flips, n in Counter(map(add, result['attachmentFlips'], result['communicationFlips'])).items():
+            self.primary_flips[flips] = self.primary_flips.get(flips, 0) + n
+        for slug, margin in zip(result['slug'], result['margin']):
+            counts = self.by_slug[slug]
+            counts[0] += 1
+            counts[1] += margin == 1
+
+    def merge(self, other: 'FragilityStats') -> 'FragilityStats':
+        self.rows += other.rows
+        self.errors += other.errors
+        self.neighbors += other.neighbors
+        self.flips += other.flips
+        self.margin = list(map(add, self.margin, other.margin))
+        for mine, theirs in ((self.archetype_flips, other.archetype_flips), (self.primary_flips, other.primary_flips)):
+            for flips, n in theirs.items():
+                mine[flips] = mine.get(flips, 0) + n
+        for slug, (rows, fragile) in other.by_slug.items():
+            self.by_slug[slug][0] += rows
+            self.by_slug[slug][1] += fragile
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'rows': self.rows,
+            'errors': self.errors,
+            'neighborFlipRate': self.flips / self.neighbors if self.neighbors else 0.0,
+            'marginHistogram': {'stable': self.margin[STABLE_MARGIN],
+                                **{str(step): self.margin[step] for step in range(1, 5)}},
+            'archetypeFlipHistogram': {str(k): self.archetype_flips[k] for k in sorted(self.archetype_flips)},
+            'primaryFlipHistogram': {str(k): self.primary_flips[k] for k in sorted(self.primary_flips)},
+            'oneStepFragileBySlug': {slug: {'rows': rows, 'fragile': fragile,
+                                            'share': fragile / rows if rows else 0.0}
+                                     for slug, (rows, fragile) in self.by_slug.items()},
+        }
+
+def sensitivity_stream(lines: Iterable[bytes], rows_out: Optional[IO[str]] = None,
+                       chunk_size: int = RESCORE_CHUNK_SIZE,
+                       analyzer: Optional[SensitivityAnalyzer] = None) -> FragilityStats:
+    """Analyze a JSONL export; with rows_out, also write per-row NDJSON (id, slug, flips, margin)."""
+    analyzer = analyzer or SensitivityAnalyzer()
+    stats = FragilityStats()
+    dumps = json.JSONEncoder(separators=(',', ':')).encode
+    for chunk in map(_decode_stage, map(_parse_stage, _read_chunks(lines, chunk_size))):
+        keep = [i for i in range(len(chunk.rows)) if i not in chunk.errors]
+        result = analyzer.analyze_packed([chunk.records[i] for i in keep])
+        stats.add(result)
+        stats.errors += len(chunk.errors)
+        if rows_out is not None:
+            rows_out.writelines(dumps(sensitivity_record(chunk.rows[i], result, n)) + '\n'
+                                for n, i in enumerate(keep))
+    return stats
+
+def sensitivity_record(row: Dict[str, Any], result: Dict[str, Any], i: int) -> Dict[str, Any]:
+    """Per-row output record for row i of an analyze() result."""
+    record = {col: row[col] for col in ('id', 'public_slug') if col in row}
+    record['archetype_slug'] = result['slug'][i]
+    for field in ('neighbors', 'archetypeFlips', 'attachmentFlips', 'communicationFlips', 'margin'):
+        record[field] = result[field][i]
+    return record
+
+def sensitivity_corpus(corpus: Corpus, rows_out: Optional[IO[str]] = None,
+                       chunk_size: int = RESCORE_CHUNK_SIZE,
+                       analyzer: Optional[SensitivityAnalyzer] = None) -> FragilityStats:
+    """Analyze every row of a columnar corpus."""
+    analyzer = analyzer or SensitivityAnalyzer()
+    stats = FragilityStats()
+    dumps = json.JSONEncoder(separators=(',', ':')).encode
+    for lo in range(0, len(corpus), chunk_size):
+        hi = min(lo + chunk_size, len(corpus))
+        matrix, scenario = corpus.valid(lo, hi)
+        result = analyzer.analyze(matrix, corpus.width, scenario)
+        stats.add(result)
+        stats.errors += hi - lo - len(scenario)
+        if rows_out is not None:
+            rows = [row for row in corpus.index(lo, hi) if 'error' not in row]
+            rows_out.writelines(dumps(sensitivity_record(row, result, n)) + '\n' for n, row in enumerate(rows))
+    return stats
+
+# =============================================================================
+# PARAMETER SWEEP (stage-memoized what-if runs)
+# =============================================================================
+
+# Stage -> the sweep parameters its cache is keyed by
+SWEEP_STAGES = {
+    'communication': ('scenario_bonus',),
+    'primary': ('scenario_bonus',),
+    'archetype': ('scenario_bonus', 'epsilon'),
+    'shift': ('scenario_bonus', 'epsilon'),
+    'balanced': ('scenario_bonus', 'balanced_threshold'),
+}
+SWEEP_BASELINE = {'scenario_bonus': SCENARIO_BONUS, 'epsilon': EPSILON, 'balanced_threshold': BALANCED_THRESHOLD}
+
+def sweep_states(blob: bytes, width: int, scenario: Optional[bytes], plan: ScoringPlan = PLAN) -> Counter:
+    """Count rows by (attachment scores, communication keys, scenario code).
+
+    This is everything the sweep parameters act on: attachment scores never
+    depend on them, and communication scores follow from the Likert keys
+    once a bonus is chosen. Rows sharing a state are evaluated once.
+    """
+    columns = [blob[j::width].translate(plan.contributions[j]) for j in range(len(plan.columns))]
+    attachment = zip(*(plan.score_columns(columns, f'attachment.{d}') for d in plan.attachment_order))
+    communication = zip(*(plan.key_columns(columns, f'communication.{s}') for s in plan.communication_order))
+    codes = scenario if scenario is not None else bytes(len(blob) // width)
+    return Counter(zip(attachment, communication, codes))
+
+class _CommunicationStage:
+    """Per-bonus communication scores, the distinct score pairs they form, and per-pair axis data."""
+    __slots__ = ('state_pair', 'primary', 'pairs', 'pair_counts', 'clear_cells', 'near_ties', 'near_gaps',
+                 'min_entropy', 'balanced_from')
+
+class ParameterSweep:
+    """Evaluates a grid of SCENARIO_BONUS / EPSILON / BALANCED_THRESHOLD values over scored states.
+
+    Each stage result is cached by the parameters listed in SWEEP_STAGES,
+    so a grid only recomputes what each point actually changes: a bonus
+    sweep reruns communication scoring over distinct states, an EPSILON
+    sweep reruns the full tie-break only for score pairs whose best cell
+    leads by less than EPSILON, and a BALANCED_THRESHOLD sweep is a bisect
+    over sorted entropies. Shifts are reported against SWEEP_BASELINE.
+    """
+
+    def __init__(self, states: Counter, plan: ScoringPlan = PLAN):
+        self.plan = plan
+        self.states = list(states)
+        self.counts = array('Q', states.values())
+        self.rows = sum(self.counts)
+        # Most states are single rows; weighted counts only loop over the rest
+        self._repeats = [(i, n - 1) for i, n in enumerate(self.counts) if n > 1]
+        self.cache: Dict[str, Dict[Tuple[Any, ...], Any]] = {stage: {} for stage in SWEEP_STAGES}
+        self.cache_stats = {stage: {'hits': 0, 'misses': 0} for stage in SWEEP_STAGES}
+        self._axes: Dict[Tuple[int, ...], Tuple[Tuple[int, float, float, List[float]], float]] = {}
+        self._comm_priority = [plan.communication_order.index(s) for s in COMMUNICATION_PRIORITY]
+
+    def _stage(self, name: str, params: Dict[str, Any], compute) -> Any:
+        key = tuple(params[p] for p in SWEEP_STAGES[name])
+        cache = self.cache[name]
+        if key in cache:
+            self.cache_stats[name]['hits'] += 1
+            return cache[key]
+        self.cache_stats[name]['misses'] += 1
+        value = cache[key] = compute(*key)
+        return value
+
+    def _axis(self, scores: Tuple[int, ...]) -> Tuple[Tuple[int, float, float, List[float]], float]:
+        entry = self._axes.get(scores)
+        if entry is None:
+            summary = axis_summary(scores)
+            entry = self._axes[scores] = (summary, entropy(summary[3]))
+        return entry
+
+    def _communication(self, bonus: int) -> _CommunicationStage:
+        plan = self.plan if bonus == self.plan.scenario_bonus else ScoringPlan(scenario_bonus=bonus)
+        table = plan.score_table
+        bonus_keys = [plan.scenario_bonus_keys[s] for s in plan.communication_order]
+        stage = _CommunicationStage()
+        stage.state_pair = array('I')
+        stage.primary = bytearray()
+        pair_ids: Dict[Tuple[Tuple[int, ...], Tuple[int, ...]], int] = {}
+        pair_counts: List[int] = []
+        for (att, keys, code), n in zip(self.states, self.counts):
+            comm = tuple(table[k + b[code]] for k, b in zip(keys, bonus_keys))
+            stage.primary.append(comm.index(max(comm)))
+            pair = (att, tuple(comm[i] for i in self._comm_priority))
+            pid = pair_ids.get(pair)
+            if pid is None:
+                pid = pair_ids[pair] = len(pair_counts)
+                pair_counts.append(0)
+            pair_counts[pid] += n
+            stage.state_pair.append(pid)
+        stage.pairs = list(pair_ids)
+        stage.pair_counts = pair_counts
+
+        # Best cell per pair and its lead over every other joint: for any epsilon up
+        # to the lead the best cell wins, so only pairs below it need the full sort
+        clear_cells = bytearray()
+        gaps = array('d')
+        for a, c in stage.pairs:
+            a_top, a1, a2, _ = self._axis(a)[0]
+            c_top, c1, c2, c_probs = self._axis(c)[0]
+            clear_cells.append(a_top * len(c_probs) + c_top)
+            gaps.append(a1 * c1 - max(a1 * c2, a2 * c1))
+        stage.clear_cells = bytes(clear_cells)
+        stage.near_ties = sorted(range(len(gaps)), key=gaps.__getitem__)
+        stage.near_gaps = [gaps[pid] for pid in stage.near_ties]
+        # isBalanced needs both entropies above the threshold: bisect on the smaller one
+        by_entropy = sorted((min(self._axis(a)[1], self._axis(c)[1]), n) for (a, c), n in zip(stage.pairs, pair_counts))
+        stage.min_entropy = [e for e, _ in by_entropy]
+        stage.balanced_from = list(accumulate((n for _, n in reversed(by_entropy)), initial=0))[::-1]
+        return stage
+
+    def _archetype(self, bonus: int, epsilon: float) -> bytes:
+        """Winning cell per row state."""
+        stage = self._stage('communication', {'scenario_bonus': bonus}, self._communication)
+        cells = bytearray(stage.clear_cells)
+        for pid in stage.near_ties[:bisect_left(stage.near_gaps, epsilon)]:
+            a, c = stage.pairs[pid]
+            a_probs, c_probs = self._axis(a)[0][3], self._axis(c)[0][3]
+            cells[pid] = _winning_cell([pa * pc for pa in a_probs for pc in c_probs], epsilon)
+        return bytes(map(cells.__getitem__, stage.state_pair))
+
+    def _primary(self, bonus: int) -> int:
+        """Rows whose communication primary differs from the baseline."""
+        primary = self._stage('communication', {'scenario_bonus': bonus}, self._communication).primary
+        base = self._stage('communication', SWEEP_BASELINE, self._communication).primary
+        return sum(compress(self.counts, map(ne, primary, base)))
+
+    def _shift(self, bonus: int, epsilon: float) -> Dict[str, Any]:
+        """Archetype counts and per-row changes against the baseline parameters."""
+        cells = self._stage('archetype', {'scenario_bonus': bonus, 'epsilon': epsilon}, self._archetype)
+        base_cells = self._stage('archetype', SWEEP_BASELINE, self._archetype)
+        per_cell = Counter(cells)
+        for i, extra in self._repeats:
+            per_cell[cells[i]] += extra
+        archetypes = [per_cell[cell] for cell in range(len(ARCHETYPE_SLUGS))]
+        transitions: Counter = Counter()
+        for base_cell, cell, n in compress(zip(base_cells, cells, self.counts), map(ne, base_cells, cells)):
+            transitions[base_cell, cell] += n
+        return {'archetypes': archetypes, 'transitions': transitions}
+
+    def _balanced(self, bonus: int, threshold: float) -> int:
+        stage = self._stage('communication', {'scenario_bonus': bonus}, self._communication)
+        return stage.balanced_from[bisect_right(stage.min_entropy, threshold * MAX_ENTROPY_4)]
+
+    def evaluate(self, scenario_bonus: int = SCENARIO_BONUS, epsilon: float = EPSILON,
+                 balanced_threshold: float = BALANCED_THRESHOLD) -> Dict[str, Any]:
+        """Report one grid point: archetype mix, rows shifted from baseline, primaries, isBalanced."""
+        params = {'scenario_bonus': scenario_bonus, 'epsilon': epsilon, 'balanced_threshold': balanced_threshold}
+        shift = self._stage('shift', params, self._shift)
+        shifted = sum(shift['transitions'].values())
+        rows = self.rows or 1
+        return {
+            'params': params,
+            'archetypes': dict(zip(ARCHETYPE_SLUGS, shift['archetypes'])),
+            'archetypeShifted': shifted,
+            'archetypeShiftedShare': shifted / rows,
+            'topTransitions': [{'from': ARCHETYPE_SLUGS[a], 'to': ARCHETYPE_SLUGS[b], 'rows': n}
+                               for (a, b), n in shift['transitions'].most_common(5)],
+            'communicationPrimaryShifted': self._stage('primary', params, self._primary),
+            'balanced': self._stage('balanced', params, self._balanced),
+        }
+
+    def run(self, grid: Dict[str, Sequence[Any]]) -> Dict[str, Any]:
+        """Evaluate every combination of a {parameter: values} grid (missing parameters use the baseline)."""
+        names = list(SWEEP_BASELINE)
+        axes = [list(grid.get(name) or [SWEEP_BASELINE[name]]) for name in names]
+        # Bonus-major order keeps each bonus's stages hot while EPSILON/threshold vary
+        points = [self.evaluate(**dict(zip(names, combo))) for combo in product(*axes)]
+        return {'rows': self.rows, 'states': len(self.states), 'baseline': dict(SWEEP_BASELINE),
+                'points': points, 'cache': self.cache_stats}
+
+def sweep_input(path: str, chunk_size: int = RESCORE_CHUNK_SIZE) -> Tuple[Counter, int]:
+    """Sweep states and error count for an export ('-' for stdin) or a corpus directory."""
+    states: Counter = Counter()
+    errors = 0
+    if os.path.isdir(path):
+        with Corpus(path) as corpus:
+            for lo in range(0, len(corpus), chunk_size):
+                hi = min(lo + chunk_size, len(corpus))
+                matrix, scenario = corpus.valid(lo, hi)
+                errors += hi - lo - len(scenario)
+                states.update(sweep_states(matrix, corpus.width, scenario))
+        return states, errors
+    with open_input(path) as infile:
+        for chunk in map(_decode_stage, map(_parse_stage, _read_chunks(infile, chunk_size))):
+            blob = b''.join(record for i, record in enumerate(chunk.records) if i not in chunk.errors)
+            errors += len(chunk.errors)
+            states.update(sweep_states(blob, RECORD_WIDTH, blob[SCENARIO_COLUMN::RECORD_WIDTH]))
+    return states, errors
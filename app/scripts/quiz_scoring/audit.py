@@ -0,0 +1,175 @@
+"""Drift audit: stored vs recomputed scores, checkpointed with a watermark."""
+
+import json
+import os
+import re
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Any
+
+from .core import compute_archetype_batch
+from .batch import batch_row_result, pack_answers, score_packed
+from .rescore import RESCORE_CHUNK_SIZE, id_sort_key, _parse_stage, _read_chunks, row_answers, to_db_scores
+
+# 2: ids are stored and compared by native type (id_sort_key) rather than as strings
+AUDIT_WATERMARK_FORMAT = 2
+# Top-level created_at / id read straight from a raw export line, so rows under the watermark skip json.loads
+_RAW_CREATED_AT = re.compile(rb'"created_at"\s*:\s*"([^"\\]*)"')
+_RAW_ID = re.compile(rb'"id"\s*:\s*(?:"([^"\\]*)"|(-?\d+)(?![\d.eE]))')
+
+def audit_key(row: Dict[str, Any]) -> Optional[Tuple[str, Tuple[int, Any]]]:
+    """(created_at as UTC ISO with microseconds, id_sort_key(id)) for watermark ordering, or None if either is unusable."""
+    created, ident = row.get('created_at'), row.get('id')
+    if not isinstance(created, str) or ident is None:
+        return None
+    try:
+        when = datetime.fromisoformat(created)
+    except ValueError:
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return when.astimezone(timezone.utc).isoformat(timespec='microseconds'), id_sort_key(ident)
+
+def _raw_audit_key(line: bytes) -> Optional[Tuple[str, Tuple[int, Any]]]:
+    """audit_key from the raw line when each field occurs exactly once, else None (parse it properly)."""
+    created = _RAW_CREATED_AT.findall(line)
+    ident = _RAW_ID.findall(line)
+    if len(created) != 1 or len(ident) != 1:
+        return None
+    text, number = ident[0]
+    return audit_key({'created_at': created[0].decode(), 'id': int(number) if number else text.decode()})
+
+def _unseen_lines(lines: Iterable[bytes], since: Tuple[str, Tuple[int, Any]], run: Counter) -> Iterator[bytes]:
+    for line in lines:
+        key = _raw_audit_key(line)
+        if key is not None and key <= since:
+            run['skipped'] += 1
+            continue
+        yield line
+
+def flatten_scores(value: Any, prefix: str = '') -> Dict[str, Any]:
+    """Nested DBScores as dotted path -> leaf (lists such as tied primaries stay whole)."""
+    if not isinstance(value, dict):
+        return {prefix: value}
+    flat: Dict[str, Any] = {}
+    for key, item in value.items():
+        flat.update(flatten_scores(item, f'{prefix}.{key}' if prefix else key))
+    return flat
+
+def diff_scores(stored: Any, recomputed: Dict[str, Any]) -> Dict[str, List[Any]]:
+    """Dotted path -> [stored, recomputed] for every field that differs or exists on one side only."""
+    ours = flatten_scores(recomputed)
+    theirs = flatten_scores(stored) if isinstance(stored, dict) else {}
+    return {path: [theirs.get(path), ours.get(path)]
+            for path in dict.fromkeys(list(ours) + list(theirs))
+            if path not in theirs or path not in ours or theirs[path] != ours[path]}
+
+def read_watermark(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, encoding='utf-8') as f:
+            mark = json.load(f)
+    except FileNotFoundError:
+        return None
+    if mark.get('format') != AUDIT_WATERMARK_FORMAT:
+        raise ValueError(f"{path}: unsupported watermark format {mark.get('format')!r}")
+    return mark
+
+def write_watermark(path: str, mark: Dict[str, Any]) -> None:
+    """Replace the watermark atomically so an interrupted run leaves the previous checkpoint intact."""
+    tmp = f'{path}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(mark, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def audit_export(lines: Iterable[bytes], report_path: str, watermark_path: str,
+                 chunk_size: int = RESCORE_CHUNK_SIZE) -> Dict[str, Any]:
+    """Diff stored scores/archetype_slug against rescored answers for rows past the watermark.
+
+    Expects the export ordered by (created_at, id). Rows at or below the
+    watermark are skipped, so a nightly export may be the full table or just
+    `WHERE created_at >= :created_at`. Mismatches are appended to report_path
+    as NDJSON; after each chunk the report is synced and the watermark
+    records the highest key and the report length, so a resumed run
+    truncates any half-written tail and picks up after the last checkpoint.
+    A watermark whose report is missing or shorter than it recorded is an
+    error: delete the watermark to audit from scratch.
+    """
+    mark = read_watermark(watermark_path)
+    since = (mark['created_at'], id_sort_key(mark['id'])) if mark else None
+    totals = Counter(mark['totals']) if mark else Counter()
+    fields: Counter = Counter()
+    run = Counter()
+    dumps = json.JSONEncoder(separators=(',', ':')).encode
+
+    if mark:
+        size = os.path.getsize(report_path) if os.path.exists(report_path) else None
+        if size is None or size < mark['reportBytes']:
+            found = 'missing' if size is None else f'{size} bytes'
+            raise ValueError(f"{report_path} is {found} but {watermark_path} checkpointed {mark['reportBytes']} bytes; "
+                             'delete the watermark to audit from scratch')
+    report = open(report_path, 'r+b' if mark else 'wb')
+    try:
+        if mark:
+            report.truncate(mark['reportBytes'])
+            report.seek(0, os.SEEK_END)
+        high, high_id = since, mark['id'] if mark else None
+        if since is not None:
+            lines = _unseen_lines(lines, since, run)
+        for chunk in map(_parse_stage, _read_chunks(lines, chunk_size)):
+            audited: List[Tuple[int, Dict[str, Any], Dict[str, Any]]] = []
+            out: List[Tuple[int, str]] = []
+            for i, row in enumerate(chunk.rows):
+                key = audit_key(row)
+                if key is not None and since is not None and key <= since:
+                    run['skipped'] += 1
+                    continue
+                if key is not None:
+                    if high is not None and key < high:
+                        run['outOfOrder'] += 1
+                    else:
+                        high, high_id = key, row['id']
+                answers = None if i in chunk.errors else row_answers(row)
+                error = chunk.errors.get(i) or ('missing created_at/id' if key is None else
+                                                'missing answers' if answers is None else None)
+                if error:
+                    run['errors'] += 1
+                    out.append((i, dumps({'id': row.get('id'), 'created_at': row.get('created_at'), 'error': error})))
+                    continue
+                audited.append((i, row, answers))
+            if audited:
+                batch = score_packed([pack_answers(answers) for _, _, answers in audited])
+                slugs = compute_archetype_batch(batch['attachment']['scores'], batch['communication']['scores'])['slug']
+                for n, (i, row, _) in enumerate(audited):
+                    stored = row.get('scores')
+                    if isinstance(stored, str):
+                        try:
+                            stored = json.loads(stored)
+                        except ValueError:
+                            stored = None
+                    diffs = diff_scores(stored, to_db_scores(batch_row_result(batch, n)))
+                    if row.get('archetype_slug') != slugs[n]:
+                        diffs['archetype_slug'] = [row.get('archetype_slug'), slugs[n]]
+                    if diffs:
+                        run['mismatchedRows'] += 1
+                        fields.update(diffs.keys())
+                        out.append((i, dumps({'id': row['id'], 'created_at': row['created_at'], 'fields': diffs})))
+                run['audited'] += len(audited)
+            if out:
+                out.sort()
+                report.write(''.join(record + '\n' for _, record in out).encode())
+            report.flush()
+            os.fsync(report.fileno())
+            if high is not None:
+                write_watermark(watermark_path, {
+                    'format': AUDIT_WATERMARK_FORMAT, 'created_at': high[0], 'id': high_id,
+                    'reportBytes': report.tell(), 'totals': dict(totals + run),
+                })
+    finally:
+        report.close()
+
+    return {'run': {name: run[name] for name in ('audited', 'mismatchedRows', 'skipped', 'errors', 'outOfOrder')},
+            'fields': dict(fields.most_common()),
+            'totals': dict(totals + run),
+            'watermark': {'created_at': high[0], 'id': high_id} if high else None}
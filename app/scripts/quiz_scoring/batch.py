@@ -0,0 +1,360 @@
+"""Batch scoring over packed answer records, and compact one-byte-per-question responses."""
+
+from array import array
+from operator import add
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Any
+
+from .core import (
+    ATTACHMENT_ORDER, ATTACHMENT_QUESTIONS, COMMUNICATION_ORDER, COMMUNICATION_QUESTIONS, CONFIDENCE_QUESTIONS,
+    EMOTIONAL_QUESTIONS, INTIMACY_BOUNDARY, INTIMACY_COMFORT, LOVE_LANGUAGE_ORDER, LOVE_LANGUAGE_QUESTIONS,
+    REVERSE_QUESTIONS, SCENARIO_BONUS, SCENARIO_KEY_MAP, SCENARIO_QUESTION, normalize,
+)
+from .profiling import PROFILER
+
+# One matrix column per Likert question, MISSING marks an unanswered question.
+MISSING = 0
+BATCH_COLUMNS: Tuple[str, ...] = tuple(
+    [q for dim in ATTACHMENT_ORDER for q in ATTACHMENT_QUESTIONS[dim]]
+    + [q for style in COMMUNICATION_ORDER for q in COMMUNICATION_QUESTIONS[style]]
+    + CONFIDENCE_QUESTIONS + EMOTIONAL_QUESTIONS + INTIMACY_COMFORT + INTIMACY_BOUNDARY
+    + [q for lang in LOVE_LANGUAGE_ORDER for q in LOVE_LANGUAGE_QUESTIONS[lang]]
+)
+BATCH_INDEX = {qid: i for i, qid in enumerate(BATCH_COLUMNS)}
+
+# Scenario keys as one byte per row (0 = no scenario answer)
+SCENARIO_CODES = {key: code for code, key in enumerate(SCENARIO_KEY_MAP, start=1)}
+
+def to_batch_row(responses: Dict[str, int]) -> bytes:
+    """Encode one response dict as a matrix row (raw values, MISSING if unanswered)."""
+    return bytes(responses.get(qid, MISSING) for qid in BATCH_COLUMNS)
+
+# =============================================================================
+# COMPACT RESPONSES (one byte per question)
+# =============================================================================
+
+# Fixed question-ID -> column registry: the Likert batch columns, then the scenario code
+QUESTION_IDS: Tuple[str, ...] = BATCH_COLUMNS + (SCENARIO_QUESTION,)
+QUESTION_INDEX = {qid: i for i, qid in enumerate(QUESTION_IDS)}
+SCENARIO_COLUMN = QUESTION_INDEX[SCENARIO_QUESTION]
+RECORD_WIDTH = len(QUESTION_IDS)
+SCENARIO_KEYS = {code: key for key, code in SCENARIO_CODES.items()}
+
+def pack_answers(answers: Dict[str, Dict[str, Any]]) -> bytes:
+    """Pack a DBAnswerMap ({qid: {v, t, k}}) into a RECORD_WIDTH byte record.
+
+    Likert values come from v; the scenario answer comes from k even when a
+    legacy entry also carries v. Entries without a 1-5 v count as unanswered.
+    """
+    record = bytearray(RECORD_WIDTH)
+    for qid, entry in answers.items():
+        col = BATCH_INDEX.get(qid)
+        if col is not None:
+            val = entry.get('v')
+            if type(val) is int and 1 <= val <= 5:
+                record[col] = val
+    scenario = answers.get(SCENARIO_QUESTION)
+    key = scenario.get('k') if scenario else None
+    if isinstance(key, str):
+        record[SCENARIO_COLUMN] = SCENARIO_CODES.get(key, MISSING)
+    return bytes(record)
+
+class CompactResponse:
+    """One response as RECORD_WIDTH bytes: 1-5 per Likert question, scenario code last, 0 if unanswered.
+
+    Behaves as a read-only {question ID: value} mapping, so every score_*
+    function accepts it in place of a response dict.
+    """
+    __slots__ = ('data',)
+
+    def __init__(self, data: bytes = bytes(RECORD_WIDTH)):
+        if len(data) != RECORD_WIDTH:
+            raise ValueError(f'expected {RECORD_WIDTH} bytes, got {len(data)}')
+        self.data = bytes(data)
+
+    @classmethod
+    def from_responses(cls, responses: Dict[str, int], scenario_key: Optional[str] = None) -> 'CompactResponse':
+        record = bytearray(to_batch_row(responses))
+        record.append(SCENARIO_CODES.get(scenario_key, MISSING) if scenario_key else MISSING)
+        return cls(record)
+
+    @classmethod
+    def from_answers(cls, answers: Dict[str, Dict[str, Any]]) -> 'CompactResponse':
+        return cls(pack_answers(answers))
+
+    @property
+    def scenario_key(self) -> Optional[str]:
+        return SCENARIO_KEYS.get(self.data[SCENARIO_COLUMN])
+
+    def to_responses(self) -> Dict[str, int]:
+        return {qid: val for qid, val in zip(BATCH_COLUMNS, self.data) if val != MISSING}
+
+    def to_answers(self, timestamp: int = 0) -> Dict[str, Dict[str, Any]]:
+        """DBAnswerMap for this record; timestamps are not stored, so every t is `timestamp`."""
+        return encode_answers(self.to_responses(), self.scenario_key, timestamp)
+
+    def __getitem__(self, qid: str) -> Any:
+        val = self.data[QUESTION_INDEX[qid]]
+        if val == MISSING:
+            raise KeyError(qid)
+        return SCENARIO_KEYS[val] if qid == SCENARIO_QUESTION else val
+
+    def __contains__(self, qid: object) -> bool:
+        col = QUESTION_INDEX.get(qid)  # type: ignore[arg-type]
+        return col is not None and self.data[col] != MISSING
+
+    def get(self, qid: str, default: Any = None) -> Any:
+        return self[qid] if qid in self else default
+
+    def __iter__(self) -> Iterator[str]:
+        return (qid for qid, val in zip(QUESTION_IDS, self.data) if val != MISSING)
+
+    def __len__(self) -> int:
+        return RECORD_WIDTH - self.data.count(MISSING)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, CompactResponse) and self.data == other.data
+
+    def __hash__(self) -> int:
+        return hash(self.data)
+
+    def __repr__(self) -> str:
+        return f'CompactResponse({self.data!r})'
+
+class ResponseTable:
+    """Many compact records in one bytearray (RECORD_WIDTH bytes per row)."""
+
+    def __init__(self, data: bytes = b''):
+        if len(data) % RECORD_WIDTH:
+            raise ValueError(f'table size {len(data)} is not a multiple of {RECORD_WIDTH}')
+        self.data = bytearray(data)
+
+    def append(self, record: CompactResponse) -> None:
+        self.data += record.data
+
+    def append_answers(self, answers: Dict[str, Dict[str, Any]]) -> None:
+        self.data += pack_answers(answers)
+
+    def __len__(self) -> int:
+        return len(self.data) // RECORD_WIDTH
+
+    def __getitem__(self, row: int) -> CompactResponse:
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError(row)
+        return CompactResponse(self.data[row * RECORD_WIDTH:(row + 1) * RECORD_WIDTH])
+
+    def rows(self, start: int = 0, end: Optional[int] = None) -> memoryview:
+        """Zero-copy view of rows [start, end)."""
+        end = len(self) if end is None else end
+        return memoryview(self.data)[start * RECORD_WIDTH:end * RECORD_WIDTH]
+
+    def score(self, start: int = 0, end: Optional[int] = None) -> Dict[str, Any]:
+        return score_packed(self.rows(start, end))
+
+class ScoringPlan:
+    """Scoring constants compiled into sum-indexed lookup tables.
+
+    A dimension score depends only on how many of its questions were answered
+    and the integer sum of their reverse-adjusted values. Each answered value
+    contributes (adjusted value + count_unit), so the sum of contributions is a
+    single key encoding both, and score_table[key] holds normalize(average) for
+    every reachable state. Keys from bonus_offset up hold the capped scenario
+    bonus variant. Scoring is then byte translation, integer adds and a lookup.
+    """
+
+    def __init__(self,
+                 attachment: Dict[str, List[str]] = ATTACHMENT_QUESTIONS,
+                 communication: Dict[str, List[str]] = COMMUNICATION_QUESTIONS,
+                 confidence: List[str] = CONFIDENCE_QUESTIONS,
+                 emotional: List[str] = EMOTIONAL_QUESTIONS,
+                 comfort: List[str] = INTIMACY_COMFORT,
+                 boundary: List[str] = INTIMACY_BOUNDARY,
+                 love: Dict[str, Tuple[str, str]] = LOVE_LANGUAGE_QUESTIONS,
+                 reverse: frozenset = REVERSE_QUESTIONS,
+                 scenario_key_map: Dict[str, str] = SCENARIO_KEY_MAP,
+                 scenario_bonus: int = SCENARIO_BONUS):
+        self.attachment_order = list(attachment)
+        self.communication_order = list(communication)
+        self.love_order = list(love)
+        self.scenario_bonus = scenario_bonus
+
+        # Dimension name -> question IDs, in output order
+        groups: Dict[str, Sequence[str]] = {}
+        groups.update((f'attachment.{d}', q) for d, q in attachment.items())
+        groups.update((f'communication.{s}', q) for s, q in communication.items())
+        groups['confidence'] = confidence
+        groups['emotional'] = emotional
+        groups['intimacy.comfort'] = comfort
+        groups['intimacy.boundaries'] = boundary
+        groups.update((f'love.{l}', q) for l, q in love.items())
+        groups.update((f'give.{l}', q[:1]) for l, q in love.items())
+        groups.update((f'receive.{l}', q[1:]) for l, q in love.items())
+
+        self.columns: Tuple[str, ...] = tuple(dict.fromkeys(
+            q for name, qids in groups.items() if not name.startswith(('give.', 'receive.')) for q in qids))
+        self.index = {qid: i for i, qid in enumerate(self.columns)}
+        self.dimensions = {name: tuple(self.index[q] for q in qids) for name, qids in groups.items()}
+
+        max_count = max(len(cols) for cols in self.dimensions.values())
+        self.count_unit = 5 * max_count + 1
+        self.bonus_offset = self.count_unit * (max_count + 1)
+        if self.bonus_offset > 255:
+            raise ValueError(f'dimensions of {max_count} questions do not fit byte-sized keys')
+
+        # Raw answer byte -> contribution; anything outside 1-5 is unanswered
+        forward = bytearray(256)
+        backward = bytearray(256)
+        for val in range(1, 6):
+            forward[val] = val + self.count_unit
+            backward[val] = (6 - val) + self.count_unit
+        self.contributions = [bytes(backward if qid in reverse else forward) for qid in self.columns]
+
+        table = bytearray(2 * self.bonus_offset)
+        for count in range(1, max_count + 1):
+            for total in range(count, 5 * count + 1):
+                table[total + count * self.count_unit] = normalize(total / count)
+        for key in range(self.bonus_offset):
+            table[self.bonus_offset + key] = min(100, table[key] + scenario_bonus)
+        self.score_table = bytes(table)
+
+        # Scenario code -> bonus_offset on the selected style's key, 0 elsewhere
+        self.scenario_bonus_keys: Dict[str, bytes] = {}
+        for style in self.communication_order:
+            codes = bytearray(256)
+            for key, target in scenario_key_map.items():
+                if target == style and key in SCENARIO_CODES:
+                    codes[SCENARIO_CODES[key]] = self.bonus_offset
+            self.scenario_bonus_keys[style] = bytes(codes)
+
+    def key_columns(self, columns: List[bytes], name: str, scenario: Optional[bytes] = None) -> Iterable[int]:
+        """score_table keys of dimension `name` for every row given translated question columns."""
+        cols = [columns[i] for i in self.dimensions[name]]
+        if scenario is not None:
+            cols.append(scenario)
+        keys: Iterable[int] = cols[0]
+        for col in cols[1:]:
+            keys = map(add, keys, col)
+        return keys
+
+    def score_columns(self, columns: List[bytes], name: str, scenario: Optional[bytes] = None) -> array:
+        """Score dimension `name` for every row given translated question columns."""
+        return array('B', bytes(map(self.score_table.__getitem__, self.key_columns(columns, name, scenario))))
+
+PLAN = ScoringPlan()
+
+def _as_blob(matrix: Any, width: int) -> bytes:
+    """Row-major bytes for a matrix given as a contiguous buffer or a sequence of rows."""
+    if isinstance(matrix, (bytes, bytearray, memoryview)):
+        blob = bytes(matrix)
+    else:
+        blob = b''.join(row.data if isinstance(row, CompactResponse)
+                        else row if isinstance(row, (bytes, bytearray)) else bytes(row) for row in matrix)
+    if len(blob) % width:
+        raise ValueError(f'matrix size {len(blob)} is not a multiple of {width} columns')
+    return blob
+
+def _batch_primary(scores: Dict[str, array], order: List[str]) -> List[str]:
+    """Highest score per row, ties go to the first entry in order."""
+    rows = list(zip(*(scores[key] for key in order)))
+    return [order[i] for i in map(tuple.index, rows, map(max, rows))]
+
+def _batch_ranked(scores: Dict[str, array], order: List[str]) -> List[Tuple[str, ...]]:
+    """Stable highest-first ordering per row, memoized by score tuple."""
+    positions = range(len(order))
+    ranked: Dict[Tuple[int, ...], Tuple[str, ...]] = {}
+    out = []
+    for row in zip(*(scores[key] for key in order)):
+        result = ranked.get(row)
+        if result is None:
+            result = ranked[row] = tuple(order[i] for i in sorted(positions, key=row.__getitem__, reverse=True))
+        out.append(result)
+    return out
+
+def score_batch(matrix: Any, scenario_keys: Optional[Sequence[Optional[str]]] = None,
+                plan: ScoringPlan = PLAN) -> Dict[str, Any]:
+    """Score an N x len(plan.columns) response matrix one dimension at a time.
+
+    The matrix is a sequence of rows or one row-major bytes buffer of raw 1-5
+    values (MISSING if unanswered). Returns the score_responses structure with
+    one array entry per row in place of every scalar; results match the
+    per-dict functions exactly.
+    """
+    width = len(plan.columns)
+    blob = _as_blob(matrix, width)
+    scenario = None
+    if scenario_keys is not None:
+        scenario = bytes(SCENARIO_CODES.get(key, 0) if key else 0 for key in scenario_keys)
+        if len(scenario) != len(blob) // width:
+            raise ValueError(f'{len(scenario)} scenario keys for {len(blob) // width} rows')
+    return _score_blob(blob, width, scenario, plan)
+
+def score_packed(records: Any, plan: ScoringPlan = PLAN) -> Dict[str, Any]:
+    """Score compact records (Likert columns, then the scenario code) like score_batch.
+
+    Accepts a sequence of CompactResponse or a row-major buffer such as
+    ResponseTable.rows().
+    """
+    width = len(plan.columns) + 1
+    blob = _as_blob(records, width)
+    return _score_blob(blob, width, blob[width - 1::width], plan)
+
+def _score_blob(blob: bytes, width: int, scenario: Optional[bytes], plan: ScoringPlan) -> Dict[str, Any]:
+    with PROFILER.span('reverse'):
+        columns = [blob[j::width].translate(plan.contributions[j]) for j in range(len(plan.columns))]
+
+    def dim(name: str) -> array:
+        return plan.score_columns(columns, name)
+
+    with PROFILER.span('normalize'):
+        attachment = {d: dim(f'attachment.{d}') for d in plan.attachment_order}
+        communication = {
+            s: plan.score_columns(columns, f'communication.{s}',
+                                  scenario.translate(plan.scenario_bonus_keys[s]) if scenario is not None else None)
+            for s in plan.communication_order
+        }
+        love = {l: dim(f'love.{l}') for l in plan.love_order}
+        give_receive = {l: {'give': dim(f'give.{l}'), 'receive': dim(f'receive.{l}')} for l in plan.love_order}
+        confidence, emotional = dim('confidence'), dim('emotional')
+        intimacy = {'comfort': dim('intimacy.comfort'), 'boundaries': dim('intimacy.boundaries')}
+
+    with PROFILER.span('rank'):
+        return {
+            'attachment': {'scores': attachment, 'primary': _batch_primary(attachment, plan.attachment_order)},
+            'communication': {'scores': communication,
+                              'primary': _batch_primary(communication, plan.communication_order)},
+            'confidence': confidence,
+            'emotional': emotional,
+            'intimacy': intimacy,
+            'loveLanguages': {'ranked': _batch_ranked(love, plan.love_order), 'scores': love,
+                              'giveReceive': give_receive},
+        }
+
+def batch_row_result(batch: Dict[str, Any], row: int) -> Dict[str, Any]:
+    """Extract one row of a score_batch result in score_responses form."""
+    love = batch['loveLanguages']
+    return {
+        'attachment': {'scores': {d: batch['attachment']['scores'][d][row] for d in ATTACHMENT_ORDER},
+                       'primary': batch['attachment']['primary'][row]},
+        'communication': {'scores': {s: batch['communication']['scores'][s][row] for s in COMMUNICATION_ORDER},
+                          'primary': batch['communication']['primary'][row]},
+        'confidence': batch['confidence'][row],
+        'emotional': batch['emotional'][row],
+        'intimacy': {'comfort': batch['intimacy']['comfort'][row],
+                     'boundaries': batch['intimacy']['boundaries'][row]},
+        'loveLanguages': {
+            'ranked': list(love['ranked'][row]),
+            'scores': {l: love['scores'][l][row] for l in LOVE_LANGUAGE_ORDER},
+            'giveReceive': {l: {'give': love['giveReceive'][l]['give'][row],
+                                'receive': love['giveReceive'][l]['receive'][row]}
+                            for l in LOVE_LANGUAGE_ORDER},
+        },
+    }
+
+def encode_answers(responses: Dict[str, int], scenario_key: Optional[str] = None,
+                   timestamp: int = 0) -> Dict[str, Dict[str, Any]]:
+    """Encode a response dict and scenario key as a DBAnswerMap."""
+    answers: Dict[str, Dict[str, Any]] = {qid: {'v': val, 't': timestamp} for qid, val in responses.items()}
+    if scenario_key:
+        answers[SCENARIO_QUESTION] = {'t': timestamp, 'k': scenario_key}
+    return answers
@@ -0,0 +1,139 @@
+"""Benchmarks: micro ns/op, macro rows/s, tracemalloc peak and JSON baselines."""
+
+import json
+import random
+import sys
+import time
+import tracemalloc
+from itertools import cycle, islice, repeat
+from typing import Dict, Iterator, List, Sequence, Tuple, Any
+
+from .core import (
+    get_archetype, get_value, normalize, score_attachment, score_communication, score_confidence, score_emotional,
+    score_intimacy, score_love_languages, score_responses,
+)
+from .batch import encode_answers
+from .rescore import RESCORE_CHUNK_SIZE, rescore_stream
+from .testing import random_responses
+
+BENCH_SEED = 20240601
+BENCH_MACRO_ROWS = (10_000, 1_000_000)
+# Relative slack before a metric counts as a regression against the baseline
+BENCH_TOLERANCE = 0.25
+# Each micro-benchmark takes the best of this many timed runs of at least BENCH_MIN_TIME seconds
+BENCH_REPEAT = 7
+BENCH_MIN_TIME = 0.1
+# Macro runs cycle through this many distinct generated rows so generation stays out of the timing
+BENCH_POOL_ROWS = 10_000
+# The pipeline holds one chunk per stage, so its peak settles within a few chunks; trace at most this many rows
+BENCH_TRACE_ROWS = 50_000
+
+class _NullSink:
+    """Text sink that only counts characters, so macro runs measure scoring rather than disk."""
+    __slots__ = ('chars',)
+
+    def __init__(self):
+        self.chars = 0
+
+    def write(self, text: str) -> int:
+        self.chars += len(text)
+        return len(text)
+
+def synthetic_export(rows: int, seed: int = BENCH_SEED, answer_rate: float = 0.95) -> Iterator[bytes]:
+    """Seeded quiz_results JSONL lines, generated lazily."""
+    rng = random.Random(seed)
+    dumps = json.JSONEncoder(separators=(',', ':')).encode
+    for i in range(rows):
+        responses, scenario_key = random_responses(rng, answer_rate)
+        yield dumps({'id': f'bench-{i}', 'answers': encode_answers(responses, scenario_key, 1700000000000 + i)}).encode()
+
+def _bench_cases() -> Dict[str, Tuple[Any, tuple]]:
+    """Micro-benchmark name -> (function, arguments) on one fixed seeded response."""
+    responses, scenario_key = random_responses(random.Random(BENCH_SEED))
+    return {
+        'normalize': (normalize, (3.5,)),
+        'get_value': (get_value, (responses, 'C2')),
+        'score_attachment': (score_attachment, (responses,)),
+        'score_communication': (score_communication, (responses, scenario_key)),
+        'score_confidence': (score_confidence, (responses,)),
+        'score_emotional': (score_emotional, (responses,)),
+        'score_intimacy': (score_intimacy, (responses,)),
+        'score_love_languages': (score_love_languages, (responses,)),
+        'get_archetype': (get_archetype, ('avoidant', 'assertive', 55)),
+        'score_responses': (score_responses, (responses, scenario_key)),
+    }
+
+def time_call(func: Any, args: tuple, runs: int = BENCH_REPEAT, min_time: float = BENCH_MIN_TIME) -> float:
+    """Best-of-runs nanoseconds per call, scaling the loop until one run lasts min_time."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in repeat(None, number):
+            func(*args)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+    best = elapsed
+    for _ in range(runs - 1):
+        start = time.perf_counter()
+        for _ in repeat(None, number):
+            func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best / number * 1e9
+
+def bench_micro(runs: int = BENCH_REPEAT, min_time: float = BENCH_MIN_TIME) -> Dict[str, float]:
+    return {name: round(time_call(func, args, runs, min_time), 1) for name, (func, args) in _bench_cases().items()}
+
+def bench_macro(rows: int, seed: int = BENCH_SEED, chunk_size: int = RESCORE_CHUNK_SIZE) -> Dict[str, Any]:
+    """Rescore pipeline throughput over a synthetic export, then its tracemalloc peak in a second pass.
+
+    The export cycles a pre-generated pool of rows, so 1M-row runs stay flat in
+    memory and time the pipeline rather than the generator. Tracing slows
+    allocation-heavy code several-fold, so the timed pass runs untraced and
+    the traced pass stops after BENCH_TRACE_ROWS.
+    """
+    pool = list(synthetic_export(min(rows, BENCH_POOL_ROWS), seed))
+    start = time.perf_counter()
+    stats = rescore_stream(islice(cycle(pool), rows), _NullSink(), chunk_size)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    try:
+        rescore_stream(islice(cycle(pool), min(rows, BENCH_TRACE_ROWS)), _NullSink(), chunk_size)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {'rows': stats['rows'], 'seconds': round(elapsed, 3),
+            'rowsPerSecond': round(stats['rows'] / elapsed if elapsed else 0.0, 1), 'peakBytes': peak}
+
+def run_benchmarks(macro_rows: Sequence[int] = BENCH_MACRO_ROWS, seed: int = BENCH_SEED,
+                   runs: int = BENCH_REPEAT, min_time: float = BENCH_MIN_TIME) -> Dict[str, Any]:
+    return {
+        'python': sys.version.split()[0],
+        'platform': sys.platform,
+        'seed': seed,
+        'micro': bench_micro(runs, min_time),
+        'macro': {str(rows): bench_macro(rows, seed) for rows in macro_rows},
+    }
+
+def bench_metrics(results: Dict[str, Any]) -> Dict[str, Tuple[float, bool]]:
+    """Flatten a benchmark report to metric -> (value, higher is better)."""
+    metrics = {f'micro.{name}.nsPerOp': (ns, False) for name, ns in results.get('micro', {}).items()}
+    for rows, macro in results.get('macro', {}).items():
+        metrics[f'macro.{rows}.rowsPerSecond'] = (macro['rowsPerSecond'], True)
+        metrics[f'macro.{rows}.peakBytes'] = (macro['peakBytes'], False)
+    return metrics
+
+def compare_bench(baseline: Dict[str, Any], current: Dict[str, Any],
+                  tolerance: float = BENCH_TOLERANCE) -> List[Dict[str, Any]]:
+    """Metrics present in both reports that got worse by more than tolerance (relative)."""
+    before = bench_metrics(baseline)
+    regressions = []
+    for metric, (value, higher_better) in bench_metrics(current).items():
+        if metric not in before or not before[metric][0]:
+            continue
+        old = before[metric][0]
+        change = (value - old) / old
+        if (-change if higher_better else change) > tolerance:
+            regressions.append({'metric': metric, 'baseline': old, 'current': value, 'change': round(change, 4)})
+    return regressions
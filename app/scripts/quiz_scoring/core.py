@@ -0,0 +1,380 @@
+"""Reference scoring: question constants (matching questions.ts), per-section scores and the joint-probability archetype."""
+
+import math
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple, Any
+
+REVERSE_QUESTIONS = frozenset(['C2', 'C4', 'EA2', 'EA4', 'BA3'])
+
+ATTACHMENT_QUESTIONS = {
+    'secure': ['S1', 'S2', 'S3'],
+    'anxious': ['AX1', 'AX2', 'AX3'],
+    'avoidant': ['AV1', 'AV2', 'AV3'],
+    'disorganized': ['D1', 'D2', 'D3'],
+}
+ATTACHMENT_ORDER = ['secure', 'anxious', 'avoidant', 'disorganized']
+
+COMMUNICATION_QUESTIONS = {
+    'passive': ['COM_PASSIVE_1', 'COM_PASSIVE_2'],
+    'aggressive': ['COM_AGGRESSIVE_1', 'COM_AGGRESSIVE_2'],
+    'passive_aggressive': ['COM_PAGG_1', 'COM_PAGG_2'],
+    'assertive': ['COM_ASSERTIVE_1', 'COM_ASSERTIVE_2'],
+}
+COMMUNICATION_ORDER = ['passive', 'aggressive', 'passive_aggressive', 'assertive']
+SCENARIO_KEY_MAP = {'A': 'passive', 'B': 'aggressive', 'C': 'passive_aggressive', 'D': 'assertive'}
+SCENARIO_QUESTION = 'COM_SCENARIO_1'
+
+CONFIDENCE_QUESTIONS = ['C1', 'C2', 'C3', 'C4', 'C5']
+EMOTIONAL_QUESTIONS = ['EA1', 'EA2', 'EA3', 'EA4', 'EA5']
+INTIMACY_COMFORT = ['IC1', 'IC2', 'IC3']
+INTIMACY_BOUNDARY = ['BA1', 'BA2', 'BA3']
+
+LOVE_LANGUAGE_QUESTIONS = {
+    'words': ('LL1', 'LL2'),
+    'time': ('LL3', 'LL4'),
+    'service': ('LL5', 'LL6'),
+    'gifts': ('LL7', 'LL8'),
+    'touch': ('LL9', 'LL10'),
+}
+LOVE_LANGUAGE_ORDER = ['words', 'time', 'service', 'gifts', 'touch']
+
+CONFIDENCE_THRESHOLD = 60
+SCENARIO_BONUS = 25
+
+# Joint-probability archetype selection (matching joint-probability.ts)
+EPSILON = 0.005
+MAX_ENTROPY_4 = 2.0
+BALANCED_THRESHOLD = 0.9
+ATTACHMENT_PRIORITY = ['secure', 'anxious', 'avoidant', 'disorganized']
+COMMUNICATION_PRIORITY = ['assertive', 'passive', 'aggressive', 'passive_aggressive']
+
+# matching data/archetypes/matrix.ts
+ARCHETYPE_MATRIX = {
+    'secure': {
+        'assertive': 'golden-partner',
+        'passive': 'gentle-peacekeeper',
+        'aggressive': 'direct-director',
+        'passive_aggressive': 'playful-tease',
+    },
+    'anxious': {
+        'assertive': 'open-book',
+        'passive': 'selfless-giver',
+        'aggressive': 'fiery-pursuer',
+        'passive_aggressive': 'mind-reader',
+    },
+    'avoidant': {
+        'assertive': 'solo-voyager',
+        'passive': 'quiet-ghost',
+        'aggressive': 'iron-fortress',
+        'passive_aggressive': 'cool-mystery',
+    },
+    'disorganized': {
+        'assertive': 'self-aware-alchemist',
+        'passive': 'chameleon',
+        'aggressive': 'wild-storm',
+        'passive_aggressive': 'labyrinth',
+    },
+}
+
+# =============================================================================
+# CORE FUNCTIONS
+# =============================================================================
+
+def normalize(raw: float) -> int:
+    """Convert 1-5 scale to 0-100, rounding halves up like Math.round."""
+    scaled = ((raw - 1) / 4) * 100
+    floor = math.floor(scaled)
+    return floor + 1 if scaled - floor >= 0.5 else floor
+
+def get_value(responses: Dict[str, int], qid: str) -> Optional[float]:
+    """Get response value with reverse scoring applied."""
+    if qid not in responses:
+        return None
+    val = responses[qid]
+    return (6 - val) if qid in REVERSE_QUESTIONS else val
+
+def average(values: List[float]) -> float:
+    """Calculate average of non-empty list."""
+    return sum(values) / len(values) if values else 0
+
+# =============================================================================
+# SCORING FUNCTIONS
+# =============================================================================
+
+def score_attachment(responses: Dict[str, int]) -> Dict[str, Any]:
+    """Score attachment dimensions, return scores dict and primary."""
+    scores = {}
+    for dim in ATTACHMENT_ORDER:
+        qids = ATTACHMENT_QUESTIONS[dim]
+        values = [v for qid in qids if (v := get_value(responses, qid)) is not None]
+        scores[dim] = normalize(average(values)) if values else 0
+
+    # Primary: highest score, tie goes to first in order
+    primary = max(ATTACHMENT_ORDER, key=lambda d: scores[d])
+    return {'scores': scores, 'primary': primary}
+
+def score_communication(responses: Dict[str, int], scenario_key: Optional[str] = None) -> Dict[str, Any]:
+    """Score communication styles with scenario bonus."""
+    scores = {}
+    for style in COMMUNICATION_ORDER:
+        qids = COMMUNICATION_QUESTIONS[style]
+        values = [v for qid in qids if (v := get_value(responses, qid)) is not None]
+        scores[style] = normalize(average(values)) if values else 0
+
+    # Apply scenario bonus
+    if scenario_key and scenario_key in SCENARIO_KEY_MAP:
+        style = SCENARIO_KEY_MAP[scenario_key]
+        scores[style] = min(100, scores[style] + SCENARIO_BONUS)
+
+    # Primary: highest score, tie goes to first in order
+    primary = max(COMMUNICATION_ORDER, key=lambda s: scores[s])
+    return {'scores': scores, 'primary': primary}
+
+def score_confidence(responses: Dict[str, int]) -> int:
+    """Score confidence (C2, C4 reversed)."""
+    values = [v for qid in CONFIDENCE_QUESTIONS if (v := get_value(responses, qid)) is not None]
+    return normalize(average(values)) if values else 0
+
+def score_emotional(responses: Dict[str, int]) -> int:
+    """Score emotional availability (EA2, EA4 reversed)."""
+    values = [v for qid in EMOTIONAL_QUESTIONS if (v := get_value(responses, qid)) is not None]
+    return normalize(average(values)) if values else 0
+
+def score_intimacy(responses: Dict[str, int]) -> Dict[str, int]:
+    """Score intimacy comfort and boundaries (BA3 reversed)."""
+    comfort_vals = [v for qid in INTIMACY_COMFORT if (v := get_value(responses, qid)) is not None]
+    boundary_vals = [v for qid in INTIMACY_BOUNDARY if (v := get_value(responses, qid)) is not None]
+    return {
+        'comfort': normalize(average(comfort_vals)) if comfort_vals else 0,
+        'boundaries': normalize(average(boundary_vals)) if boundary_vals else 0,
+    }
+
+def score_love_languages(responses: Dict[str, int]) -> Dict[str, Any]:
+    """Score love languages with give/receive breakdown."""
+    scores = {}
+    give_receive = {}
+
+    for lang in LOVE_LANGUAGE_ORDER:
+        give_qid, receive_qid = LOVE_LANGUAGE_QUESTIONS[lang]
+        give_val = get_value(responses, give_qid)
+        receive_val = get_value(responses, receive_qid)
+
+        give_receive[lang] = {
+            'give': normalize(give_val) if give_val else 0,
+            'receive': normalize(receive_val) if receive_val else 0,
+        }
+
+        values = [v for v in [give_val, receive_val] if v is not None]
+        scores[lang] = normalize(average(values)) if values else 0
+
+    # Rank by combined score (stable sort, highest first)
+    ranked = sorted(LOVE_LANGUAGE_ORDER, key=lambda l: scores[l], reverse=True)
+
+    return {'ranked': ranked, 'scores': scores, 'giveReceive': give_receive}
+
+def get_archetype(attachment: str, communication: str, confidence: int) -> str:
+    """Determine archetype from attachment, communication, and confidence.
+
+    Legacy decision tree; the app now selects archetypes with compute_archetype.
+    """
+    high_conf = confidence >= CONFIDENCE_THRESHOLD
+
+    if attachment == 'secure':
+        return 'confident-anchor' if (communication == 'assertive' or high_conf) else 'steady-connector'
+    if attachment == 'anxious':
+        return 'devoted-romantic' if high_conf else 'careful-romantic'
+    if attachment == 'avoidant':
+        return 'independent-spirit' if (high_conf or communication == 'assertive') else 'private-protector'
+    if attachment == 'disorganized':
+        return 'complex-soul' if high_conf else 'searching-soul'
+
+    # Communication-based fallbacks
+    return {
+        'passive': 'diplomatic-dater',
+        'aggressive': 'fiery-heart',
+        'passive_aggressive': 'subtle-communicator',
+        'assertive': 'clear-voice',
+    }.get(communication, 'steady-connector')
+
+def score_responses(responses: Dict[str, int], scenario_key: Optional[str] = None) -> Dict[str, Any]:
+    """Score every section of one response dict."""
+    return {
+        'attachment': score_attachment(responses),
+        'communication': score_communication(responses, scenario_key),
+        'confidence': score_confidence(responses),
+        'emotional': score_emotional(responses),
+        'intimacy': score_intimacy(responses),
+        'loveLanguages': score_love_languages(responses),
+    }
+
+# =============================================================================
+# JOINT-PROBABILITY ARCHETYPE
+# =============================================================================
+
+# The 16 (attachment, communication) cells; list position is the tie-break priority
+ARCHETYPE_CELLS = [(a, c) for a in ATTACHMENT_PRIORITY for c in COMMUNICATION_PRIORITY]
+ARCHETYPE_SLUGS = [ARCHETYPE_MATRIX[a][c] for a, c in ARCHETYPE_CELLS]
+
+def probabilities(scores: Sequence[float]) -> List[float]:
+    """Normalize scores to a distribution, uniform if the sum is not positive."""
+    total = sum(scores)
+    if total <= 0:
+        return [1 / len(scores)] * len(scores)
+    return [s / total for s in scores]
+
+def entropy(probs: Sequence[float]) -> float:
+    """Shannon entropy in bits (0 = peaked, 2.0 = uniform over 4)."""
+    return -sum(p * math.log2(p) for p in probs if p > 0)
+
+def _v8_sort(items: List[Any], compare) -> List[Any]:
+    """Sort in place exactly as V8's Array.prototype.sort does for arrays under 64 items.
+
+    The archetype comparator is not transitive inside EPSILON, so the winner depends
+    on the comparison sequence. V8's TimSort handles short arrays as one run
+    (CountAndMakeRun) extended by binary insertion sort; this mirrors both steps.
+    """
+    n = len(items)
+    if n < 2:
+        return items
+
+    run = 2
+    descending = compare(items[1], items[0]) < 0
+    while run < n:
+        order = compare(items[run], items[run - 1])
+        if (order >= 0) if descending else (order < 0):
+            break
+        run += 1
+    if descending:
+        items[:run] = items[run - 1::-1]
+
+    for start in range(run, n):
+        pivot = items[start]
+        left, right = 0, start
+        while left < right:
+            mid = left + ((right - left) >> 1)
+            if compare(pivot, items[mid]) < 0:
+                right = mid
+            else:
+                left = mid + 1
+        items[left + 1:start + 1] = items[left:start]
+        items[left] = pivot
+    return items
+
+def _compare_cells(a: Tuple[float, int], b: Tuple[float, int]) -> float:
+    """Joint descending; within EPSILON the lower priority index wins."""
+    diff = b[0] - a[0]
+    if abs(diff) < EPSILON:
+        return a[1] - b[1]
+    return diff
+
+def _winning_cell(joints: List[float], epsilon: float = EPSILON) -> int:
+    """Index into ARCHETYPE_CELLS of the cell computeArchetypeByProbability selects."""
+    # Cells within EPSILON of the best are pairwise tied, so they compare by priority.
+    # If every other cell is at least EPSILON below all of them, every comparison is
+    # consistent and the sort puts the highest-priority tied cell first.
+    best = max(joints)
+    tied_low = best
+    rest_high = -1.0
+    top = -1
+    for i, j in enumerate(joints):
+        if best - j < epsilon or j == best:
+            if top < 0:
+                top = i
+            if j < tied_low:
+                tied_low = j
+        elif j > rest_high:
+            rest_high = j
+    if tied_low - rest_high >= epsilon:
+        return top
+
+    # _v8_sort with _compare_cells inlined over cell indices (index == priority)
+    n = len(joints)
+    order = list(range(n))
+    d = joints[0] - joints[1]
+    descending = False if -epsilon < d < epsilon else d < 0
+    run = 2
+    while run < n:
+        cur, prev = order[run], order[run - 1]
+        d = joints[prev] - joints[cur]
+        before = (cur < prev) if -epsilon < d < epsilon else (d < 0)
+        if before != descending:
+            break
+        run += 1
+    if descending:
+        order[:run] = order[run - 1::-1]
+    for start in range(run, n):
+        pivot = order[start]
+        value = joints[pivot]
+        left, right = 0, start
+        while left < right:
+            mid = (left + right) >> 1
+            other = order[mid]
+            d = joints[other] - value
+            if (pivot < other) if -epsilon < d < epsilon else (d < 0):
+                right = mid
+            else:
+                left = mid + 1
+        if left != start:
+            order.insert(left, order.pop(start))
+    return order[0]
+
+def _archetype_from_priority_scores(attachment: Tuple[int, ...], communication: Tuple[int, ...]) -> Tuple[str, float, bool]:
+    """Archetype from scores already in ATTACHMENT_PRIORITY / COMMUNICATION_PRIORITY order."""
+    p_attach = probabilities(attachment)
+    p_comm = probabilities(communication)
+    joints = [pa * pc for pa in p_attach for pc in p_comm]
+    winner = _winning_cell(joints)
+
+    attach_entropy = entropy(p_attach)
+    comm_entropy = entropy(p_comm)
+    confidence = 1 - (attach_entropy + comm_entropy) / (2 * MAX_ENTROPY_4)
+    is_balanced = (attach_entropy > BALANCED_THRESHOLD * MAX_ENTROPY_4
+                   and comm_entropy > BALANCED_THRESHOLD * MAX_ENTROPY_4)
+    return ARCHETYPE_SLUGS[winner], confidence, is_balanced
+
+def axis_summary(scores: Sequence[int]) -> Tuple[int, float, float, List[float]]:
+    """(top index, top probability, runner-up probability, probabilities) of one axis in priority order."""
+    probs = probabilities(scores)
+    ranked = sorted(probs, reverse=True)
+    return probs.index(ranked[0]), ranked[0], ranked[1], probs
+
+def _winner_from_axes(attachment: Tuple[int, float, float, List[float]],
+                      communication: Tuple[int, float, float, List[float]], epsilon: float = EPSILON) -> int:
+    """_winning_cell from two axis_summary results, skipping the sort when one cell is clear."""
+    a_top, a1, a2, a_probs = attachment
+    c_top, c1, c2, c_probs = communication
+    # Same products _winning_cell compares: a unique best cell epsilon clear of
+    # every other joint wins outright, so only near-ties need the full sort
+    if a1 * c1 - max(a1 * c2, a2 * c1) >= epsilon:
+        return a_top * len(c_probs) + c_top
+    return _winning_cell([pa * pc for pa in a_probs for pc in c_probs], epsilon)
+
+def compute_archetype(attachment_scores: Dict[str, int], communication_scores: Dict[str, int]) -> Dict[str, Any]:
+    """Port of computeArchetypeByProbability: slug, confidence and isBalanced."""
+    slug, confidence, is_balanced = _archetype_from_priority_scores(
+        tuple(attachment_scores.get(d, 0) for d in ATTACHMENT_PRIORITY),
+        tuple(communication_scores.get(s, 0) for s in COMMUNICATION_PRIORITY),
+    )
+    return {'slug': slug, 'confidence': confidence, 'isBalanced': is_balanced}
+
+def compute_archetype_batch(attachment_scores: Dict[str, Sequence[int]],
+                            communication_scores: Dict[str, Sequence[int]]) -> Dict[str, Any]:
+    """Archetype for every row of score_batch-style score columns.
+
+    Rows sharing the same score tuples are evaluated once; real corpora repeat
+    a small number of tuples heavily.
+    """
+    attach_rows = zip(*(attachment_scores[d] for d in ATTACHMENT_PRIORITY))
+    comm_rows = zip(*(communication_scores[s] for s in COMMUNICATION_PRIORITY))
+    slugs: List[str] = []
+    confidence = array('d')
+    balanced: List[bool] = []
+    seen: Dict[Tuple[Tuple[int, ...], Tuple[int, ...]], Tuple[str, float, bool]] = {}
+    for key in zip(attach_rows, comm_rows):
+        result = seen.get(key)
+        if result is None:
+            result = seen[key] = _archetype_from_priority_scores(*key)
+        slugs.append(result[0])
+        confidence.append(result[1])
+        balanced.append(result[2])
+    return {'slug': slugs, 'confidence': confidence, 'isBalanced': balanced}
@@ -0,0 +1,252 @@
+"""Columnar corpus: a memory-mapped re-analysis format for exports."""
+
+import json
+import mmap
+import multiprocessing
+import os
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from io import StringIO
+from typing import Dict, IO, Iterable, Iterator, List, Optional, Tuple, Any
+
+from .profiling import PROFILER
+from .batch import (
+    BATCH_COLUMNS, PLAN, RECORD_WIDTH, SCENARIO_CODES, SCENARIO_COLUMN, CompactResponse, ScoringPlan, pack_answers,
+    _score_blob,
+)
+from .rescore import (
+    PASSTHROUGH_COLUMNS, RESCORE_CHUNK_SIZE, SHARDS_PER_WORKER, STAGE_NAMES, _WORKER_STATE, RescoreChunk,
+    _archetype_stage, _init_worker, _parse_stage, _read_chunks, row_answers, _serialize_stage, summarize_workers,
+    _worker_stats,
+)
+
+CORPUS_FORMAT = 2
+CORPUS_MANIFEST = 'manifest.json'
+# Row-major uint8 Likert matrix in BATCH_COLUMNS order (MISSING if unanswered)
+CORPUS_ANSWERS = 'answers.u8'
+# One SCENARIO_CODES byte per row
+CORPUS_SCENARIO = 'scenario.u8'
+# Latest answer timestamp per row (epoch ms, int64)
+CORPUS_TIMESTAMPS = 'timestamps.i64'
+# Passthrough columns (id, public_slug, ...) as JSON lines, with int64 line offsets;
+# a row without usable answers keeps its place with an "error" marker and an empty record
+CORPUS_INDEX = 'index.jsonl'
+CORPUS_INDEX_OFFSETS = 'index.i64'
+
+def _latest_timestamp(answers: Dict[str, Any]) -> int:
+    stamps = [entry.get('t') for entry in answers.values() if isinstance(entry, dict)]
+    return max((t for t in stamps if type(t) is int), default=0)
+
+def build_corpus(lines: Iterable[bytes], directory: str, chunk_size: int = RESCORE_CHUNK_SIZE) -> Dict[str, Any]:
+    """Convert a quiz_results JSONL export into a columnar corpus directory.
+
+    Rows without usable answers keep their place as an empty record whose
+    index entry carries the error, so rescoring the corpus gives the same
+    lines as rescoring the export; the manifest lists them under errorRows.
+    The manifest is written last, so a directory without one is an
+    interrupted build.
+    """
+    os.makedirs(directory, exist_ok=True)
+    manifest_path = os.path.join(directory, CORPUS_MANIFEST)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+    width = len(BATCH_COLUMNS)
+    dumps = json.JSONEncoder(separators=(',', ':')).encode
+    rows = offset = 0
+    error_rows: List[int] = []
+    empty = bytes(RECORD_WIDTH)
+
+    def open_column(name: str) -> IO[bytes]:
+        return open(os.path.join(directory, name), 'wb')
+
+    with open_column(CORPUS_ANSWERS) as answers_f, open_column(CORPUS_SCENARIO) as scenario_f, \
+            open_column(CORPUS_TIMESTAMPS) as stamps_f, open_column(CORPUS_INDEX) as index_f, \
+            open_column(CORPUS_INDEX_OFFSETS) as offsets_f:
+        offsets = array('q', [0])
+        for chunk in map(_parse_stage, _read_chunks(lines, chunk_size)):
+            matrix = bytearray()
+            scenario = bytearray()
+            stamps = array('q')
+            index = []
+            for i, row in enumerate(chunk.rows):
+                answers = None if i in chunk.errors else row_answers(row)
+                passthrough = {col: row[col] for col in PASSTHROUGH_COLUMNS if col in row}
+                if answers is None:
+                    passthrough['error'] = chunk.errors.get(i, 'missing answers')
+                    error_rows.append(rows + i)
+                    record = empty
+                else:
+                    record = pack_answers(answers)
+                matrix += record[:width]
+                scenario.append(record[SCENARIO_COLUMN])
+                stamps.append(_latest_timestamp(answers) if answers is not None else 0)
+                line = dumps(passthrough).encode() + b'\n'
+                index.append(line)
+                offset += len(line)
+                offsets.append(offset)
+            answers_f.write(matrix)
+            scenario_f.write(scenario)
+            stamps.tofile(stamps_f)
+            index_f.writelines(index)
+            offsets.tofile(offsets_f)
+            del offsets[:]
+            rows += len(stamps)
+
+    manifest = {'format': CORPUS_FORMAT, 'rows': rows, 'errors': len(error_rows), 'errorRows': error_rows,
+                'columns': list(BATCH_COLUMNS), 'scenarioCodes': SCENARIO_CODES, 'byteorder': sys.byteorder}
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+class Corpus:
+    """Read-only view of a columnar corpus; every column is an mmap shared through the page cache."""
+
+    def __init__(self, directory: str):
+        with open(os.path.join(directory, CORPUS_MANIFEST), encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        if self.manifest.get('format') != CORPUS_FORMAT:
+            raise ValueError(f"unsupported corpus format {self.manifest.get('format')!r}")
+        if self.manifest['columns'] != list(BATCH_COLUMNS) or self.manifest['scenarioCodes'] != SCENARIO_CODES:
+            raise ValueError('corpus was built for a different question set; rebuild it')
+        if self.manifest['byteorder'] != sys.byteorder:
+            raise ValueError(f"corpus timestamps are {self.manifest['byteorder']}-endian")
+        self.directory = directory
+        self.rows: int = self.manifest['rows']
+        self.error_rows: List[int] = self.manifest['errorRows']
+        self.width = len(BATCH_COLUMNS)
+        self._maps: List[mmap.mmap] = []
+        self.answers = self._map(CORPUS_ANSWERS, self.rows * self.width)
+        self.scenario = self._map(CORPUS_SCENARIO, self.rows)
+        self.timestamps = self._map(CORPUS_TIMESTAMPS, self.rows * 8).cast('q')
+        self._offsets = self._map(CORPUS_INDEX_OFFSETS, (self.rows + 1) * 8).cast('q')
+        self._index = self._map(CORPUS_INDEX, self._offsets[self.rows] if self.rows else 0)
+
+    def _map(self, name: str, size: int) -> memoryview:
+        with open(os.path.join(self.directory, name), 'rb') as f:
+            if os.fstat(f.fileno()).st_size != size:
+                raise ValueError(f'{name} is not {size} bytes; the corpus is truncated')
+            if not size:
+                return memoryview(b'')
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(mapped)
+        return memoryview(mapped)
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __enter__(self) -> 'Corpus':
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the maps; views handed out earlier must be released first."""
+        for view in (self.answers, self.scenario, self.timestamps, self._offsets, self._index):
+            view.release()
+        for mapped in self._maps:
+            mapped.close()
+        self._maps = []
+
+    def _bounds(self, start: int, end: Optional[int]) -> Tuple[int, int]:
+        end = self.rows if end is None else min(end, self.rows)
+        return max(0, min(start, end)), end
+
+    def matrix(self, start: int = 0, end: Optional[int] = None) -> memoryview:
+        """Zero-copy view of the answer matrix rows [start, end)."""
+        start, end = self._bounds(start, end)
+        return self.answers[start * self.width:end * self.width]
+
+    def scenario_codes(self, start: int = 0, end: Optional[int] = None) -> memoryview:
+        start, end = self._bounds(start, end)
+        return self.scenario[start:end]
+
+    def index(self, start: int = 0, end: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Passthrough columns for rows [start, end), decoded from the sidecar."""
+        start, end = self._bounds(start, end)
+        return [json.loads(line) for line in
+                bytes(self._index[self._offsets[start]:self._offsets[end]]).splitlines()]
+
+    def errors(self, start: int = 0, end: Optional[int] = None) -> List[int]:
+        """Offsets (relative to start) of the error rows in [start, end)."""
+        start, end = self._bounds(start, end)
+        return [row - start for row in self.error_rows[bisect_left(self.error_rows, start):
+                                                        bisect_left(self.error_rows, end)]]
+
+    def valid(self, start: int = 0, end: Optional[int] = None) -> Tuple[bytes, bytes]:
+        """(answer matrix, scenario codes) for rows [start, end) without the error rows."""
+        start, end = self._bounds(start, end)
+        matrix, scenario = bytes(self.matrix(start, end)), bytes(self.scenario_codes(start, end))
+        bad = self.errors(start, end)
+        if not bad:
+            return matrix, scenario
+        keep = sorted(set(range(end - start)).difference(bad))
+        w = self.width
+        return b''.join(matrix[i * w:(i + 1) * w] for i in keep), bytes(scenario[i] for i in keep)
+
+    def record(self, row: int) -> CompactResponse:
+        return CompactResponse(bytes(self.matrix(row, row + 1)) + bytes(self.scenario_codes(row, row + 1)))
+
+    def score(self, start: int = 0, end: Optional[int] = None, plan: ScoringPlan = PLAN) -> Dict[str, Any]:
+        """score_batch for rows [start, end), read straight from the maps."""
+        return _score_blob(bytes(self.matrix(start, end)), self.width,
+                           bytes(self.scenario_codes(start, end)), plan)
+
+def _corpus_chunks(corpus: Corpus, start: int, end: int, chunk_size: int) -> Iterator[RescoreChunk]:
+    for lo in range(start, end, chunk_size):
+        hi = min(lo + chunk_size, end)
+        chunk = RescoreChunk([])
+        with PROFILER.span('parse'):
+            chunk.rows = corpus.index(lo, hi)
+            chunk.errors = {i: chunk.rows[i].pop('error') for i in corpus.errors(lo, hi)}
+        with PROFILER.span('score'):
+            chunk.batch = corpus.score(lo, hi)
+        yield chunk
+
+def _rescore_corpus_range(corpus: Corpus, start: int, end: int, chunk_size: int, out: IO[str]) -> Tuple[int, int]:
+    rows = errors = 0
+    chunks = _corpus_chunks(corpus, start, end, chunk_size)
+    for stage in (_archetype_stage, _serialize_stage):
+        chunks = map(PROFILER.wrap(STAGE_NAMES[stage], stage), chunks)
+    for chunk in chunks:
+        out.write(chunk.output)
+        rows += chunk.output.count('\n')
+        errors += len(chunk.errors)
+    return rows, errors
+
+def _init_corpus_worker(directory: str, chunk_size: int) -> None:
+    _init_worker(chunk_size, False)
+    _WORKER_STATE['corpus'] = Corpus(directory)
+
+def _rescore_corpus_task(bounds: Tuple[int, int]) -> Tuple[str, Dict[str, Any]]:
+    began = time.perf_counter()
+    buffer = StringIO()
+    rows, errors = _rescore_corpus_range(_WORKER_STATE['corpus'], bounds[0], bounds[1],
+                                         _WORKER_STATE['chunk_size'], buffer)
+    return buffer.getvalue(), _worker_stats(rows, errors, began)
+
+def rescore_corpus(directory: str, out: IO[str], workers: int = 1,
+                   chunk_size: int = RESCORE_CHUNK_SIZE) -> Dict[str, Any]:
+    """Rescore a columnar corpus to the same NDJSON as rescore_stream, skipping JSON decoding of answers.
+
+    With workers > 1 each process maps the corpus itself and scores row
+    ranges; output stays in corpus order.
+    """
+    with Corpus(directory) as corpus:
+        rows = len(corpus)
+        if workers <= 1:
+            rows, errors = _rescore_corpus_range(corpus, 0, rows, chunk_size, out)
+            return {'rows': rows, 'errors': errors}
+
+    step = max(chunk_size, -(-rows // (workers * SHARDS_PER_WORKER)))
+    tasks = [(lo, min(lo + step, rows)) for lo in range(0, rows, step)]
+    shard_stats = []
+    with multiprocessing.Pool(workers, initializer=_init_corpus_worker, initargs=(directory, chunk_size)) as pool:
+        for text, stats in pool.imap(_rescore_corpus_task, tasks):
+            out.write(text)
+            shard_stats.append(stats)
+    return {'rows': sum(s['rows'] for s in shard_stats), 'errors': sum(s['errors'] for s in shard_stats),
+            'shards': len(shard_stats),
+            'workers': summarize_workers(shard_stats)}
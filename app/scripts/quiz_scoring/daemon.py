@@ -0,0 +1,195 @@
+"""Scoring daemon: micro-batched NDJSON over a Unix socket or localhost port."""
+
+import asyncio
+import json
+import os
+import signal
+import stat
+import sys
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple, Any
+
+from .core import compute_archetype_batch
+from .batch import PLAN, ScoringPlan, batch_row_result, pack_answers, score_packed
+from .incremental import percentile
+from .rescore import to_db_scores
+
+# Requests arriving within this window are scored as one batch
+SERVE_BATCH_WINDOW = 0.002
+SERVE_BATCH_MAX = 512
+# Latency percentiles cover this many most recent answers
+SERVE_LATENCY_WINDOW = 10_000
+# Longest request line accepted (a batch of DBAnswerMaps is one line)
+SERVE_LINE_LIMIT = 16 * 1024 * 1024
+
+class MicroBatcher:
+    """Collects answer records for up to `window` seconds and scores them in one score_packed call."""
+
+    def __init__(self, window: float = SERVE_BATCH_WINDOW, max_batch: int = SERVE_BATCH_MAX,
+                 plan: ScoringPlan = PLAN):
+        self.window = window
+        self.max_batch = max_batch
+        self.plan = plan
+        self._pending: List[Tuple[bytes, Any, float]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.requests = 0
+        self.batches = 0
+        self.latencies: deque = deque(maxlen=SERVE_LATENCY_WINDOW)
+
+    def submit(self, record: bytes) -> 'asyncio.Future[Dict[str, Any]]':
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((record, future, time.perf_counter()))
+        if len(self._pending) >= self.max_batch:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self.flush)
+        return future
+
+    def flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        batch = score_packed([record for record, _, _ in pending], self.plan)
+        archetypes = compute_archetype_batch(batch['attachment']['scores'], batch['communication']['scores'])
+        done = time.perf_counter()
+        for i, (_, future, began) in enumerate(pending):
+            if not future.cancelled():
+                future.set_result({
+                    'scores': to_db_scores(batch_row_result(batch, i)),
+                    'archetype': {'slug': archetypes['slug'][i], 'confidence': archetypes['confidence'][i],
+                                  'isBalanced': archetypes['isBalanced'][i]},
+                })
+            self.latencies.append(done - began)
+        self.requests += len(pending)
+        self.batches += 1
+
+    def stats(self) -> Dict[str, Any]:
+        latencies = sorted(self.latencies)
+        return {
+            'requests': self.requests,
+            'batches': self.batches,
+            'meanBatch': round(self.requests / self.batches, 2) if self.batches else 0,
+            'p50Ms': round(percentile(latencies, 50) * 1000, 3),
+            'p99Ms': round(percentile(latencies, 99) * 1000, 3),
+            'maxMs': round(latencies[-1] * 1000, 3) if latencies else 0,
+        }
+
+def parse_address(address: str) -> Tuple[str, Any]:
+    """'unix:/path', a path, or 'host:port' -> ('unix', path) or ('tcp', (host, port))."""
+    if address.startswith('unix:'):
+        return 'unix', address[5:]
+    host, sep, port = address.rpartition(':')
+    if sep and port.isdigit() and '/' not in address:
+        return 'tcp', (host or '127.0.0.1', int(port))
+    return 'unix', address
+
+class ScoringDaemon:
+    """Long-running scorer for shadow verification of live API scoring.
+
+    Each line is a JSON request and gets one JSON response line, in request
+    order per connection, so clients may pipeline freely:
+
+        {"id": 1, "answers": {DBAnswerMap}}      -> {"id": 1, "scores": {...}, "archetype": {...}}
+        {"id": 2, "batch": [{DBAnswerMap}, ...]} -> {"id": 2, "results": [...]}
+        {"id": 3, "op": "stats"}                 -> {"id": 3, "stats": {...}}
+
+    Answers from every connection share one MicroBatcher, so concurrent
+    requests reach the vectorized path together.
+    """
+
+    def __init__(self, window: float = SERVE_BATCH_WINDOW, max_batch: int = SERVE_BATCH_MAX):
+        self.batcher = MicroBatcher(window, max_batch)
+        self.connections = 0
+        self.errors = 0
+
+    async def start(self, address: str) -> Any:
+        kind, target = parse_address(address)
+        if kind == 'tcp':
+            return await asyncio.start_server(self.handle, target[0], target[1], limit=SERVE_LINE_LIMIT)
+        if os.path.exists(target) and stat.S_ISSOCK(os.stat(target).st_mode):
+            os.unlink(target)  # stale socket from a previous run
+        return await asyncio.start_unix_server(self.handle, target, limit=SERVE_LINE_LIMIT)
+
+    def _submit(self, answers: Any) -> Any:
+        if not isinstance(answers, dict):
+            raise ValueError('answers must be a DBAnswerMap object')
+        try:
+            return self.batcher.submit(pack_answers(answers))
+        except (AttributeError, TypeError):
+            raise ValueError('answers entries must be {v, t, k} objects')
+
+    def request(self, line: bytes) -> Tuple[Any, Any]:
+        """(request id, response dict or awaitable of one) for one request line."""
+        try:
+            message = json.loads(line)
+        except ValueError as e:
+            return None, {'error': f'invalid JSON: {e}'}
+        if not isinstance(message, dict):
+            return None, {'error': 'request must be a JSON object'}
+        ident = message.get('id')
+        try:
+            if message.get('op') == 'stats':
+                return ident, {'stats': dict(self.batcher.stats(), connections=self.connections, errors=self.errors)}
+            if 'batch' in message:
+                if not isinstance(message['batch'], list):
+                    raise ValueError('batch must be a list of DBAnswerMaps')
+                return ident, asyncio.gather(*map(self._submit, message['batch']))
+            if 'answers' in message:
+                return ident, self._submit(message['answers'])
+            raise ValueError("request needs 'answers', 'batch' or 'op'")
+        except ValueError as e:
+            return ident, {'error': str(e)}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        responses: asyncio.Queue = asyncio.Queue()
+        dumps = json.JSONEncoder(separators=(',', ':')).encode
+
+        async def respond() -> None:
+            while True:
+                item = await responses.get()
+                if item is None:
+                    return
+                ident, response = item
+                if not isinstance(response, dict):
+                    response = await response
+                    if isinstance(response, list):
+                        response = {'results': response}
+                if 'error' in response:
+                    self.errors += 1
+                writer.write((dumps(dict({'id': ident}, **response)) + '\n').encode())
+                await writer.drain()
+
+        sender = asyncio.get_running_loop().create_task(respond())
+        try:
+            async for line in reader:
+                if line.strip():
+                    responses.put_nowait(self.request(line))
+        except (ConnectionError, ValueError):
+            pass  # client went away or sent an over-long line; answer what was already read
+        finally:
+            responses.put_nowait(None)
+            try:
+                await sender
+            except ConnectionError:
+                pass
+            writer.close()
+
+async def serve(address: str, window: float = SERVE_BATCH_WINDOW) -> None:
+    daemon = ScoringDaemon(window)
+    server = await daemon.start(address)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    print(f'scoring daemon listening on {address}', file=sys.stderr)
+    try:
+        async with server:
+            await stop.wait()
+    finally:
+        print(json.dumps(daemon.batcher.stats()), file=sys.stderr)
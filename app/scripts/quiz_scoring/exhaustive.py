@@ -0,0 +1,261 @@
+"""Exhaustive verification of the archetype space."""
+
+import json
+import math
+import multiprocessing
+import time
+from bisect import bisect_left
+from itertools import product
+from typing import Dict, IO, List, Optional, Sequence, Tuple, Any
+
+from .core import (
+    ARCHETYPE_CELLS, ARCHETYPE_SLUGS, ATTACHMENT_ORDER, ATTACHMENT_PRIORITY, ATTACHMENT_QUESTIONS, BALANCED_THRESHOLD,
+    COMMUNICATION_ORDER, COMMUNICATION_PRIORITY, COMMUNICATION_QUESTIONS, EPSILON, MAX_ENTROPY_4, REVERSE_QUESTIONS,
+    SCENARIO_BONUS, SCENARIO_KEY_MAP, entropy, normalize, probabilities, _winning_cell,
+)
+
+ANSWER_VALUES = (1, 2, 3, 4, 5)
+# Keeps the analytic clear-winner test away from float rounding at EPSILON
+CLEAR_WINNER_TOLERANCE = 1e-12
+SCENARIO_OPTIONS: List[Optional[str]] = [None] + list(SCENARIO_KEY_MAP)
+
+def dimension_score_counts(qids: Sequence[str], values: Sequence[int] = ANSWER_VALUES) -> Dict[int, int]:
+    """Score -> number of full answer vectors producing it for one dimension."""
+    counts: Dict[int, int] = {}
+    for answers in product(values, repeat=len(qids)):
+        total = sum((6 - v) if qid in REVERSE_QUESTIONS else v for qid, v in zip(qids, answers))
+        score = normalize(total / len(qids))
+        counts[score] = counts.get(score, 0) + 1
+    return counts
+
+def _axis_classes(per_dim: List[Dict[int, int]]) -> Dict[Tuple[int, ...], int]:
+    classes: Dict[Tuple[int, ...], int] = {}
+    for combo in product(*(d.items() for d in per_dim)):
+        scores = tuple(score for score, _ in combo)
+        classes[scores] = math.prod(n for _, n in combo)
+    return classes
+
+def attachment_classes(values: Sequence[int] = ANSWER_VALUES) -> Dict[Tuple[int, ...], int]:
+    """Attachment score tuples (ATTACHMENT_ORDER) -> raw answer vectors mapping to each."""
+    return _axis_classes([dimension_score_counts(ATTACHMENT_QUESTIONS[d], values) for d in ATTACHMENT_ORDER])
+
+def communication_classes(values: Sequence[int] = ANSWER_VALUES) -> Dict[Tuple[int, ...], int]:
+    """Communication score tuples (COMMUNICATION_ORDER, bonus applied) -> raw answer vectors.
+
+    Raw vectors include the scenario answer, so every Likert combination is
+    counted once per entry of SCENARIO_OPTIONS.
+    """
+    likert = _axis_classes([dimension_score_counts(COMMUNICATION_QUESTIONS[s], values)
+                            for s in COMMUNICATION_ORDER])
+    classes: Dict[Tuple[int, ...], int] = {}
+    for scores, n in likert.items():
+        for key in SCENARIO_OPTIONS:
+            bonused = list(scores)
+            if key:
+                i = COMMUNICATION_ORDER.index(SCENARIO_KEY_MAP[key])
+                bonused[i] = min(100, bonused[i] + SCENARIO_BONUS)
+            classes[tuple(bonused)] = classes.get(tuple(bonused), 0) + n
+    return classes
+
+class AxisDistribution:
+    """Score classes on one axis that share a probability vector (priority order)."""
+    __slots__ = ('probs', 'top', 'top_prob', 'gap', 'classes', 'vectors', 'fallback', 'entropy')
+
+    def __init__(self, probs: Tuple[float, ...], fallback: bool):
+        ranked = sorted(probs, reverse=True)
+        self.probs = probs
+        self.top = probs.index(ranked[0])
+        self.top_prob = ranked[0]
+        self.gap = ranked[0] - ranked[1]
+        self.classes = 0
+        self.vectors = 0
+        self.fallback = fallback
+        self.entropy = entropy(probs)
+
+def group_by_distribution(classes: Dict[Tuple[int, ...], int], order: List[str],
+                          priority: List[str]) -> List[AxisDistribution]:
+    """Merge score classes whose normalized distributions coincide."""
+    perm = [order.index(k) for k in priority]
+    groups: Dict[Tuple[Tuple[float, ...], bool], AxisDistribution] = {}
+    for scores, n in classes.items():
+        ordered = [scores[i] for i in perm]
+        probs = tuple(probabilities(ordered))
+        # All-zero scores share the uniform distribution with all-equal ones; keep them apart
+        key = (probs, sum(ordered) <= 0)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = AxisDistribution(*key)
+        group.classes += 1
+        group.vectors += n
+    return list(groups.values())
+
+class _GapBucket:
+    """Communication distributions sharing one top-two gap, sorted by top probability."""
+    __slots__ = ('gap', 'dists', 'top_probs', 'suffix')
+
+    def __init__(self, gap: float, dists: List[AxisDistribution]):
+        self.gap = gap
+        self.dists = sorted(dists, key=lambda d: d.top_prob)
+        self.top_probs = [d.top_prob for d in self.dists]
+        # suffix[k][cell_column] = (classes, vectors) over dists[k:] with that top style
+        width = len(COMMUNICATION_PRIORITY)
+        self.suffix = [[(0, 0)] * width for _ in range(len(self.dists) + 1)]
+        for k in range(len(self.dists) - 1, -1, -1):
+            row = list(self.suffix[k + 1])
+            d = self.dists[k]
+            classes, vectors = row[d.top]
+            row[d.top] = (classes + d.classes, vectors + d.vectors)
+            self.suffix[k] = row
+
+_EXHAUSTIVE_STATE: Dict[str, Any] = {}
+
+def _init_exhaustive(values: Sequence[int]) -> None:
+    """Build the communication side once per process."""
+    comm = group_by_distribution(communication_classes(values), COMMUNICATION_ORDER, COMMUNICATION_PRIORITY)
+    by_gap: Dict[float, List[AxisDistribution]] = {}
+    for d in comm:
+        by_gap.setdefault(d.gap, []).append(d)
+    buckets = [_GapBucket(gap, dists) for gap, dists in sorted(by_gap.items())]
+    _EXHAUSTIVE_STATE.update(values=tuple(values), comm=comm, buckets=buckets,
+                             gaps=[b.gap for b in buckets])
+
+def _new_tally() -> Dict[str, Any]:
+    return {
+        'cells': [[0, 0] for _ in ARCHETYPE_CELLS],   # [class pairs, raw vectors]
+        'clearPairs': 0,
+        'tieBreakPairs': 0,
+        'nonPriorityTieBreaks': 0,
+        'examples': [],
+    }
+
+def _verify_attachment_chunk(dists: List[AxisDistribution]) -> Dict[str, Any]:
+    """Archetype tallies for every pair of these attachment distributions with all communication ones.
+
+    Pairs whose top cell leads every other by EPSILON (checked analytically
+    from the top-two gaps: a1 * gapC and c1 * gapA) are counted per cell from
+    bucket suffix sums without evaluation; the rest run the full tie-break.
+    """
+    buckets: List[_GapBucket] = _EXHAUSTIVE_STATE['buckets']
+    gaps: List[float] = _EXHAUSTIVE_STATE['gaps']
+    width = len(COMMUNICATION_PRIORITY)
+    margin = EPSILON + CLEAR_WINNER_TOLERANCE
+    tally = _new_tally()
+    cells = tally['cells']
+
+    for a in dists:
+        min_comm_gap = margin / a.top_prob
+        min_comm_top = margin / a.gap if a.gap > 0 else math.inf
+        first_clear_bucket = bisect_left(gaps, min_comm_gap)
+        for b_index, bucket in enumerate(buckets):
+            split = len(bucket.dists)
+            if b_index >= first_clear_bucket:
+                split = bisect_left(bucket.top_probs, min_comm_top)
+                for column, (classes, vectors) in enumerate(bucket.suffix[split]):
+                    if classes:
+                        cell = cells[a.top * width + column]
+                        cell[0] += a.classes * classes
+                        cell[1] += a.vectors * vectors
+                        tally['clearPairs'] += a.classes * classes
+            for c in bucket.dists[:split]:
+                joints = [pa * pc for pa in a.probs for pc in c.probs]
+                winner = _winning_cell(joints)
+                cell = cells[winner]
+                cell[0] += a.classes * c.classes
+                cell[1] += a.vectors * c.vectors
+                best = max(joints)
+                tied = [i for i, j in enumerate(joints) if best - j < EPSILON]
+                if len(tied) > 1:
+                    tally['tieBreakPairs'] += a.classes * c.classes
+                    if winner != tied[0]:
+                        tally['nonPriorityTieBreaks'] += a.classes * c.classes
+                        if len(tally['examples']) < 5:
+                            tally['examples'].append({'attachment': a.probs, 'communication': c.probs,
+                                                      'winner': ARCHETYPE_SLUGS[winner],
+                                                      'highestPriorityTied': ARCHETYPE_SLUGS[tied[0]]})
+    return tally
+
+def _merge_tallies(into: Dict[str, Any], other: Dict[str, Any]) -> None:
+    for cell, (classes, vectors) in zip(into['cells'], other['cells']):
+        cell[0] += classes
+        cell[1] += vectors
+    for key in ('clearPairs', 'tieBreakPairs', 'nonPriorityTieBreaks'):
+        into[key] += other[key]
+    into['examples'] = (into['examples'] + other['examples'])[:5]
+
+def verify_archetype_space(values: Sequence[int] = ANSWER_VALUES, workers: int = 1,
+                           class_sink: Optional[IO[str]] = None) -> Dict[str, Any]:
+    """Exhaustively check archetype selection over every full-answer score class.
+
+    Attachment and communication answers are grouped by per-dimension score
+    (and then by normalized distribution), so each archetype decision is made
+    once per class pair and weighted by the number of raw answer vectors in it.
+    Invariants: every ARCHETYPE_MATRIX cell is reachable, EPSILON ties resolve
+    to the highest-priority tied cell, and the uniform fallback only occurs for
+    all-zero axes with finite entropy everywhere.
+    """
+    started = time.perf_counter()
+    att_classes = attachment_classes(values)
+    comm_classes = communication_classes(values)
+    if class_sink is not None:
+        encode = json.JSONEncoder(separators=(',', ':')).encode
+        for axis, classes, order in (('attachment', att_classes, ATTACHMENT_ORDER),
+                                     ('communication', comm_classes, COMMUNICATION_ORDER)):
+            for scores, n in classes.items():
+                class_sink.write(encode({'axis': axis, 'scores': dict(zip(order, scores)), 'rawVectors': n}) + '\n')
+
+    attachment = group_by_distribution(att_classes, ATTACHMENT_ORDER, ATTACHMENT_PRIORITY)
+    _init_exhaustive(values)
+    communication: List[AxisDistribution] = _EXHAUSTIVE_STATE['comm']
+
+    tally = _new_tally()
+    chunks = [attachment[i:i + 256] for i in range(0, len(attachment), 256)]
+    if workers > 1:
+        with multiprocessing.Pool(workers, initializer=_init_exhaustive, initargs=(tuple(values),)) as pool:
+            for part in pool.imap_unordered(_verify_attachment_chunk, chunks):
+                _merge_tallies(tally, part)
+    else:
+        for chunk in chunks:
+            _merge_tallies(tally, _verify_attachment_chunk(chunk))
+
+    balanced_limit = BALANCED_THRESHOLD * MAX_ENTROPY_4
+    axes = (('attachment', attachment), ('communication', communication))
+    fallback = {name: sum(d.vectors for d in dists if d.fallback) for name, dists in axes}
+    unexpected_fallback = [name for name, dists in axes
+                           if any(d.fallback and d.probs != tuple(probabilities([0] * 4)) for d in dists)]
+    non_finite = [name for name, dists in axes
+                  if any(not math.isfinite(d.entropy) or not all(map(math.isfinite, d.probs)) for d in dists)]
+
+    archetypes = {slug: {'classPairs': classes, 'rawVectors': vectors}
+                  for slug, (classes, vectors) in zip(ARCHETYPE_SLUGS, tally['cells'])}
+    unreachable = [slug for slug, counts in archetypes.items() if counts['classPairs'] == 0]
+    questions = sum(map(len, ATTACHMENT_QUESTIONS.values())) + sum(map(len, COMMUNICATION_QUESTIONS.values()))
+    raw_total = len(values) ** questions * len(SCENARIO_OPTIONS)
+
+    invariants = {
+        'allCellsReachable': not unreachable,
+        'tieBreakByPriority': tally['nonPriorityTieBreaks'] == 0,
+        'fallbackOnlyForZeroAxes': not unexpected_fallback,
+        'finiteProbabilities': not non_finite,
+        'vectorsAccountedFor': sum(v['rawVectors'] for v in archetypes.values()) == raw_total,
+    }
+    return {
+        'values': list(values),
+        'attachmentClasses': len(att_classes),
+        'communicationClasses': len(comm_classes),
+        'attachmentDistributions': len(attachment),
+        'communicationDistributions': len(communication),
+        'classPairs': len(att_classes) * len(comm_classes),
+        'rawVectors': raw_total,
+        'clearWinnerPairs': tally['clearPairs'],
+        'tieBreakPairs': tally['tieBreakPairs'],
+        'nonPriorityTieBreaks': tally['nonPriorityTieBreaks'],
+        'nonPriorityExamples': tally['examples'],
+        'fallbackRawVectors': fallback,
+        'balancedRawVectors': (sum(d.vectors for d in attachment if d.entropy > balanced_limit)
+                               * sum(d.vectors for d in communication if d.entropy > balanced_limit)),
+        'archetypes': archetypes,
+        'unreachable': unreachable,
+        'invariants': invariants,
+        'passed': all(invariants.values()),
+        'seconds': round(time.perf_counter() - started, 3),
+    }
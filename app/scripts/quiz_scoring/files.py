@@ -0,0 +1,32 @@
+"""Input and output paths for the commands, '-' meaning stdin or stdout."""
+
+import json
+import sys
+from contextlib import contextmanager
+from typing import IO, Iterator, Optional, Any
+
+@contextmanager
+def open_input(path: str) -> Iterator[IO[bytes]]:
+    """Open an input file in binary mode, '-' for stdin (left open on exit)."""
+    if path == '-':
+        yield sys.stdin.buffer
+    else:
+        with open(path, 'rb') as f:
+            yield f
+
+@contextmanager
+def open_output(path: Optional[str]) -> Iterator[Optional[IO[str]]]:
+    """Open an output file for text, '-' for stdout (flushed, not closed, on exit); None yields None."""
+    if path is None:
+        yield None
+    elif path == '-':
+        yield sys.stdout
+        sys.stdout.flush()
+    else:
+        with open(path, 'w', encoding='utf-8', newline='\n') as f:
+            yield f
+
+def write_json(path: str, value: Any) -> None:
+    with open_output(path) as out:
+        json.dump(value, out, indent=2)
+        out.write('\n')
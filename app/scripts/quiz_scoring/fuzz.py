@@ -0,0 +1,372 @@
+"""Differential fuzzing: seeded answer maps against the scalar port or a TS golden corpus."""
+
+import json
+import multiprocessing
+import random
+import shlex
+import subprocess
+import time
+from array import array
+from collections import Counter
+from itertools import islice
+from typing import Dict, IO, Iterable, Iterator, List, Optional, Sequence, Tuple, Any
+
+from .core import (
+    ATTACHMENT_ORDER, ATTACHMENT_QUESTIONS, COMMUNICATION_ORDER, COMMUNICATION_QUESTIONS, CONFIDENCE_QUESTIONS,
+    EMOTIONAL_QUESTIONS, INTIMACY_BOUNDARY, INTIMACY_COMFORT, LOVE_LANGUAGE_QUESTIONS, SCENARIO_QUESTION,
+    compute_archetype, compute_archetype_batch, score_responses,
+)
+from .batch import (
+    BATCH_COLUMNS, BATCH_INDEX, QUESTION_IDS, RECORD_WIDTH, SCENARIO_COLUMN, SCENARIO_KEYS, pack_answers, score_packed,
+)
+from .rescore import db_primary, to_db_scores
+from .audit import flatten_scores
+
+FUZZ_FORMAT = 1
+FUZZ_CHUNK = 24_000
+# Divergences shrunk and written out in full; later ones are only counted
+FUZZ_SHRINK_LIMIT = 10
+# Generators for each chunk, which splits its rows evenly between them
+FUZZ_KINDS = ('full', 'partial', 'sections', 'ties', 'scenario', 'legacy')
+# Compared outputs, one golden-row slot each: DBScores leaves, then the archetype
+GOLDEN_FIELDS = tuple(flatten_scores(to_db_scores(score_responses({})))) + ('archetype', 'isBalanced')
+# Golden fields as key paths into a DBScores dict
+_GOLDEN_KEYS = [tuple(path.split('.')) for path in GOLDEN_FIELDS[:-2]]
+
+def _section_slice(qids: List[str]) -> slice:
+    cols = sorted(BATCH_INDEX[q] for q in qids)
+    assert cols == list(range(cols[0], cols[-1] + 1)), 'fuzzed sections must be contiguous in BATCH_COLUMNS'
+    return slice(cols[0], cols[-1] + 1)
+
+# Likert spans that 'sections' rows drop whole, one per score section
+_FUZZ_COMMUNICATION = _section_slice(sum(COMMUNICATION_QUESTIONS.values(), []))
+_FUZZ_SPANS = [_section_slice(sum(ATTACHMENT_QUESTIONS.values(), [])), _FUZZ_COMMUNICATION,
+               _section_slice(CONFIDENCE_QUESTIONS), _section_slice(EMOTIONAL_QUESTIONS),
+               _section_slice(INTIMACY_COMFORT + INTIMACY_BOUNDARY),
+               _section_slice([q for pair in LOVE_LANGUAGE_QUESTIONS.values() for q in pair])]
+
+# Random byte -> Likert value, value or unanswered, scenario code (0 = none), answered scenario code
+_FUZZ_LIKERT = bytes(1 + b % 5 for b in range(256))
+_FUZZ_PARTIAL = bytes(b % 6 for b in range(256))
+_FUZZ_SCENARIO = bytes(b % 5 for b in range(256))
+_FUZZ_ANSWERED = bytes(1 + b % 4 for b in range(256))
+# 'ties' sections: one value throughout, or two adjacent values
+_FUZZ_TIE_TABLES = ([bytes([v]) * 256 for v in range(1, 6)]
+                    + [bytes(v + (b & 1) for b in range(256)) for v in range(1, 5)])
+# Record byte <-> ASCII digit in golden-corpus rows
+_TO_DIGITS = bytes((48 + b) & 0xFF for b in range(256))
+_FROM_DIGITS = bytes((b - 48) & 0xFF for b in range(256))
+
+def _fuzz_values(rng: random.Random, rows: int, likert: bytes, scenario: bytes) -> bytearray:
+    raw = rng.randbytes(rows * RECORD_WIDTH)
+    blob = bytearray(raw.translate(likert))
+    blob[SCENARIO_COLUMN::RECORD_WIDTH] = raw[SCENARIO_COLUMN::RECORD_WIDTH].translate(scenario)
+    return blob
+
+def _fuzz_block(kind: str, rng: random.Random, rows: int) -> Tuple[bytes, List[Optional[int]]]:
+    """rows packed records of one kind, with the legacy scenario v per row (None if absent)."""
+    width = RECORD_WIDTH
+    legacy: List[Optional[int]] = [None] * rows
+    if kind == 'full':
+        blob = _fuzz_values(rng, rows, _FUZZ_LIKERT, _FUZZ_SCENARIO)
+    elif kind in ('partial', 'legacy'):
+        blob = _fuzz_values(rng, rows, _FUZZ_PARTIAL, _FUZZ_SCENARIO)
+        if kind == 'legacy':
+            # Pre-k exports stored v on the scenario entry too, sometimes with no k at all
+            legacy = [rng.randint(0, 5) for _ in range(rows)]
+    elif kind == 'sections':
+        blob = _fuzz_values(rng, rows, _FUZZ_PARTIAL, _FUZZ_SCENARIO)
+        for row in range(0, rows * width, width):
+            dropped = rng.getrandbits(len(_FUZZ_SPANS))
+            for i, span in enumerate(_FUZZ_SPANS):
+                if dropped >> i & 1:
+                    blob[row + span.start:row + span.stop] = bytes(span.stop - span.start)
+    elif kind == 'ties':
+        raw = rng.randbytes(rows * width)
+        blob = bytearray(rows * width)
+        for row in range(0, rows * width, width):
+            for span in _FUZZ_SPANS:
+                table = _FUZZ_TIE_TABLES[rng.randrange(len(_FUZZ_TIE_TABLES))]
+                blob[row + span.start:row + span.stop] = raw[row + span.start:row + span.stop].translate(table)
+        blob[SCENARIO_COLUMN::width] = raw[SCENARIO_COLUMN::width].translate(_FUZZ_SCENARIO)
+    elif kind == 'scenario':
+        # Communication answered by the scenario alone
+        blob = _fuzz_values(rng, rows, _FUZZ_PARTIAL, _FUZZ_ANSWERED)
+        span = _FUZZ_COMMUNICATION
+        for row in range(0, rows * width, width):
+            blob[row + span.start:row + span.stop] = bytes(span.stop - span.start)
+    else:
+        raise ValueError(f'unknown fuzz kind {kind!r}')
+    return bytes(blob), legacy
+
+def fuzz_tasks(rows: int, seed: int, chunk_size: int = FUZZ_CHUNK) -> List[Tuple[int, int, int, int]]:
+    """(seed, chunk, first row, rows) per chunk of a fuzz run."""
+    return [(seed, chunk, start, min(chunk_size, rows - start))
+            for chunk, start in enumerate(range(0, rows, chunk_size))]
+
+def fuzz_chunk(task: Tuple[int, int, int, int]) -> Iterator[Tuple[str, int, bytes, List[Optional[int]]]]:
+    """(kind, first row index, packed records, legacy v) blocks of one chunk, one block per kind.
+
+    Each chunk has its own Random seeded from (seed, chunk), so chunks can be
+    generated in any order or on any worker.
+    """
+    seed, chunk, start, size = task
+    rng = random.Random(f'{seed}:{chunk}')
+    for i, kind in enumerate(FUZZ_KINDS):
+        lo, hi = start + size * i // len(FUZZ_KINDS), start + size * (i + 1) // len(FUZZ_KINDS)
+        if hi > lo:
+            blob, legacy = _fuzz_block(kind, rng, hi - lo)
+            yield kind, lo, blob, legacy
+
+def fuzz_answers(record: bytes, legacy: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+    """DBAnswerMap for one packed fuzz record; legacy puts v on the scenario entry."""
+    answers = {qid: {'v': val, 't': 0} for qid, val in zip(BATCH_COLUMNS, record) if val}
+    code = record[SCENARIO_COLUMN]
+    if code or legacy is not None:
+        entry: Dict[str, Any] = {'t': 0}
+        if code:
+            entry['k'] = SCENARIO_KEYS[code]
+        if legacy is not None:
+            entry['v'] = legacy
+        answers[SCENARIO_QUESTION] = entry
+    return answers
+
+def _batch_db_primary(scores: Dict[str, array], order: List[str]) -> List[Any]:
+    rows = list(zip(*(scores[key] for key in order)))
+    seen: Dict[Tuple[int, ...], Any] = {}
+    return [seen[row] if row in seen else seen.setdefault(row, db_primary(dict(zip(order, row)), order))
+            for row in rows]
+
+def golden_rows(batch: Dict[str, Any], archetype: Dict[str, Any]) -> List[List[Any]]:
+    """Per-row GOLDEN_FIELDS values of a score_packed batch and its compute_archetype_batch."""
+    columns = []
+    for path in GOLDEN_FIELDS:
+        if path in ('archetype', 'isBalanced'):
+            columns.append(archetype['slug' if path == 'archetype' else 'isBalanced'])
+        elif path == 'attachment.primary':
+            columns.append(_batch_db_primary(batch['attachment']['scores'], ATTACHMENT_ORDER))
+        elif path == 'communication.primary':
+            columns.append(_batch_db_primary(batch['communication']['scores'], COMMUNICATION_ORDER))
+        elif path == 'loveLanguages.ranked':
+            columns.append([list(r) for r in batch['loveLanguages']['ranked']])
+        else:
+            node = batch
+            for key in path.split('.'):
+                node = node[key]
+            columns.append(node)
+    return [list(row) for row in zip(*columns)]
+
+def decoded_records(blob: bytes, legacy: Sequence[Optional[int]]) -> bytes:
+    """The records the rescore path decodes from each row's DBAnswerMap (pack_answers).
+
+    Only rows with a legacy scenario v have a map that differs from their
+    record, so the others are passed through unchanged.
+    """
+    if all(v is None for v in legacy):
+        return blob
+    return b''.join(record if v is None else pack_answers(fuzz_answers(record, v))
+                    for record, v in zip((blob[i:i + RECORD_WIDTH] for i in range(0, len(blob), RECORD_WIDTH)),
+                                         legacy))
+
+def vector_golden_rows(blob: bytes, legacy: Optional[Sequence[Optional[int]]] = None) -> List[List[Any]]:
+    """GOLDEN_FIELDS per record on the batch path; with legacy v, records are decoded from their answer maps."""
+    batch = score_packed(decoded_records(blob, legacy) if legacy is not None else blob)
+    return golden_rows(batch, compute_archetype_batch(batch['attachment']['scores'], batch['communication']['scores']))
+
+def scalar_golden_row(record: bytes, legacy: Optional[int] = None) -> List[Any]:
+    """GOLDEN_FIELDS for one record through the per-dict port (score_responses + compute_archetype).
+
+    With a legacy v the row is read from its DBAnswerMap the way the TS
+    deserializeAnswers does: every entry's v (0 if absent) by question id,
+    scenario included, and the scenario key from k.
+    """
+    if legacy is None:
+        responses = {qid: val for qid, val in zip(BATCH_COLUMNS, record) if val}
+        scenario_key = SCENARIO_KEYS.get(record[SCENARIO_COLUMN])
+    else:
+        answers = fuzz_answers(record, legacy)
+        responses = {qid: entry.get('v', 0) for qid, entry in answers.items()}
+        scenario_key = answers.get(SCENARIO_QUESTION, {}).get('k')
+    scored = score_responses(responses, scenario_key)
+    db = to_db_scores(scored)
+    row = []
+    for keys in _GOLDEN_KEYS:
+        node = db
+        for key in keys:
+            node = node[key]
+        row.append(node)
+    archetype = compute_archetype(scored['attachment']['scores'], scored['communication']['scores'])
+    row += [archetype['slug'], archetype['isBalanced']]
+    return row
+
+def shrink_record(record: bytes, legacy: Optional[int], diverges: Any) -> Tuple[bytes, Optional[int]]:
+    """Greedy shrink while diverges(record, legacy) holds: drop the legacy v, whole sections,
+    single answers, then lower each remaining value toward 1."""
+    best = bytearray(record)
+    if legacy is not None and diverges(bytes(best), None):
+        legacy = None
+    for span in _FUZZ_SPANS:
+        candidate = best[:]
+        candidate[span.start:span.stop] = bytes(span.stop - span.start)
+        if candidate != best and diverges(bytes(candidate), legacy):
+            best = candidate
+    changed = True
+    while changed:
+        changed = False
+        for col in range(RECORD_WIDTH):
+            for value in range(best[col]):
+                candidate = best[:]
+                candidate[col] = value
+                if diverges(bytes(candidate), legacy):
+                    best, changed = candidate, True
+                    break
+    return bytes(best), legacy
+
+def _golden_diff(expected: List[Any], actual: List[Any]) -> Dict[str, List[Any]]:
+    return {path: [e, a] for path, e, a in zip(GOLDEN_FIELDS, expected, actual) if e != a}
+
+class TsOracle:
+    """The golden-corpus exporter run as a coprocess, scoring one fuzz row per request.
+
+    The command is split like a shell would (shlex) but run without one.
+    """
+
+    def __init__(self, command: str):
+        self.proc = subprocess.Popen(shlex.split(command), stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                     text=True, bufsize=1)
+        self.proc.stdin.write(json.dumps(fuzz_header(0)) + '\n')
+        self.proc.stdout.readline()
+
+    def __call__(self, record: bytes, legacy: Optional[int]) -> List[Any]:
+        self.proc.stdin.write(json.dumps([record.translate(_TO_DIGITS).decode(), legacy]) + '\n')
+        line = self.proc.stdout.readline()
+        if not line:
+            raise RuntimeError(f'oracle exited with status {self.proc.wait()}')
+        return json.loads(line)[2]
+
+    def close(self) -> None:
+        self.proc.stdin.close()
+        self.proc.wait()
+
+def fuzz_header(seed: int) -> Dict[str, Any]:
+    return {'format': FUZZ_FORMAT, 'seed': seed, 'columns': list(QUESTION_IDS),
+            'scenarioQuestion': SCENARIO_QUESTION, 'scenarioKeys': [SCENARIO_KEYS.get(c) for c in range(5)],
+            'fields': list(GOLDEN_FIELDS)}
+
+def write_fuzz_inputs(out: IO[str], rows: int, seed: int, chunk_size: int = FUZZ_CHUNK) -> int:
+    """Seeded fuzz rows as golden-corpus input (header, then [digits, legacy v]) for the TS exporter."""
+    out.write(json.dumps(fuzz_header(seed)) + '\n')
+    blocks = (block for task in fuzz_tasks(rows, seed, chunk_size) for block in fuzz_chunk(task))
+    for _, _, blob, legacy in blocks:
+        digits = blob.translate(_TO_DIGITS).decode()
+        out.write(''.join(json.dumps([digits[i:i + RECORD_WIDTH], v]) + '\n'
+                          for i, v in zip(range(0, len(digits), RECORD_WIDTH), legacy)))
+    return rows
+
+class _Divergences:
+    """Shrinks and writes the first FUZZ_SHRINK_LIMIT divergences, counts the rest."""
+
+    def __init__(self, out: IO[str]):
+        self.out = out
+        self.count = 0
+        self.fields: Counter = Counter()
+        self.kinds: Counter = Counter()
+
+    def add(self, index: int, kind: Optional[str], record: bytes, legacy: Optional[int],
+            expected: List[Any], actual: List[Any], diverges: Any, oracle: Any) -> None:
+        diff = _golden_diff(expected, actual)
+        self.count += 1
+        self.fields.update(diff.keys())
+        self.kinds[kind] += 1
+        if self.count > FUZZ_SHRINK_LIMIT:
+            return
+        entry: Dict[str, Any] = {'index': index, 'kind': kind, 'original': fuzz_answers(record, legacy), 'diff': diff}
+        if diverges is not None:
+            small, small_legacy = shrink_record(record, legacy, diverges)
+            entry['answers'] = fuzz_answers(small, small_legacy)
+            entry['shrunkDiff'] = _golden_diff(oracle(small, small_legacy), vector_golden_rows(small, [small_legacy])[0])
+        self.out.write(json.dumps(entry) + '\n')
+
+    def stats(self, rows: int, seconds: float) -> Dict[str, Any]:
+        return {'rows': rows, 'divergences': self.count, 'seconds': round(seconds, 3),
+                'rowsPerSecond': round(rows / seconds) if seconds else 0,
+                'fields': dict(self.fields.most_common()), 'kinds': dict(self.kinds)}
+
+def _scalar_oracle(record: bytes, legacy: Optional[int]) -> List[Any]:
+    return scalar_golden_row(record, legacy)
+
+def _scalar_diverges(record: bytes, legacy: Optional[int]) -> bool:
+    return vector_golden_rows(record, [legacy])[0] != scalar_golden_row(record, legacy)
+
+def _fuzz_task(task: Tuple[int, int, int, int]) -> List[Tuple[int, str, bytes, Optional[int], List[Any], List[Any]]]:
+    """Rows of one chunk where the vectorized path and the scalar port disagree.
+
+    Both paths see each row's legacy scenario v: the vectorized one through
+    pack_answers, the scalar one through the DBAnswerMap.
+    """
+    mismatches = []
+    for kind, start, blob, legacy in fuzz_chunk(task):
+        for i, actual in enumerate(vector_golden_rows(blob, legacy)):
+            record = blob[i * RECORD_WIDTH:(i + 1) * RECORD_WIDTH]
+            expected = scalar_golden_row(record, legacy[i])
+            if actual != expected:
+                mismatches.append((start + i, kind, record, legacy[i], expected, actual))
+    return mismatches
+
+def run_fuzz(rows: int, seed: int, out: IO[str], workers: int = 1, chunk_size: int = FUZZ_CHUNK) -> Dict[str, Any]:
+    """Score seeded fuzz rows on the vectorized path and diff each against the scalar port.
+
+    Chunks run on a worker pool; divergences are shrunk in this process, in
+    chunk order, so the report is the same for any worker count.
+    """
+    began = time.perf_counter()
+    found = _Divergences(out)
+    tasks = fuzz_tasks(rows, seed, chunk_size)
+    if workers > 1:
+        with multiprocessing.Pool(workers) as pool:
+            chunks = list(pool.imap(_fuzz_task, tasks))
+    else:
+        chunks = map(_fuzz_task, tasks)
+    for mismatches in chunks:
+        for mismatch in mismatches:
+            found.add(*mismatch, _scalar_diverges, _scalar_oracle)
+    return found.stats(rows, time.perf_counter() - began)
+
+def check_golden(lines: Iterable[Any], out: IO[str], oracle: Any = None,
+                 chunk_size: int = FUZZ_CHUNK) -> Dict[str, Any]:
+    """Replay a golden corpus through the vectorized path, shrinking each divergence.
+
+    Shrinking asks the oracle (a TsOracle, or any callable taking a record and
+    legacy v and returning a golden row) for every candidate. Without
+    one, a divergence is shrunk against the scalar port when the port agrees
+    with the corpus on the original row. A divergence neither can reproduce
+    (a stale corpus, say) is written unshrunk.
+    """
+    began = time.perf_counter()
+    lines = iter(lines)
+    header = json.loads(next(lines))
+    if header.get('format') != FUZZ_FORMAT:
+        raise ValueError(f"unsupported golden corpus format {header.get('format')!r}")
+    if header['columns'] != list(QUESTION_IDS) or header['fields'] != list(GOLDEN_FIELDS):
+        raise ValueError('golden corpus columns/fields do not match this scorer; re-export it')
+    found = _Divergences(out)
+    rows = 0
+    while True:
+        chunk = [json.loads(line) for line in islice(lines, chunk_size)]
+        if not chunk:
+            break
+        blob = ''.join(digits for digits, _, _ in chunk).encode().translate(_FROM_DIGITS)
+        legacies = [legacy for _, legacy, _ in chunk]
+        for i, ((_, legacy, expected), actual) in enumerate(zip(chunk, vector_golden_rows(blob, legacies))):
+            if actual == expected:
+                continue
+            record = blob[i * RECORD_WIDTH:(i + 1) * RECORD_WIDTH]
+            if oracle is not None and oracle(record, legacy) != actual:
+                found.add(rows + i, None, record, legacy, expected, actual,
+                          lambda r, v: vector_golden_rows(r, [v])[0] != oracle(r, v), oracle)
+            elif oracle is None and scalar_golden_row(record, legacy) == expected:
+                found.add(rows + i, None, record, legacy, expected, actual, _scalar_diverges, _scalar_oracle)
+            else:
+                found.add(rows + i, None, record, legacy, expected, actual, None, None)
+        rows += len(chunk)
+    return found.stats(rows, time.perf_counter() - began)
@@ -0,0 +1,178 @@
+"""Incremental scoring of live sessions, and answer-by-answer replay of exports."""
+
+import json
+import math
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Any
+
+from .core import (
+    ATTACHMENT_PRIORITY, COMMUNICATION_PRIORITY, SCENARIO_QUESTION, _archetype_from_priority_scores, compute_archetype,
+    score_responses,
+)
+from .batch import MISSING, PLAN, SCENARIO_CODES, SCENARIO_KEYS, CompactResponse, ScoringPlan
+from .rescore import row_answers
+
+class IncrementalScorer:
+    """Scores one in-progress session, updating only what an answer event touches.
+
+    Each dimension keeps the running ScoringPlan key (sum of its answered
+    contributions), so an event is a table lookup, an add per dimension the
+    question feeds and a score_table read. Keys are the same sums score_batch
+    builds, which is why results always equal a full rescore.
+    """
+
+    def __init__(self, plan: ScoringPlan = PLAN):
+        self.plan = plan
+        self.values = bytearray(len(plan.columns))
+        self.scenario_code = MISSING
+        self.events = 0
+        self._names = list(plan.dimensions)
+        self._slot = {name: i for i, name in enumerate(self._names)}
+        self._keys = [0] * len(self._names)
+        self._scores = [0] * len(self._names)
+        self._bonus = [0] * len(self._names)
+        # Column -> slots of the dimensions it feeds
+        self._feeds: List[List[int]] = [[] for _ in plan.columns]
+        for name, cols in plan.dimensions.items():
+            for col in cols:
+                self._feeds[col].append(self._slot[name])
+        self._communication = [self._slot[f'communication.{s}'] for s in plan.communication_order]
+
+    def set(self, qid: str, value: Any) -> None:
+        """Add or change an answer (a 1-5 value, or the scenario key); None removes it.
+
+        Question IDs outside the plan do not affect scores and are ignored.
+        """
+        if qid == SCENARIO_QUESTION:
+            self._set_scenario(value)
+            return
+        col = self.plan.index.get(qid)
+        if col is None:
+            return
+        if value is None:
+            value = MISSING
+        elif type(value) is not int or not 1 <= value <= 5:
+            raise ValueError(f'{qid}: expected a 1-5 answer, got {value!r}')
+        table = self.plan.contributions[col]
+        delta = table[value] - table[self.values[col]]
+        self.values[col] = value
+        self.events += 1
+        if delta:
+            score_table = self.plan.score_table
+            for slot in self._feeds[col]:
+                key = self._keys[slot] = self._keys[slot] + delta
+                self._scores[slot] = score_table[key + self._bonus[slot]]
+
+    def remove(self, qid: str) -> None:
+        self.set(qid, None)
+
+    def _set_scenario(self, key: Optional[str]) -> None:
+        code = SCENARIO_CODES.get(key, MISSING) if isinstance(key, str) else MISSING
+        self.scenario_code = code
+        self.events += 1
+        score_table = self.plan.score_table
+        for style, slot in zip(self.plan.communication_order, self._communication):
+            self._bonus[slot] = self.plan.scenario_bonus_keys[style][code]
+            self._scores[slot] = score_table[self._keys[slot] + self._bonus[slot]]
+
+    @property
+    def scenario_key(self) -> Optional[str]:
+        return SCENARIO_KEYS.get(self.scenario_code)
+
+    def score(self, name: str) -> int:
+        """Current score of one plan dimension (e.g. 'attachment.secure', 'give.words')."""
+        return self._scores[self._slot[name]]
+
+    def responses(self) -> Dict[str, int]:
+        return {qid: val for qid, val in zip(self.plan.columns, self.values) if val != MISSING}
+
+    def result(self) -> Dict[str, Any]:
+        """score_responses structure plus the compute_archetype result."""
+        plan = self.plan
+        score = self.score
+        attachment = {d: score(f'attachment.{d}') for d in plan.attachment_order}
+        communication = {s: score(f'communication.{s}') for s in plan.communication_order}
+        love = {l: score(f'love.{l}') for l in plan.love_order}
+        slug, confidence, balanced = _archetype_from_priority_scores(
+            tuple(attachment.get(d, 0) for d in ATTACHMENT_PRIORITY),
+            tuple(communication.get(s, 0) for s in COMMUNICATION_PRIORITY))
+        return {
+            'attachment': {'scores': attachment, 'primary': max(plan.attachment_order, key=attachment.__getitem__)},
+            'communication': {'scores': communication,
+                              'primary': max(plan.communication_order, key=communication.__getitem__)},
+            'confidence': score('confidence'),
+            'emotional': score('emotional'),
+            'intimacy': {'comfort': score('intimacy.comfort'), 'boundaries': score('intimacy.boundaries')},
+            'loveLanguages': {
+                'ranked': sorted(plan.love_order, key=love.__getitem__, reverse=True),
+                'scores': love,
+                'giveReceive': {l: {'give': score(f'give.{l}'), 'receive': score(f'receive.{l}')}
+                                for l in plan.love_order},
+            },
+            'archetype': {'slug': slug, 'confidence': confidence, 'isBalanced': balanced},
+        }
+
+def answer_events(answers: Dict[str, Dict[str, Any]]) -> List[Tuple[int, str, Any]]:
+    """A DBAnswerMap as (t, qid, value) events in answer order (ties keep map order)."""
+    events = []
+    for qid, entry in answers.items():
+        if not isinstance(entry, dict):
+            continue
+        value = entry.get('k') if qid == SCENARIO_QUESTION else entry.get('v')
+        if qid != SCENARIO_QUESTION and not (type(value) is int and 1 <= value <= 5):
+            continue
+        t = entry.get('t')
+        events.append((t if type(t) is int else 0, qid, value))
+    events.sort(key=lambda event: event[0])
+    return events
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile (q in 0-100) of an ascending sequence; 0 when empty."""
+    if not sorted_values:
+        return 0
+    return sorted_values[min(len(sorted_values) - 1, max(0, math.ceil(q / 100 * len(sorted_values)) - 1))]
+
+def replay_sessions(lines: Iterable[bytes]) -> Dict[str, Any]:
+    """Replay each export row's answers in t order through an IncrementalScorer.
+
+    Reports per-event update latency (set plus result) and checks that the
+    final state of every session matches a full rescore of its answers.
+    """
+    latencies: List[int] = []
+    sessions = mismatches = skipped = 0
+    clock = time.perf_counter_ns
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        answers = row_answers(row) if isinstance(row, dict) else None
+        if answers is None:
+            skipped += 1
+            continue
+        scorer = IncrementalScorer()
+        result = scorer.result()
+        for _, qid, value in answer_events(answers):
+            began = clock()
+            scorer.set(qid, value)
+            result = scorer.result()
+            latencies.append(clock() - began)
+        record = CompactResponse.from_answers(answers)
+        key = record.scenario_key
+        expected = score_responses(record, key)
+        expected['archetype'] = compute_archetype(expected['attachment']['scores'],
+                                                  expected['communication']['scores'])
+        sessions += 1
+        mismatches += result != expected
+    latencies.sort()
+    report = {
+        'sessions': sessions,
+        'skipped': skipped,
+        'events': len(latencies),
+        'mismatches': mismatches,
+        'latencyNs': {'p50': percentile(latencies, 50), 'p99': percentile(latencies, 99),
+                      'max': latencies[-1] if latencies else 0},
+    }
+    return report
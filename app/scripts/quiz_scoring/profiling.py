@@ -0,0 +1,114 @@
+"""Stage profiling for --profile: per-stage wall time and collapsed stacks."""
+
+import sys
+import time
+from typing import Dict, List, Tuple, Any
+
+class _ProfileSpan:
+    """One timed entry into a named stage, nested under whatever span is open."""
+    __slots__ = ('profiler', 'name', 'start', 'blocks')
+
+    def __init__(self, profiler: 'StageProfiler', name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self) -> '_ProfileSpan':
+        self.profiler._stack.append(self.name)
+        self.blocks = sys.getallocatedblocks()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        elapsed = time.perf_counter() - self.start
+        blocks = sys.getallocatedblocks() - self.blocks
+        stack = self.profiler._stack
+        path = tuple(stack)
+        stack.pop()
+        entry = self.profiler.stats.setdefault(path, [0, 0.0, 0.0, 0])
+        entry[0] += 1
+        entry[1] += elapsed
+        entry[3] += blocks
+        if stack:
+            self.profiler.stats.setdefault(tuple(stack), [0, 0.0, 0.0, 0])[2] += elapsed
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+_NULL_SPAN = _NullSpan()
+
+class StageProfiler:
+    """Cumulative wall time, call counts and net allocated blocks per nested stage.
+
+    Disabled, span() hands back one shared no-op context and wrap() returns
+    the function untouched, so instrumented code pays nothing per row.
+    Allocations are counted as the net change in sys.getallocatedblocks()
+    across a span, which needs no tracemalloc and does not skew timings.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.reset()
+
+    def reset(self) -> None:
+        # Stage path -> [calls, seconds, seconds in child spans, net allocated blocks]
+        self.stats: Dict[Tuple[str, ...], List[Any]] = {}
+        self._stack: List[str] = []
+        self.started = time.perf_counter()
+
+    def enable(self) -> None:
+        self.reset()
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def span(self, name: str) -> Any:
+        return _ProfileSpan(self, name) if self.enabled else _NULL_SPAN
+
+    def wrap(self, name: str, func: Any) -> Any:
+        """func timed as stage `name` while enabled, func itself otherwise."""
+        if not self.enabled:
+            return func
+
+        def timed(*args: Any, **kwargs: Any) -> Any:
+            with _ProfileSpan(self, name):
+                return func(*args, **kwargs)
+        return timed
+
+    def summary(self) -> Dict[str, Any]:
+        total = time.perf_counter() - self.started
+        stages = [{
+            'stage': ';'.join(path),
+            'calls': calls,
+            'seconds': round(seconds, 6),
+            'selfSeconds': round(seconds - child, 6),
+            'percent': round(100 * seconds / total, 2) if total else 0.0,
+            'netBlocks': blocks,
+        } for path, (calls, seconds, child, blocks) in sorted(self.stats.items()) if calls]
+        return {'seconds': round(total, 6), 'stages': stages}
+
+    def collapsed(self, root: str = 'main') -> List[str]:
+        """flamegraph.pl / speedscope collapsed stacks: 'root;stage;sub microseconds' of self time."""
+        total = time.perf_counter() - self.started
+        lines = []
+        top = 0.0
+        for path, (calls, seconds, child, _) in sorted(self.stats.items()):
+            if not calls:
+                continue
+            if len(path) == 1:
+                top += seconds
+            micros = round((seconds - child) * 1e6)
+            if micros > 0:
+                lines.append(f"{';'.join((root,) + path)} {micros}")
+        untracked = round((total - top) * 1e6)
+        if untracked > 0:
+            lines.insert(0, f'{root} {untracked}')
+        return lines
+
+PROFILER = StageProfiler()
@@ -0,0 +1,325 @@
+"""Streaming and sharded parallel rescoring of quiz_results JSONL exports."""
+
+import heapq
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import deque
+from io import StringIO
+from itertools import islice
+from typing import Dict, IO, Iterable, Iterator, List, Optional, Tuple, Any
+
+from .core import ATTACHMENT_ORDER, COMMUNICATION_ORDER, compute_archetype_batch
+from .profiling import PROFILER
+from .batch import RECORD_WIDTH, batch_row_result, pack_answers, score_packed
+
+RESCORE_CHUNK_SIZE = 2048
+# quiz_results columns copied through to each rescored row when present
+PASSTHROUGH_COLUMNS = ('id', 'created_at', 'public_slug', 'utm_source', 'utm_medium', 'utm_campaign')
+
+def db_primary(scores: Dict[str, int], order: List[str]) -> Any:
+    """Primary in DBScores form: one style, a list of 2-3 tied styles, or 'mixed'."""
+    top = max(scores[k] for k in order)
+    tied = [k for k in order if scores[k] == top]
+    if len(tied) == 1:
+        return tied[0]
+    return 'mixed' if len(tied) == len(order) else tied
+
+def to_db_scores(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a score_responses result to the DBScores shape the app stores."""
+    attachment = result['attachment']['scores']
+    communication = result['communication']['scores']
+    return {
+        'attachment': {'scores': attachment, 'primary': db_primary(attachment, ATTACHMENT_ORDER)},
+        'communication': {'scores': communication, 'primary': db_primary(communication, COMMUNICATION_ORDER)},
+        'confidence': result['confidence'],
+        'emotional': result['emotional'],
+        'intimacy': result['intimacy'],
+        'loveLanguages': result['loveLanguages'],
+    }
+
+class RescoreChunk:
+    """One chunk of export rows as it moves through the rescore stages."""
+    __slots__ = ('lines', 'rows', 'errors', 'records', 'batch', 'archetypes', 'output')
+
+    def __init__(self, lines: List[bytes]):
+        self.lines = lines
+        self.rows: List[Dict[str, Any]] = []
+        self.errors: Dict[int, str] = {}
+        self.records: List[bytes] = []
+        self.batch: Dict[str, Any] = {}
+        self.archetypes: Dict[str, Any] = {}
+        self.output = ''
+
+def _read_chunks(lines: Iterable[bytes], chunk_size: int) -> Iterator[RescoreChunk]:
+    lines = iter(lines)
+    while True:
+        raw = list(islice(lines, chunk_size))
+        if not raw:
+            return
+        chunk = [line for line in raw if line.strip()]
+        if chunk:
+            yield RescoreChunk(chunk)
+
+def _parse_stage(chunk: RescoreChunk) -> RescoreChunk:
+    for i, line in enumerate(chunk.lines):
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            row = {}
+            chunk.errors[i] = f'invalid JSON: {e}'
+        chunk.rows.append(row if isinstance(row, dict) else {})
+    chunk.lines = []
+    return chunk
+
+def row_answers(row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """The DBAnswerMap of an export row (stored as an object or a JSON string), or None."""
+    answers = row.get('answers')
+    if isinstance(answers, str):
+        try:
+            answers = json.loads(answers)
+        except ValueError:
+            return None
+    return answers if isinstance(answers, dict) else None
+
+def _decode_stage(chunk: RescoreChunk) -> RescoreChunk:
+    empty = bytes(RECORD_WIDTH)
+    for i, row in enumerate(chunk.rows):
+        answers = row_answers(row)
+        if answers is None or i in chunk.errors:
+            chunk.errors.setdefault(i, 'missing answers')
+            chunk.records.append(empty)
+            continue
+        chunk.records.append(pack_answers(answers))
+    return chunk
+
+def _score_stage(chunk: RescoreChunk) -> RescoreChunk:
+    chunk.batch = score_packed(chunk.records)
+    chunk.records = []
+    return chunk
+
+def _archetype_stage(chunk: RescoreChunk) -> RescoreChunk:
+    chunk.archetypes = compute_archetype_batch(chunk.batch['attachment']['scores'],
+                                               chunk.batch['communication']['scores'])
+    return chunk
+
+def rescored_record(row: Dict[str, Any], batch: Dict[str, Any], archetypes: Dict[str, Any], i: int) -> Dict[str, Any]:
+    """Output record for row i of a scored chunk."""
+    record = {col: row[col] for col in PASSTHROUGH_COLUMNS if col in row}
+    record['archetype_slug'] = archetypes['slug'][i]
+    record['confidence'] = archetypes['confidence'][i]
+    record['isBalanced'] = archetypes['isBalanced'][i]
+    record['scores'] = to_db_scores(batch_row_result(batch, i))
+    return record
+
+def _serialize_stage(chunk: RescoreChunk) -> RescoreChunk:
+    dumps = json.JSONEncoder(separators=(',', ':')).encode
+    out = []
+    for i, row in enumerate(chunk.rows):
+        if i in chunk.errors:
+            record = {col: row[col] for col in PASSTHROUGH_COLUMNS if col in row}
+            record['error'] = chunk.errors[i]
+        else:
+            record = rescored_record(row, chunk.batch, chunk.archetypes, i)
+        out.append(dumps(record))
+    chunk.output = '\n'.join(out) + '\n' if out else ''
+    chunk.rows, chunk.batch, chunk.archetypes = [], {}, {}
+    return chunk
+
+RESCORE_STAGES = (_parse_stage, _decode_stage, _score_stage, _archetype_stage, _serialize_stage)
+# Stage name as it appears in --profile output
+STAGE_NAMES = {_parse_stage: 'parse', _decode_stage: 'decode', _score_stage: 'score',
+               _archetype_stage: 'archetype', _serialize_stage: 'serialize'}
+
+def iter_rescored(lines: Iterable[bytes], chunk_size: int = RESCORE_CHUNK_SIZE) -> Iterator[RescoreChunk]:
+    """Rescore quiz_results JSONL lines lazily, one bounded chunk at a time.
+
+    Each stage is mapped over the chunk stream, so at most one chunk is alive
+    per stage and memory stays flat regardless of input size.
+    """
+    chunks: Iterator[RescoreChunk] = _read_chunks(lines, chunk_size)
+    for stage in RESCORE_STAGES:
+        chunks = map(PROFILER.wrap(STAGE_NAMES[stage], stage), chunks)
+    return chunks
+
+def rescore_stream(lines: Iterable[bytes], out: IO[str], chunk_size: int = RESCORE_CHUNK_SIZE) -> Dict[str, int]:
+    """Rescore an export into NDJSON on out, returning row and error counts."""
+    rows = errors = 0
+    for chunk in iter_rescored(lines, chunk_size):
+        out.write(chunk.output)
+        rows += chunk.output.count('\n')
+        errors += len(chunk.errors)
+    return {'rows': rows, 'errors': errors}
+
+# =============================================================================
+# PARALLEL RESCORE (sharded process pool)
+# =============================================================================
+
+SHARDS_PER_WORKER = 4
+
+# Per-process state, set once by _init_worker so tasks carry only shard bounds
+_WORKER_STATE: Dict[str, Any] = {}
+
+def byte_shards(path: str, shards: int) -> List[Tuple[int, int]]:
+    """Split a file into up to `shards` newline-aligned [start, end) byte ranges."""
+    size = os.path.getsize(path)
+    bounds = [0]
+    with open(path, 'rb') as f:
+        for i in range(1, shards):
+            target = size * i // shards
+            if target <= bounds[-1]:
+                continue
+            # Finish the line containing byte target-1; the next line starts the shard
+            f.seek(target - 1)
+            f.readline()
+            if bounds[-1] < f.tell() < size:
+                bounds.append(f.tell())
+    bounds.append(size)
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+def _iter_range_lines(f: IO[bytes], start: int, end: int) -> Iterator[bytes]:
+    f.seek(start)
+    pos = start
+    while pos < end:
+        line = f.readline()
+        if not line:
+            return
+        pos += len(line)
+        yield line
+
+def id_sort_key(ident: Any) -> Tuple[int, Any]:
+    """Order ids by their native type: missing first, then numbers by value, then strings."""
+    if ident is None:
+        return (0, 0)
+    if isinstance(ident, (int, float)) and not isinstance(ident, bool):
+        return (1, ident)
+    return (2, str(ident))
+
+def _record_id(line: Any) -> Tuple[int, Any]:
+    return id_sort_key(json.loads(line).get('id'))
+
+def _sort_shard_file(src: str, out: IO[str]) -> None:
+    """Copy src's lines to out in id order, holding only (id key, offset, length) per line."""
+    with open(src, 'rb') as f:
+        index = []
+        offset = 0
+        for line in f:
+            index.append((_record_id(line), offset, len(line)))
+            offset += len(line)
+        # Equal ids keep input order: the offset breaks the tie
+        index.sort()
+        for _, offset, length in index:
+            f.seek(offset)
+            out.write(f.read(length).decode('utf-8'))
+
+def _init_worker(chunk_size: int, sort_by_id: bool) -> None:
+    """Build per-process scoring state once; scoring tables are module globals built at import."""
+    _WORKER_STATE.update(chunk_size=chunk_size, sort_by_id=sort_by_id, pid=os.getpid(),
+                         encoder=json.JSONEncoder(separators=(',', ':')))
+
+def _worker_stats(rows: int, errors: int, start: float) -> Dict[str, Any]:
+    return {'pid': _WORKER_STATE['pid'], 'rows': rows, 'errors': errors,
+            'seconds': time.perf_counter() - start}
+
+def _rescore_shard(task: Tuple[str, int, int, str]) -> Dict[str, Any]:
+    """Rescore one byte range of the input into its own shard file."""
+    path, start, end, shard_path = task
+    began = time.perf_counter()
+    sort_by_id = _WORKER_STATE['sort_by_id']
+    scored_path = f'{shard_path}.unsorted' if sort_by_id else shard_path
+    with open(path, 'rb') as f, open(scored_path, 'w', encoding='utf-8', newline='\n') as out:
+        stats = rescore_stream(_iter_range_lines(f, start, end), out, _WORKER_STATE['chunk_size'])
+    if sort_by_id:
+        with open(shard_path, 'w', encoding='utf-8', newline='\n') as out:
+            _sort_shard_file(scored_path, out)
+        os.unlink(scored_path)
+    return _worker_stats(stats['rows'], stats['errors'], began)
+
+def _rescore_lines(lines: List[bytes]) -> Tuple[str, Dict[str, Any]]:
+    """Rescore one row-count shard (used when the input cannot be seeked)."""
+    began = time.perf_counter()
+    buffer = StringIO()
+    stats = rescore_stream(lines, buffer, _WORKER_STATE['chunk_size'])
+    return buffer.getvalue(), _worker_stats(stats['rows'], stats['errors'], began)
+
+def summarize_workers(shard_stats: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Combine per-shard stats into per-worker rows, shards, busy seconds and rows/s."""
+    workers: Dict[int, Dict[str, Any]] = {}
+    for stats in shard_stats:
+        w = workers.setdefault(stats['pid'], {'pid': stats['pid'], 'shards': 0, 'rows': 0,
+                                              'errors': 0, 'seconds': 0.0})
+        w['shards'] += 1
+        w['rows'] += stats['rows']
+        w['errors'] += stats['errors']
+        w['seconds'] += stats['seconds']
+    for w in workers.values():
+        w['rowsPerSecond'] = w['rows'] / w['seconds'] if w['seconds'] else 0.0
+    return sorted(workers.values(), key=lambda w: w['pid'])
+
+def imap_bounded(pool: Any, func: Any, items: Iterable[Any], limit: int) -> Iterator[Any]:
+    """pool.imap in input order, with at most limit tasks submitted ahead of the consumer.
+
+    Pool.imap reads its whole input up front and queues every result until
+    it is taken; here items are only read, and results only held, as fast
+    as the consumer takes them.
+    """
+    pending: deque = deque()
+    for item in items:
+        if len(pending) >= limit:
+            yield pending.popleft().get()
+        pending.append(pool.apply_async(func, (item,)))
+    while pending:
+        yield pending.popleft().get()
+
+def rescore_parallel(path: str, out: IO[str], workers: int, chunk_size: int = RESCORE_CHUNK_SIZE,
+                     sort_by_id: bool = False, shard_rows: int = 50000) -> Dict[str, Any]:
+    """Rescore an export on a process pool, merging shards deterministically.
+
+    Files are split into newline-aligned byte ranges that each worker reads
+    itself; stdin ('-') is split into row-count shards, read no more than
+    two shards per worker ahead of the output. Output is in input
+    order, or ordered by id when sort_by_id is set: each worker sorts its
+    shard on disk by (id key, offset) index, then shards are k-way merged.
+    Ids sort by native type, so numeric ids are in numeric order.
+    """
+    init = (chunk_size, sort_by_id)
+    shard_stats: List[Dict[str, Any]] = []
+
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=init) as pool:
+        if path == '-':
+            if sort_by_id:
+                raise ValueError('--sort-by-id needs a seekable input file')
+            blocks = iter(lambda: list(islice(sys.stdin.buffer, shard_rows)), [])
+            for text, stats in imap_bounded(pool, _rescore_lines, blocks, 2 * workers):
+                out.write(text)
+                shard_stats.append(stats)
+        else:
+            shards = workers * SHARDS_PER_WORKER
+            with tempfile.TemporaryDirectory(prefix='rescore-') as tmp:
+                tasks = [(path, start, end, os.path.join(tmp, f'shard-{i:05d}.jsonl'))
+                         for i, (start, end) in enumerate(byte_shards(path, shards))]
+                if not sort_by_id:
+                    # imap yields in task order, so each shard is appended as soon as it and its predecessors finish
+                    for task, stats in zip(tasks, pool.imap(_rescore_shard, tasks)):
+                        with open(task[3], encoding='utf-8') as shard:
+                            shutil.copyfileobj(shard, out)
+                        shard_stats.append(stats)
+                else:
+                    shard_stats = pool.map(_rescore_shard, tasks)
+                    files = [open(task[3], encoding='utf-8') for task in tasks]
+                    try:
+                        out.writelines(heapq.merge(*files, key=_record_id))
+                    finally:
+                        for f in files:
+                            f.close()
+
+    return {
+        'rows': sum(s['rows'] for s in shard_stats),
+        'errors': sum(s['errors'] for s in shard_stats),
+        'shards': len(shard_stats),
+        'workers': summarize_workers(shard_stats),
+    }
@@ -0,0 +1,208 @@
+"""Test runner and report writer: suite units, parallel execution and streamed reports."""
+
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import IO, Iterable, Iterator, List, Optional, Sequence, Tuple, Any
+
+from .files import open_output
+from .testing import FIXTURES_PATH, _TEST_CLOCK, TestResult, check_fixtures, iter_fixtures
+
+# Fixture cases per unit of work when the fixture table is split across workers
+FIXTURE_CHUNK = 2000
+
+class SuiteRun:
+    """Results and wall time of one suite (or one slice of the fixture table)."""
+    __slots__ = ('name', 'results', 'seconds')
+
+    def __init__(self, name: str, results: List[TestResult], seconds: float):
+        self.name = name
+        self.results = results
+        self.seconds = seconds
+
+    @property
+    def failed(self) -> int:
+        return sum(1 for r in self.results if not r.passed)
+
+def _matches(name: str, keywords: Optional[Sequence[str]]) -> bool:
+    return not keywords or any(k.lower() in name.lower() for k in keywords)
+
+def _run_unit(unit: Tuple[str, Any]) -> SuiteRun:
+    """Run a registered suite by name, or check a slice of fixture cases."""
+    from .tests import SUITES  # imported here: the suites import the runner they test
+    name, cases = unit
+    began = _TEST_CLOCK['last'] = time.perf_counter()
+    results = check_fixtures(cases) if cases is not None else SUITES[name]()
+    return SuiteRun(name, results, time.perf_counter() - began)
+
+def test_units(keywords: Optional[Sequence[str]] = None, fixtures: Optional[str] = FIXTURES_PATH,
+               fixture_chunk: int = FIXTURE_CHUNK) -> Iterator[Tuple[str, Any]]:
+    """(name, fixture cases or None) work units selected by -k keywords, in report order.
+
+    A keyword selects suites whose name contains it and fixture cases whose
+    'fixture <name>' contains it, so `-k fixture` runs the whole table. The
+    table is read lazily, one chunk ahead of the units being run.
+    """
+    from .tests import SUITES
+    for name in SUITES:
+        if _matches(name, keywords):
+            yield name, None
+    if not fixtures or not os.path.exists(fixtures):
+        return
+    start = 0
+    cases = (case for case in iter_fixtures(fixtures) if _matches(f"fixture {case['name']}", keywords))
+    while True:
+        chunk = list(islice(cases, fixture_chunk))
+        if not chunk:
+            return
+        yield f'fixtures[{start}:{start + len(chunk)}]', chunk
+        start += len(chunk)
+
+def iter_test_runs(units: Iterable[Tuple[str, Any]], workers: int = 1, fail_fast: bool = False) -> Iterator[SuiteRun]:
+    """Run work units serially or on a process pool, yielding each run as it finishes.
+
+    At most two units per worker are in flight, so neither queued units nor
+    finished results pile up ahead of the consumer. With fail_fast, nothing
+    new starts once a unit reports a failure; on a pool, units already
+    running still finish and are reported.
+    """
+    units = iter(units)
+    if workers <= 1:
+        for unit in units:
+            run = _run_unit(unit)
+            yield run
+            if fail_fast and run.failed:
+                return
+        return
+    # ProcessPoolExecutor workers may start their own pools, which several suites do
+    with ProcessPoolExecutor(workers) as pool:
+        pending: set = set()
+        stopped = False
+        while True:
+            for unit in ([] if stopped else islice(units, 2 * workers - len(pending))):
+                pending.add(pool.submit(_run_unit, unit))
+            if not pending:
+                return
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                run = future.result()
+                yield run
+                stopped = stopped or (fail_fast and run.failed > 0)
+
+def run_tests(units: Iterable[Tuple[str, Any]], workers: int = 1, fail_fast: bool = False) -> List[SuiteRun]:
+    """iter_test_runs collected in unit order."""
+    units = list(units)
+    order = {name: i for i, (name, _) in enumerate(units)}
+    return sorted(iter_test_runs(units, workers, fail_fast), key=lambda run: order[run.name])
+
+# =============================================================================
+# REPORT WRITER (streaming text / NDJSON / JSON)
+# =============================================================================
+
+REPORT_FORMATS = ('text', 'ndjson', 'json')
+# Report lines held before a write; the end of each suite also flushes, so the report can be tailed
+REPORT_BUFFER_LINES = 256
+
+class ReportWriter:
+    """Writes test results as suites finish, keeping counts and at most buffer_lines pending lines.
+
+    ndjson writes one {"type": "test"|"suite"|"summary"} object per line;
+    json writes the indent=2 {"tests", "suites", "summary"} document, with
+    the tests array streamed first since the counts are only known at the
+    end. failures_only leaves passing tests out of the output but not out
+    of the counts.
+    """
+
+    def __init__(self, out: IO[str], fmt: str = 'text', failures_only: bool = False,
+                 buffer_lines: int = REPORT_BUFFER_LINES):
+        if fmt not in REPORT_FORMATS:
+            raise ValueError(f'unknown report format {fmt!r}')
+        self.out = out
+        self.fmt = fmt
+        self.failures_only = failures_only
+        self.buffer_lines = buffer_lines
+        self.buffer: List[str] = []
+        self.passed = 0
+        self.failed = 0
+        self.tests_written = 0
+        # (name, tests, failed, seconds) per suite; one entry per unit, never per test
+        self.suites: List[Tuple[str, int, int, float]] = []
+        if fmt == 'text':
+            self._emit(f"\n{'='*60}\nQUIZ SCORING VALIDATION\n{'='*60}\n\n")
+        elif fmt == 'json':
+            self._emit('{\n  "tests": [')
+
+    def _emit(self, text: str) -> None:
+        self.buffer.append(text)
+        if len(self.buffer) >= self.buffer_lines:
+            self.flush()
+
+    def flush(self) -> None:
+        self.out.write(''.join(self.buffer))
+        self.out.flush()
+        self.buffer.clear()
+
+    def _dumps(self, value: Any) -> str:
+        return json.dumps(value, separators=(',', ':'), default=repr)
+
+    def _indented(self, value: Any, depth: int) -> str:
+        """value as json.dumps(indent=2) would lay it out `depth` levels into a document."""
+        return json.dumps(value, indent=2, default=repr).replace('\n', '\n' + '  ' * depth)
+
+    def add(self, run: SuiteRun) -> None:
+        failed = run.failed
+        self.passed += len(run.results) - failed
+        self.failed += failed
+        self.suites.append((run.name, len(run.results), failed, run.seconds))
+        for r in run.results:
+            if r.passed and self.failures_only:
+                continue
+            if self.fmt == 'text':
+                line = f"{'✅' if r.passed else '❌'} {r.name}\n"
+                if not r.passed:
+                    line += f"   Expected: {r.expected}\n   Actual:   {r.actual}\n"
+                self._emit(line)
+            else:
+                record = {'name': r.name, 'passed': r.passed, 'seconds': round(r.seconds, 6),
+                          'expected': r.expected, 'actual': r.actual}
+                if self.fmt == 'ndjson':
+                    self._emit(self._dumps({'type': 'test', 'suite': run.name, **record}) + '\n')
+                else:
+                    self._emit((',' if self.tests_written else '') + '\n    ' + self._indented(record, 2))
+            self.tests_written += 1
+        if self.fmt == 'ndjson':
+            self._emit(self._dumps({'type': 'suite', 'name': run.name, 'seconds': round(run.seconds, 4),
+                                    'passed': len(run.results) - failed, 'failed': failed}) + '\n')
+        self.flush()
+
+    def close(self) -> int:
+        """Write the suite table and summary, returning the failure count."""
+        summary = {'total': self.passed + self.failed, 'passed': self.passed, 'failed': self.failed}
+        if self.fmt == 'ndjson':
+            self._emit(self._dumps({'type': 'summary', **summary}) + '\n')
+        elif self.fmt == 'json':
+            suites = [{'name': name, 'seconds': round(seconds, 4), 'passed': tests - failed, 'failed': failed}
+                      for name, tests, failed, seconds in self.suites]
+            self._emit('\n  ]' if self.tests_written else ']')
+            self._emit(f',\n  "suites": {self._indented(suites, 1)},\n  "summary": {self._indented(summary, 1)}\n}}\n')
+        else:
+            self._emit(f"\n{'suite':<40} {'tests':>6} {'failed':>6} {'seconds':>8}\n")
+            for name, tests, failed, seconds in self.suites:
+                self._emit(f"{name:<40} {tests:>6} {failed:>6} {seconds:>8.3f}\n")
+            self._emit(f"\n{'='*60}\nTOTAL: {self.passed}/{summary['total']} passed\n")
+            self._emit(f"FAILED: {self.failed} tests\n" if self.failed else "ALL TESTS PASSED ✅\n")
+            self._emit(f"{'='*60}\n\n")
+        self.flush()
+        return self.failed
+
+def report_tests(fmt: str = 'text', keywords: Optional[Sequence[str]] = None, fail_fast: bool = False,
+                 workers: int = 1, fixtures: Optional[str] = FIXTURES_PATH, failures_only: bool = False,
+                 path: str = '-') -> int:
+    """Run the validation suite, streaming the report to path, and return the failure count."""
+    with open_output(path) as out:
+        writer = ReportWriter(out, fmt, failures_only)
+        for run in iter_test_runs(test_units(keywords, fixtures), workers, fail_fast):
+            writer.add(run)
+        return writer.close()
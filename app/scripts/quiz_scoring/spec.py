@@ -0,0 +1,276 @@
+"""Spec loader: questions.ts / matrix.ts / scoring.ts parsed into a content-hash cached spec."""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+from typing import Collection, Dict, Iterator, List, Optional, Tuple, Any
+
+from .core import (
+    ARCHETYPE_MATRIX, ATTACHMENT_QUESTIONS, COMMUNICATION_QUESTIONS, CONFIDENCE_QUESTIONS, EMOTIONAL_QUESTIONS,
+    INTIMACY_BOUNDARY, INTIMACY_COMFORT, LOVE_LANGUAGE_QUESTIONS, REVERSE_QUESTIONS, SCENARIO_BONUS, SCENARIO_KEY_MAP,
+    SCENARIO_QUESTION,
+)
+from .batch import ScoringPlan
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Spec name -> TS source, relative to the app root
+SPEC_SOURCES = {
+    'questions': os.path.join('src', 'lib', 'quiz', 'data', 'questions.ts'),
+    'matrix': os.path.join('src', 'lib', 'quiz', 'data', 'archetypes', 'matrix.ts'),
+    'scoring': os.path.join('src', 'lib', 'quiz', 'scoring.ts'),
+}
+# Bump when the compiled spec changes shape so stale cache entries are ignored
+SPEC_FORMAT = 2
+SPEC_CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'quiz-scoring')
+
+_TS_SPACE = re.compile(r'(?:\s+|//[^\n]*|/\*.*?\*/)*', re.S)
+_TS_STRING = re.compile(r'''(['"`])((?:\\.|(?!\1)[^\\])*)\1''', re.S)
+_TS_ATOM = re.compile(r'-?\d+(?:\.\d+)?|[A-Za-z_$][\w$.]*')
+_TS_ESCAPE = re.compile(r'\\(.)', re.S)
+# scoring.ts question lists (ATTACHMENT_QUESTIONS, CONFIDENCE_QUESTIONS, ...) up to their initializer
+_TS_QUESTION_LIST = re.compile(r'\bconst\s+(\w+_QUESTIONS)\b[^=]*=\s*')
+
+def _ts_value(text: str, pos: int) -> Tuple[Any, int]:
+    """Parse one TS literal (object, array, string, number, bare identifier) at pos; returns (value, end).
+
+    Only the subset the quiz data files use: no spreads, calls or templates
+    with substitutions. Raises ValueError on anything else.
+    """
+    pos = _TS_SPACE.match(text, pos).end()
+    char = text[pos:pos + 1]
+    if char in ('{', '['):
+        close = '}' if char == '{' else ']'
+        items: Any = {} if char == '{' else []
+        pos += 1
+        while True:
+            pos = _TS_SPACE.match(text, pos).end()
+            if text.startswith(close, pos):
+                return items, pos + 1
+            if char == '{':
+                key = _TS_STRING.match(text, pos) or _TS_ATOM.match(text, pos)
+                if key is None:
+                    raise ValueError(f'expected a property name at offset {pos}')
+                pos = _TS_SPACE.match(text, key.end()).end()
+                if not text.startswith(':', pos):
+                    raise ValueError(f'expected : at offset {pos}')
+                items[key.group(2) if key.re is _TS_STRING else key.group()], pos = _ts_value(text, pos + 1)
+            else:
+                value, pos = _ts_value(text, pos)
+                items.append(value)
+            pos = _TS_SPACE.match(text, pos).end()
+            if text.startswith(',', pos):
+                pos += 1
+            elif not text.startswith(close, pos):
+                raise ValueError(f'expected , or {close} at offset {pos}')
+    string = _TS_STRING.match(text, pos)
+    if string is not None:
+        return _TS_ESCAPE.sub(r'\1', string.group(2)), string.end()
+    atom = _TS_ATOM.match(text, pos)
+    if atom is None:
+        raise ValueError(f'unexpected {char!r} at offset {pos}')
+    word = atom.group()
+    if word[0].isdigit() or word[0] == '-':
+        return (float(word) if '.' in word else int(word)), atom.end()
+    return {'true': True, 'false': False, 'null': None}.get(word, word), atom.end()
+
+def _ts_literals(text: str) -> Iterator[Any]:
+    """Every outermost object or array literal in a TS source, skipping strings, comments and code blocks."""
+    pos = 0
+    while True:
+        pos = _TS_SPACE.match(text, pos).end()
+        if pos >= len(text):
+            return
+        string = _TS_STRING.match(text, pos)
+        if string is not None:
+            pos = string.end()
+            continue
+        if text[pos] in '{[':
+            try:
+                value, pos = _ts_value(text, pos)
+                yield value
+                continue
+            except (ValueError, IndexError):
+                pass  # a type, import list or function body: step inside and keep scanning
+        pos += 1
+
+def _ts_objects(value: Any) -> Iterator[Dict[str, Any]]:
+    """Every object in a parsed literal, outermost first, in source order."""
+    if isinstance(value, dict):
+        yield value
+        value = list(value.values())
+    if isinstance(value, list):
+        for item in value:
+            yield from _ts_objects(item)
+
+def spec_hash(root: str = APP_ROOT) -> str:
+    """sha256 over the loader format and every TS source, in SPEC_SOURCES order."""
+    digest = hashlib.sha256(f'format={SPEC_FORMAT}\n'.encode())
+    for name, rel in SPEC_SOURCES.items():
+        with open(os.path.join(root, rel), 'rb') as f:
+            data = f.read()
+        digest.update(f'{name}:{len(data)}\n'.encode())
+        digest.update(data)
+    return digest.hexdigest()
+
+def _string_fields(value: Any) -> Dict[str, str]:
+    return {key: field for key, field in value.items() if isinstance(field, str)} if isinstance(value, dict) else {}
+
+def parse_questions_ts(text: str) -> List[Dict[str, Any]]:
+    """Question objects from questions.ts: id, type, scoring fields, reverse flag, scenario options."""
+    questions = []
+    for literal in _ts_literals(text):
+        for obj in _ts_objects(literal):
+            # quizSections entries share the id: shape but carry no scoring
+            if not isinstance(obj.get('id'), str) or not isinstance(obj.get('scoring'), dict):
+                continue
+            options = obj.get('options')
+            questions.append({
+                'id': obj['id'],
+                'type': obj.get('type', 'likert'),
+                'scoring': _string_fields(obj['scoring']),
+                'reverse': obj.get('reverse') is True,
+                'options': {opt['key']: _string_fields(opt.get('scoring'))
+                            for opt in (options if isinstance(options, list) else [])
+                            if isinstance(opt, dict) and 'key' in opt},
+            })
+    return questions
+
+def parse_matrix_ts(text: str) -> Dict[str, Dict[str, str]]:
+    """ARCHETYPE_MATRIX from matrix.ts as attachment -> communication -> slug."""
+    match = re.search(r'\bARCHETYPE_MATRIX\b[^=]*=\s*', text)
+    if match is None:
+        raise ValueError('matrix.ts: ARCHETYPE_MATRIX not found')
+    matrix, _ = _ts_value(text, match.end())
+    if not isinstance(matrix, dict):
+        raise ValueError('matrix.ts: ARCHETYPE_MATRIX is not an object literal')
+    return {row: _string_fields(cells) for row, cells in matrix.items()}
+
+def parse_scored_ts(text: str) -> List[str]:
+    """Question ids listed in scoring.ts's *_QUESTIONS tables (EXPECTED_* checks excluded), sorted."""
+    scored = set()
+    for match in _TS_QUESTION_LIST.finditer(text):
+        if match.group(1).startswith('EXPECTED_'):
+            continue
+        table, _ = _ts_value(text, match.end())
+        stack = [table]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                scored.add(node)
+            elif isinstance(node, dict):
+                stack.extend(node.values())
+            elif isinstance(node, list):
+                stack.extend(node)
+    if not scored:
+        raise ValueError('scoring.ts: no *_QUESTIONS tables found')
+    return sorted(scored)
+
+def compile_spec(questions: List[Dict[str, Any]], matrix: Dict[str, Dict[str, str]],
+                 scored: Collection[str]) -> Dict[str, Any]:
+    """Group parsed questions into the shape ScoringPlan and the module constants use.
+
+    Questions that scoring.ts never lists (scored) are collected but not
+    scored; they are reported under 'unscored'.
+    """
+    scored = set(scored)
+    spec: Dict[str, Any] = {
+        'questions': [q['id'] for q in questions],
+        'unscored': [q['id'] for q in questions if q['type'] != 'scenario' and q['id'] not in scored],
+        'reverse': sorted(q['id'] for q in questions if q['reverse']),
+        'attachment': {}, 'communication': {}, 'confidence': [], 'emotional': [],
+        'intimacy': {'comfort': [], 'boundary': []}, 'love': {},
+        'scenarioQuestion': None, 'scenarioKeys': {}, 'archetypeMatrix': matrix,
+    }
+    for q in questions:
+        qid, scoring = q['id'], q['scoring']
+        section = scoring.get('section')
+        if q['type'] == 'scenario':
+            spec['scenarioQuestion'] = qid
+            spec['scenarioKeys'] = {key: opt['style'] for key, opt in q['options'].items() if 'style' in opt}
+        elif qid not in scored:
+            continue
+        elif section == 'attachment':
+            spec['attachment'].setdefault(scoring['dimension'], []).append(qid)
+        elif section == 'communication':
+            spec['communication'].setdefault(scoring['style'], []).append(qid)
+        elif section in ('confidence', 'emotional'):
+            spec[section].append(qid)
+        elif section == 'intimacy':
+            spec['intimacy'][scoring['dimension']].append(qid)
+        elif section == 'love_language':
+            pair = spec['love'].setdefault(scoring['language'], [None, None])
+            pair[0 if scoring['direction'] == 'give' else 1] = qid
+        else:
+            raise ValueError(f'questions.ts: {qid} has unknown scoring section {section!r}')
+    missing = [name for name in ('attachment', 'communication', 'confidence', 'emotional', 'love', 'scenarioQuestion')
+               if not spec[name]]
+    if missing or not matrix:
+        raise ValueError(f"questions.ts/matrix.ts: nothing parsed for {', '.join(missing or ['archetypeMatrix'])}")
+    return spec
+
+def load_spec(root: str = APP_ROOT, cache_dir: Optional[str] = SPEC_CACHE_DIR) -> Tuple[Dict[str, Any], bool]:
+    """The compiled spec and whether it came from the cache.
+
+    Cache entries are named by spec_hash, so any edit to a source file (or a
+    SPEC_FORMAT bump) misses and re-parses; unreadable entries are rebuilt.
+    Pass cache_dir=None to always parse.
+    """
+    digest = spec_hash(root)
+    path = os.path.join(cache_dir, f'spec-{digest}.json') if cache_dir else None
+    if path is not None:
+        try:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f), True
+        except (OSError, ValueError):
+            pass
+    texts = {}
+    for name, rel in SPEC_SOURCES.items():
+        with open(os.path.join(root, rel), encoding='utf-8') as f:
+            texts[name] = f.read()
+    spec = compile_spec(parse_questions_ts(texts['questions']), parse_matrix_ts(texts['matrix']),
+                        parse_scored_ts(texts['scoring']))
+    spec['hash'] = digest
+    if path is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(spec, f)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+    return spec, False
+
+def plan_from_spec(spec: Dict[str, Any], scenario_bonus: int = SCENARIO_BONUS) -> ScoringPlan:
+    return ScoringPlan(
+        attachment=spec['attachment'],
+        communication=spec['communication'],
+        confidence=spec['confidence'],
+        emotional=spec['emotional'],
+        comfort=spec['intimacy']['comfort'],
+        boundary=spec['intimacy']['boundary'],
+        love={lang: tuple(pair) for lang, pair in spec['love'].items()},
+        reverse=frozenset(spec['reverse']),
+        scenario_key_map=spec['scenarioKeys'],
+        scenario_bonus=scenario_bonus,
+    )
+
+def spec_drift(spec: Dict[str, Any]) -> List[str]:
+    """Where the hand-copied constants in this script disagree with the TS spec."""
+    ours = {
+        'reverse': sorted(REVERSE_QUESTIONS),
+        'attachment': ATTACHMENT_QUESTIONS,
+        'communication': COMMUNICATION_QUESTIONS,
+        'confidence': CONFIDENCE_QUESTIONS,
+        'emotional': EMOTIONAL_QUESTIONS,
+        'intimacy': {'comfort': INTIMACY_COMFORT, 'boundary': INTIMACY_BOUNDARY},
+        'love': {lang: list(pair) for lang, pair in LOVE_LANGUAGE_QUESTIONS.items()},
+        'scenarioQuestion': SCENARIO_QUESTION,
+        'scenarioKeys': SCENARIO_KEY_MAP,
+        'archetypeMatrix': ARCHETYPE_MATRIX,
+    }
+    return [f'{name}: script has {value!r}, TS has {spec.get(name)!r}'
+            for name, value in ours.items() if spec.get(name) != value]
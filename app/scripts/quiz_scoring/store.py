@@ -0,0 +1,258 @@
+"""SQLite store: bulk ingest of rescored rows for offline analysis."""
+
+import json
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import time
+from array import array
+from itertools import repeat
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Any
+
+from .core import ATTACHMENT_ORDER, COMMUNICATION_ORDER, LOVE_LANGUAGE_ORDER
+from .profiling import PROFILER
+from .rescore import (
+    PASSTHROUGH_COLUMNS, RESCORE_CHUNK_SIZE, RESCORE_STAGES, SHARDS_PER_WORKER, STAGE_NAMES, _WORKER_STATE,
+    RescoreChunk, _archetype_stage, byte_shards, db_primary, _init_worker, _iter_range_lines, _read_chunks,
+    summarize_workers, _worker_stats,
+)
+from .corpus import Corpus, _corpus_chunks
+from .files import open_input
+
+STORE_TABLE = 'rescored_results'
+# Rows per transaction during ingest; executemany runs once per pipeline chunk
+STORE_COMMIT_ROWS = 200_000
+STORE_SCORE_COLUMNS: Tuple[str, ...] = tuple(
+    [f'attachment_{d}' for d in ATTACHMENT_ORDER] + [f'communication_{s}' for s in COMMUNICATION_ORDER]
+    + ['confidence', 'emotional', 'intimacy_comfort', 'intimacy_boundaries']
+    + [f'love_{l}' for l in LOVE_LANGUAGE_ORDER]
+)
+STORE_COLUMNS: Tuple[str, ...] = PASSTHROUGH_COLUMNS + (
+    'archetype_slug', 'archetype_confidence', 'is_balanced',
+    'attachment_primary', 'communication_primary', 'love_primary',
+) + STORE_SCORE_COLUMNS + ('error',)
+# Mirrors the quiz_results indexes in docs/schema.sql; the JSONB primary_styles GIN
+# index becomes a composite on the flattened primary columns
+# (id is the table's primary key, so it needs no index here)
+STORE_INDEXES = {
+    'idx_rescored_public_slug': '(public_slug) WHERE public_slug IS NOT NULL',
+    'idx_rescored_primary_styles': '(attachment_primary, communication_primary)',
+    'idx_rescored_archetype': '(archetype_slug)',
+    'idx_rescored_created_at': '(created_at DESC)',
+    'idx_rescored_archetype_created': '(archetype_slug, created_at DESC)',
+    'idx_rescored_utm': '(utm_source, utm_campaign, created_at DESC) WHERE utm_source IS NOT NULL',
+    # Not in schema.sql: covers archetype_utm_breakdown so it never touches the table
+    'idx_rescored_archetype_utm': '(archetype_slug, utm_source, utm_campaign, created_at) WHERE error IS NULL',
+}
+
+def open_store(db_path: str, sharded: bool = False) -> sqlite3.Connection:
+    """Connection to a store database, creating the results table (keyed by id, like quiz_results) if needed.
+
+    sharded adds a trailing shard column, for the part databases of a
+    parallel ingest (see _shard_upsert_sql).
+    """
+    conn = sqlite3.connect(db_path)
+    numeric = ', '.join(f'{col} INTEGER' for col in STORE_SCORE_COLUMNS)
+    conn.execute(f'CREATE TABLE IF NOT EXISTS {STORE_TABLE} ('
+                 'id TEXT PRIMARY KEY, created_at TEXT, public_slug TEXT, utm_source TEXT, utm_medium TEXT, '
+                 'utm_campaign TEXT, archetype_slug TEXT, archetype_confidence REAL, is_balanced INTEGER, '
+                 f'attachment_primary TEXT, communication_primary TEXT, love_primary TEXT, {numeric}, error TEXT'
+                 f"{', shard INTEGER' if sharded else ''})")
+    keys = [name for _, name, _, _, _, pk in conn.execute(f'PRAGMA table_info({STORE_TABLE})') if pk]
+    if keys != ['id']:
+        conn.close()
+        raise ValueError(f'{db_path}: {STORE_TABLE} is not keyed by id; delete it and ingest again')
+    return conn
+
+def _bulk_load_mode(conn: sqlite3.Connection) -> None:
+    """Trade crash safety for load speed; a failed ingest means rebuilding the store from the export."""
+    conn.execute('PRAGMA synchronous = OFF')
+    conn.execute('PRAGMA journal_mode = MEMORY')
+    conn.execute('PRAGMA cache_size = -262144')
+
+def drop_store_indexes(conn: sqlite3.Connection) -> None:
+    for name in STORE_INDEXES:
+        conn.execute(f'DROP INDEX IF EXISTS {name}')
+
+def create_store_indexes(conn: sqlite3.Connection) -> None:
+    for name, definition in STORE_INDEXES.items():
+        table_cols, _, where = definition.partition(' WHERE ')
+        conn.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {STORE_TABLE}{table_cols}'
+                     + (f' WHERE {where}' if where else ''))
+    conn.execute('ANALYZE')
+    conn.commit()
+
+def _store_primaries(scores: Dict[str, array], order: List[str]) -> List[str]:
+    """db_primary per row as text (tie lists JSON-encoded), memoized by score tuple."""
+    seen: Dict[Tuple[int, ...], str] = {}
+    out = []
+    for row in zip(*(scores[key] for key in order)):
+        text = seen.get(row)
+        if text is None:
+            primary = db_primary(dict(zip(order, row)), order)
+            text = seen[row] = primary if isinstance(primary, str) else json.dumps(primary)
+        out.append(text)
+    return out
+
+def store_chunk_rows(chunk: RescoreChunk) -> List[tuple]:
+    """STORE_COLUMNS tuples for a chunk that has been through the score and archetype stages."""
+    batch, archetypes = chunk.batch, chunk.archetypes
+    love = batch['loveLanguages']
+    columns: List[Sequence[Any]] = [[row.get(col) for row in chunk.rows] for col in PASSTHROUGH_COLUMNS]
+    columns += [archetypes['slug'], archetypes['confidence'], [int(b) for b in archetypes['isBalanced']],
+                _store_primaries(batch['attachment']['scores'], ATTACHMENT_ORDER),
+                _store_primaries(batch['communication']['scores'], COMMUNICATION_ORDER),
+                [ranked[0] for ranked in love['ranked']]]
+    columns += [batch['attachment']['scores'][d] for d in ATTACHMENT_ORDER]
+    columns += [batch['communication']['scores'][s] for s in COMMUNICATION_ORDER]
+    columns += [batch['confidence'], batch['emotional'], batch['intimacy']['comfort'], batch['intimacy']['boundaries']]
+    columns += [love['scores'][l] for l in LOVE_LANGUAGE_ORDER]
+    columns.append(repeat(None, len(chunk.rows)))
+    rows = list(zip(*columns))
+    passthrough = len(PASSTHROUGH_COLUMNS)
+    for i, error in chunk.errors.items():
+        rows[i] = rows[i][:passthrough] + (None,) * (len(STORE_COLUMNS) - passthrough - 1) + (error,)
+    return rows
+
+def _store_export_chunks(lines: Iterable[bytes], chunk_size: int) -> Iterator[RescoreChunk]:
+    """The rescore pipeline up to archetypes; rows go to SQLite instead of the serialize stage."""
+    chunks: Iterator[RescoreChunk] = _read_chunks(lines, chunk_size)
+    for stage in RESCORE_STAGES[:-1]:
+        chunks = map(PROFILER.wrap(STAGE_NAMES[stage], stage), chunks)
+    return chunks
+
+def _shard_upsert_sql(source: str) -> str:
+    """Upsert source rows into a sharded table, keeping the row from the highest shard for each id.
+
+    Ties go to the incoming row, so within a shard the last row wins, as in
+    a serial ingest.
+    """
+    columns = STORE_COLUMNS[1:] + ('shard',)
+    return (f"INSERT INTO {STORE_TABLE} {source} ON CONFLICT(id) DO UPDATE SET "
+            f"{', '.join(f'{col} = excluded.{col}' for col in columns)} WHERE excluded.shard >= shard")
+
+def insert_chunks(conn: sqlite3.Connection, chunks: Iterable[RescoreChunk],
+                  shard: Optional[int] = None) -> Tuple[int, int]:
+    """executemany each chunk, committing every STORE_COMMIT_ROWS rows; returns (rows, errors).
+
+    Rows replace any stored row with the same id, so ingesting an export
+    again updates it in place. Rows without an id cannot be keyed; they
+    count as errors but are not stored. With a shard index, rows go to a
+    sharded part table tagged with it.
+    """
+    if shard is None:
+        sql = f"INSERT OR REPLACE INTO {STORE_TABLE} VALUES ({', '.join('?' * len(STORE_COLUMNS))})"
+    else:
+        sql = _shard_upsert_sql(f"VALUES ({', '.join('?' * (len(STORE_COLUMNS) + 1))})")
+    rows = errors = pending = 0
+    insert = PROFILER.wrap('insert', conn.executemany)
+    for chunk in chunks:
+        records = []
+        for i, record in enumerate(store_chunk_rows(chunk)):
+            if record[0] is not None:
+                records.append(record if shard is None else record + (shard,))
+            elif i not in chunk.errors:
+                errors += 1
+        insert(sql, records)
+        rows += len(records)
+        errors += len(chunk.errors)
+        pending += len(records)
+        if pending >= STORE_COMMIT_ROWS:
+            conn.commit()
+            pending = 0
+    conn.commit()
+    return rows, errors
+
+def _init_store_worker(directory: str, chunk_size: int) -> None:
+    """One connection per worker process, to its own part database, reused for every shard."""
+    _init_worker(chunk_size, False)
+    part = os.path.join(directory, f'part-{os.getpid()}.db')
+    conn = open_store(part, sharded=True)
+    _bulk_load_mode(conn)
+    _WORKER_STATE.update(store=conn, part=part)
+
+def _store_shard(bounds: Tuple[str, int, int, int]) -> Dict[str, Any]:
+    path, start, end, shard = bounds
+    began = time.perf_counter()
+    with open(path, 'rb') as f:
+        rows, errors = insert_chunks(_WORKER_STATE['store'],
+                                     _store_export_chunks(_iter_range_lines(f, start, end), _WORKER_STATE['chunk_size']),
+                                     shard)
+    return dict(_worker_stats(rows, errors, began), part=_WORKER_STATE['part'])
+
+def _merge_parts(parts: Sequence[str]) -> None:
+    """Upsert every part database into the first, so each id keeps its row from the latest shard."""
+    conn = sqlite3.connect(parts[0])
+    try:
+        _bulk_load_mode(conn)
+        for part in parts[1:]:
+            conn.execute('ATTACH DATABASE ? AS part', (part,))
+            # WHERE true keeps SQLite from reading ON CONFLICT as a join constraint
+            conn.execute(_shard_upsert_sql(f'SELECT * FROM part.{STORE_TABLE} WHERE true'))
+            conn.commit()
+            conn.execute('DETACH DATABASE part')
+    finally:
+        conn.close()
+
+def ingest_store(path: str, db_path: str, workers: int = 1, chunk_size: int = RESCORE_CHUNK_SIZE) -> Dict[str, Any]:
+    """Rescore an export (or corpus directory) into the SQLite store at db_path.
+
+    Rows are keyed by id, so ingesting the same export again replaces its
+    rows rather than duplicating them. Indexes are dropped for the load and
+    rebuilt afterwards. With workers > 1 each worker process loads byte
+    shards into its own part database over one reused connection, tagging
+    rows with their shard index. The parts are merged keeping the highest
+    shard per id and copied into the store before indexing, so an id
+    repeated across shards keeps its last row, as in a serial ingest.
+    """
+    began = time.perf_counter()
+    conn = open_store(db_path)
+    try:
+        _bulk_load_mode(conn)
+        drop_store_indexes(conn)
+        shard_stats: List[Dict[str, Any]] = []
+        if os.path.isdir(path):
+            with Corpus(path) as corpus:
+                chunks = map(PROFILER.wrap('archetype', _archetype_stage), _corpus_chunks(corpus, 0, corpus.rows, chunk_size))
+                rows, errors = insert_chunks(conn, chunks)
+        elif workers > 1 and path != '-':
+            with tempfile.TemporaryDirectory(prefix='store-', dir=os.path.dirname(os.path.abspath(db_path))) as tmp:
+                with multiprocessing.Pool(workers, initializer=_init_store_worker, initargs=(tmp, chunk_size)) as pool:
+                    tasks = [(path, start, end, shard)
+                             for shard, (start, end) in enumerate(byte_shards(path, workers * SHARDS_PER_WORKER))]
+                    shard_stats = pool.map(_store_shard, tasks)
+                    pool.close()
+                    pool.join()
+                parts = sorted({s['part'] for s in shard_stats})
+                if parts:
+                    _merge_parts(parts)
+                    conn.execute('ATTACH DATABASE ? AS part', (parts[0],))
+                    conn.execute(f"INSERT OR REPLACE INTO main.{STORE_TABLE} "
+                                 f"SELECT {', '.join(STORE_COLUMNS)} FROM part.{STORE_TABLE}")
+                    conn.commit()
+                    conn.execute('DETACH DATABASE part')
+            rows = sum(s['rows'] for s in shard_stats)
+            errors = sum(s['errors'] for s in shard_stats)
+        else:
+            with open_input(path) as infile:
+                rows, errors = insert_chunks(conn, _store_export_chunks(infile, chunk_size))
+        loaded = time.perf_counter()
+        with PROFILER.span('index'):
+            create_store_indexes(conn)
+    finally:
+        conn.close()
+    stats = {'rows': rows, 'errors': errors, 'loadSeconds': round(loaded - began, 3),
+             'indexSeconds': round(time.perf_counter() - loaded, 3)}
+    if shard_stats:
+        stats['workers'] = summarize_workers(shard_stats)
+    return stats
+
+def archetype_utm_breakdown(conn: sqlite3.Connection, since: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Rows per (archetype_slug, utm_source, utm_campaign), optionally from created_at >= since."""
+    where = 'WHERE error IS NULL' + (' AND created_at >= ?' if since else '')
+    cursor = conn.execute(
+        f'SELECT archetype_slug, utm_source, utm_campaign, COUNT(*) AS n FROM {STORE_TABLE} {where} '
+        'GROUP BY archetype_slug, utm_source, utm_campaign ORDER BY n DESC, archetype_slug, utm_source, utm_campaign',
+        (since,) if since else ())
+    return [{'archetype': a, 'utm_source': s, 'utm_campaign': c, 'rows': n} for a, s, c, n in cursor]
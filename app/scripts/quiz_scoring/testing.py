@@ -0,0 +1,203 @@
+"""Test framework: results, seeded responses, and the shared fixture table checked on every scoring path."""
+
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from io import StringIO
+from itertools import product
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Any
+
+from .core import (
+    ATTACHMENT_QUESTIONS, REVERSE_QUESTIONS, SCENARIO_KEY_MAP, compute_archetype, compute_archetype_batch,
+    score_responses,
+)
+from .batch import (
+    BATCH_COLUMNS, CompactResponse, ResponseTable, batch_row_result, encode_answers, pack_answers, score_packed,
+)
+from .spec import APP_ROOT
+from .incremental import IncrementalScorer, answer_events
+from .rescore import rescore_stream, to_db_scores
+from .corpus import build_corpus, rescore_corpus
+from .daemon import MicroBatcher
+
+class TestResult:
+    __slots__ = ('name', 'passed', 'expected', 'actual', 'details', 'seconds')
+
+    def __init__(self, name: str, passed: bool, expected: Any, actual: Any, details: str = '',
+                 seconds: float = 0.0):
+        self.name = name
+        self.passed = passed
+        self.expected = expected
+        self.actual = actual
+        self.details = details
+        self.seconds = seconds
+
+# perf_counter of the previous run_test call, or of the start of the running unit
+_TEST_CLOCK: Dict[str, float] = {'last': 0.0}
+
+def run_test(name: str, expected: Any, actual: Any) -> TestResult:
+    """Compare and record a result, timed as the work since the previous result of its unit.
+
+    Suites compute each actual value just before passing it here, so that
+    interval is the time the test took.
+    """
+    now = time.perf_counter()
+    passed = expected == actual
+    result = TestResult(name, passed, expected, actual, seconds=now - _TEST_CLOCK['last'])
+    _TEST_CLOCK['last'] = now
+    return result
+
+def _all_answer_vectors(count: int) -> Iterator[Tuple[int, ...]]:
+    """Every combination of 1-5 answers to `count` questions."""
+    return product(range(1, 6), repeat=count)
+
+def random_responses(rng: random.Random, answer_rate: float = 1.0) -> Tuple[Dict[str, int], Optional[str]]:
+    """Generate one seeded response dict and scenario key, skipping questions at 1 - answer_rate."""
+    responses = {qid: rng.randint(1, 5) for qid in BATCH_COLUMNS if rng.random() < answer_rate}
+    scenario_key = rng.choice([None, 'A', 'B', 'C', 'D']) if rng.random() < answer_rate else None
+    return responses, scenario_key
+
+def random_cases(seed: int, rates: Sequence[float], per_rate: int) -> List[Tuple[Dict[str, int], Optional[str]]]:
+    """`per_rate` seeded random_responses at each answer rate in turn, from one Random(seed)."""
+    rng = random.Random(seed)
+    return [random_responses(rng, rate) for rate in rates for _ in range(per_rate)]
+
+# Shared with src/lib/quiz/__tests__/scoring-fixtures.test.ts: [{name, answers, expected: {scores, archetype}}]
+FIXTURES_PATH = os.path.join(APP_ROOT, 'src', 'lib', 'quiz', '__tests__', 'fixtures', 'scoring-cases.json')
+FIXTURE_SEED = 2020
+FIXTURE_COUNT = 48
+
+def fixture_case(name: str, responses: Dict[str, int], scenario_key: Optional[str] = None) -> Dict[str, Any]:
+    """One fixture: a DBAnswerMap and the DBScores and archetype slug the reference scorer gives it."""
+    scored = score_responses(responses, scenario_key)
+    archetype = compute_archetype(scored['attachment']['scores'], scored['communication']['scores'])
+    return {'name': name, 'answers': encode_answers(responses, scenario_key),
+            'expected': {'scores': json.loads(json.dumps(to_db_scores(scored))), 'archetype': archetype['slug']}}
+
+def generate_fixtures(count: int = FIXTURE_COUNT, seed: int = FIXTURE_SEED) -> List[Dict[str, Any]]:
+    """Hand-picked edge cases followed by `count` seeded random sessions."""
+    cases = [fixture_case('empty', {})]
+    for val in range(1, 6):
+        cases.append(fixture_case(f'straight-line-{val}', {qid: val for qid in BATCH_COLUMNS}))
+    for key in SCENARIO_KEY_MAP:
+        cases.append(fixture_case(f'neutral-scenario-{key}', {qid: 3 for qid in BATCH_COLUMNS}, key))
+    cases.append(fixture_case('reverse-only', {qid: 1 for qid in REVERSE_QUESTIONS}))
+    cases.append(fixture_case('attachment-only', {qid: 4 for qids in ATTACHMENT_QUESTIONS.values() for qid in qids}))
+    rng = random.Random(seed)
+    for i in range(count):
+        cases.append(fixture_case(f'random-{i:03d}', *random_responses(rng, 1.0 if i % 2 else 0.8)))
+    return cases
+
+def write_fixtures(path: str, cases: List[Dict[str, Any]]) -> None:
+    """One case per line, so regenerated fixtures diff line by line."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        f.write('[\n' + ',\n'.join(json.dumps(case, separators=(',', ':')) for case in cases) + '\n]\n')
+
+def load_fixtures(path: str = FIXTURES_PATH) -> List[Dict[str, Any]]:
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def iter_fixtures(path: str = FIXTURES_PATH) -> Iterator[Dict[str, Any]]:
+    """Stream cases from a table laid out one case per line, as write_fixtures writes it."""
+    with open(path, encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip().rstrip(',')
+            if line in ('', '[', ']', '[]'):
+                continue
+            try:
+                case = json.loads(line)
+            except ValueError:
+                raise ValueError(f'{path}:{number}: expected one case per line; regenerate with --write-fixtures')
+            # A table written on a single line parses whole
+            if isinstance(case, list):
+                yield from case
+            else:
+                yield case
+
+def _per_dict_path(answers: List[Dict[str, Any]], compact: bool = False) -> List[Dict[str, Any]]:
+    outcomes = []
+    for entry in answers:
+        record = CompactResponse.from_answers(entry)
+        scored = score_responses(record if compact else record.to_responses(), record.scenario_key)
+        slug = compute_archetype(scored['attachment']['scores'], scored['communication']['scores'])['slug']
+        outcomes.append({'scores': to_db_scores(scored), 'archetype': slug})
+    return outcomes
+
+def _batch_outcomes(batch: Dict[str, Any]) -> List[Dict[str, Any]]:
+    slugs = compute_archetype_batch(batch['attachment']['scores'], batch['communication']['scores'])['slug']
+    return [{'scores': to_db_scores(batch_row_result(batch, i)), 'archetype': slug} for i, slug in enumerate(slugs)]
+
+def _table_path(answers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    table = ResponseTable()
+    for entry in answers:
+        table.append(CompactResponse.from_answers(entry))
+    return _batch_outcomes(table.score())
+
+def _incremental_path(answers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    outcomes = []
+    for entry in answers:
+        scorer = IncrementalScorer()
+        for _, qid, value in answer_events(entry):
+            scorer.set(qid, value)
+        result = scorer.result()
+        outcomes.append({'scores': to_db_scores(result), 'archetype': result['archetype']['slug']})
+    return outcomes
+
+def _rescored_outcomes(text: str) -> List[Dict[str, Any]]:
+    return [{'scores': record.get('scores'), 'archetype': record.get('archetype_slug')}
+            for record in map(json.loads, text.splitlines())]
+
+def _rescore_path(answers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    out = StringIO()
+    rescore_stream([json.dumps({'answers': entry}).encode() for entry in answers], out)
+    return _rescored_outcomes(out.getvalue())
+
+def _corpus_path(answers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    with tempfile.TemporaryDirectory(prefix='quiz-fixtures-') as tmp:
+        directory = os.path.join(tmp, 'corpus')
+        build_corpus([json.dumps({'answers': entry}).encode() for entry in answers], directory)
+        out = StringIO()
+        rescore_corpus(directory, out)
+    return _rescored_outcomes(out.getvalue())
+
+def _daemon_path(answers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    async def score() -> List[Dict[str, Any]]:
+        batcher = MicroBatcher(window=0)
+        return await asyncio.gather(*(batcher.submit(pack_answers(entry)) for entry in answers))
+    return [{'scores': reply['scores'], 'archetype': reply['archetype']['slug']} for reply in asyncio.run(score())]
+
+# Every way the script scores a DBAnswerMap, as answer maps -> [{scores, archetype}] in input order
+SCORING_PATHS = {
+    'reference': _per_dict_path,
+    'compact': lambda answers: _per_dict_path(answers, compact=True),
+    'batch': lambda answers: _batch_outcomes(score_packed([pack_answers(entry) for entry in answers])),
+    'table': _table_path,
+    'incremental': _incremental_path,
+    'rescore': _rescore_path,
+    'corpus': _corpus_path,
+    'daemon': _daemon_path,
+}
+
+def check_fixtures(cases: List[Dict[str, Any]]) -> List[TestResult]:
+    """Score the fixtures on every SCORING_PATHS path and compare each with its expected DBScores and archetype.
+
+    Paths score the whole slice at once, so each result is timed as an even
+    share of the slice.
+    """
+    if not cases:
+        return []
+    answers = [case['answers'] for case in cases]
+    began = time.perf_counter()
+    outcomes = {name: json.loads(json.dumps(path(answers))) for name, path in SCORING_PATHS.items()}
+    share = (time.perf_counter() - began) / len(cases)
+    results = []
+    for i, case in enumerate(cases):
+        result = run_test(f"fixture {case['name']}", {name: case['expected'] for name in outcomes},
+                          {name: rows[i] for name, rows in outcomes.items()})
+        result.seconds = share
+        results.append(result)
+    return results
@@ -0,0 +1,38 @@
+"""Validation suites, one module per quiz_scoring module; TEST_SUITES is the report order."""
+
+from .analysis import test_parameter_sweep, test_population_stats, test_sensitivity
+from .audit import test_drift_audit
+from .batch import test_batch_scoring, test_compact_responses, test_scoring_plan
+from .bench import test_benchmarks
+from .core import (
+    test_archetype, test_attachment, test_communication, test_confidence, test_emotional, test_integration,
+    test_intimacy, test_joint_probability, test_love_languages, test_normalization, test_reverse_scoring,
+)
+from .corpus import test_corpus
+from .daemon import test_scoring_daemon
+from .exhaustive import test_exhaustive_space
+from .fuzz import test_differential_fuzz
+from .incremental import test_incremental_scorer
+from .profiling import test_stage_profiler
+from .rescore import test_parallel_rescore, test_rescore_stream
+from .runner import test_report_writer, test_test_runner
+from .spec import test_spec_loader
+from .store import test_sqlite_store
+
+# Suites in report order; each returns a list of TestResult
+# Grouped as the suites are defined: reference scoring, the batch rescore pipeline,
+# incremental scoring, population analysis, tooling, the test harness, then exhaustive checks
+TEST_SUITES = [
+    test_normalization, test_reverse_scoring, test_attachment, test_communication, test_confidence,
+    test_emotional, test_intimacy, test_love_languages, test_archetype, test_joint_probability,
+    test_integration,
+    test_batch_scoring, test_rescore_stream, test_parallel_rescore, test_scoring_plan, test_compact_responses,
+    test_corpus,
+    test_incremental_scorer,
+    test_population_stats, test_sensitivity, test_parameter_sweep,
+    test_benchmarks, test_stage_profiler, test_spec_loader, test_scoring_daemon,
+    test_drift_audit, test_sqlite_store,
+    test_test_runner, test_report_writer,
+    test_exhaustive_space, test_differential_fuzz,
+]
+SUITES = {func.__name__[len('test_'):]: func for func in TEST_SUITES}
@@ -0,0 +1,153 @@
+"""Suites for quiz_scoring.analysis."""
+
+import json
+import os
+import tempfile
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from ..core import (
+    ARCHETYPE_SLUGS, ATTACHMENT_PRIORITY, BALANCED_THRESHOLD, COMMUNICATION_PRIORITY, EPSILON, LOVE_LANGUAGE_ORDER,
+    MAX_ENTROPY_4, SCENARIO_BONUS, compute_archetype, entropy, probabilities, score_responses, _winning_cell,
+)
+from ..batch import (
+    BATCH_COLUMNS, SCENARIO_CODES, CompactResponse, ScoringPlan, encode_answers, score_batch, to_batch_row,
+)
+from ..corpus import build_corpus
+from ..analysis import (
+    STABLE_MARGIN, FragilityStats, ParameterSweep, PopulationStats, SensitivityAnalyzer, aggregate_paths,
+    aggregate_stream, sensitivity_stream, sweep_states,
+)
+from ..exhaustive import SCENARIO_OPTIONS
+from ..testing import TestResult, generate_fixtures, random_cases, run_test
+
+def test_population_stats() -> List[TestResult]:
+    """One-pass aggregates match per-row counting and merge across shards."""
+    results = []
+    # Expected counts come from the fixture expectations rather than a second scoring pass
+    cases = generate_fixtures(288, seed=37)
+    lines = [json.dumps({'id': i, 'answers': case['answers']}).encode() for i, case in enumerate(cases)]
+    lines.insert(100, b'not json')
+    expected_slugs = Counter(case['expected']['archetype'] for case in cases)
+    expected_confidence = Counter(case['expected']['scores']['confidence'] for case in cases)
+
+    stats = aggregate_stream(lines, chunk_size=64)
+    report = stats.to_dict()
+    results.append(run_test('aggregate rows and errors', (300, 1), (stats.rows, stats.errors)))
+    results.append(run_test('aggregate archetype counts', {slug: expected_slugs[slug] for slug in ARCHETYPE_SLUGS},
+                            report['archetypes']))
+    results.append(run_test('aggregate confidence histogram', [expected_confidence[i] for i in range(101)],
+                            report['histograms']['confidence']))
+    results.append(run_test('aggregate one language per rank', [300] * 5,
+                            [sum(stats.love_ranks[l][r] for l in LOVE_LANGUAGE_ORDER) for r in range(5)]))
+
+    shards = [aggregate_stream(lines[i:i + 70], chunk_size=16) for i in range(0, len(lines), 70)]
+    merged = PopulationStats()
+    for shard in shards:
+        merged.merge(PopulationStats.from_dict(json.loads(json.dumps(shard.to_dict()))))
+    results.append(run_test('aggregate shards merge exactly', report, merged.to_dict()))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'export.jsonl')
+        with open(path, 'wb') as f:
+            f.writelines(line + b'\n' for line in lines)
+        directory = os.path.join(tmp, 'corpus')
+        build_corpus(lines, directory)
+        corpus_report = aggregate_paths([directory]).to_dict()
+        results.append(run_test('aggregate corpus == export', report, corpus_report))
+        pooled = aggregate_paths([path, directory], workers=2, chunk_size=32).to_dict()
+        results.append(run_test('aggregate parallel mixed inputs', 600, pooled['rows']))
+        results.append(run_test('aggregate parallel merge', [2 * n for n in report['loveRanks']['words']],
+                                pooled['loveRanks']['words']))
+
+    return results
+
+def test_sensitivity() -> List[TestResult]:
+    """Grouped delta evaluation matches rescoring every single-answer neighbor."""
+    results = []
+    cases = random_cases(43, (1.0, 0.5), 25)
+    cases.append(({q: 3 for q in BATCH_COLUMNS}, None))
+
+    def outcome(resp: Dict[str, int], key: Optional[str]) -> Tuple[str, str, str]:
+        scored = score_responses(resp, key)
+        slug = compute_archetype(scored['attachment']['scores'], scored['communication']['scores'])['slug']
+        return slug, scored['attachment']['primary'], scored['communication']['primary']
+
+    expected = []
+    for resp, key in cases:
+        base = outcome(resp, key)
+        neighbors = [(dict(resp, **{qid: val}), key, abs(val - resp[qid]))
+                     for qid in resp for val in range(1, 6) if val != resp[qid]]
+        neighbors += [(resp, alt, 1) for alt in SCENARIO_OPTIONS if alt != key]
+        flips = [0, 0, 0]
+        margin = STABLE_MARGIN
+        for variant, alt, step in neighbors:
+            got = outcome(variant, alt)
+            flips = [f + (g != b) for f, g, b in zip(flips, got, base)]
+            if got[0] != base[0] and (margin == STABLE_MARGIN or step < margin):
+                margin = step
+        expected.append((base[0], len(neighbors), *flips, margin))
+
+    result = SensitivityAnalyzer().analyze_packed([CompactResponse.from_responses(r, k) for r, k in cases])
+    fields = ('slug', 'neighbors', 'archetypeFlips', 'attachmentFlips', 'communicationFlips', 'margin')
+    results.append(run_test('sensitivity matches brute force', expected,
+                            [tuple(result[f][i] for f in fields) for i in range(len(cases))]))
+
+    stats = FragilityStats()
+    stats.add(result)
+    halves = FragilityStats()
+    for part in (slice(0, 20), slice(20, None)):
+        halves.merge(sensitivity_stream([json.dumps({'answers': encode_answers(r, k)}).encode()
+                                         for r, k in cases[part]]))
+    results.append(run_test('fragility merge == single pass', stats.to_dict(), halves.to_dict()))
+    results.append(run_test('fragility margin histogram covers rows', len(cases),
+                            sum(stats.to_dict()['marginHistogram'].values())))
+
+    return results
+
+def test_parameter_sweep() -> List[TestResult]:
+    """Stage-cached sweep points match rescoring with the changed constants."""
+    results = []
+    cases = random_cases(53, (1.0, 0.7), 150)
+    cases += [({q: 3 for q in BATCH_COLUMNS}, None)] * 3
+    rows = [to_batch_row(resp) for resp, _ in cases]
+    keys = [key for _, key in cases]
+    blob = b''.join(rows)
+    scenario = bytes(SCENARIO_CODES.get(key, 0) if key else 0 for key in keys)
+
+    def brute(bonus: int, epsilon: float, threshold: float) -> Tuple[List[str], List[str], int]:
+        batch = score_batch(rows, keys, ScoringPlan(scenario_bonus=bonus))
+        slugs = []
+        balanced = 0
+        for i in range(len(rows)):
+            pa = probabilities([batch['attachment']['scores'][d][i] for d in ATTACHMENT_PRIORITY])
+            pc = probabilities([batch['communication']['scores'][c][i] for c in COMMUNICATION_PRIORITY])
+            slugs.append(ARCHETYPE_SLUGS[_winning_cell([a * c for a in pa for c in pc], epsilon)])
+            balanced += entropy(pa) > threshold * MAX_ENTROPY_4 and entropy(pc) > threshold * MAX_ENTROPY_4
+        return slugs, batch['communication']['primary'], balanced
+
+    sweep = ParameterSweep(sweep_states(blob, len(BATCH_COLUMNS), scenario))
+    grid = {'scenario_bonus': [15, 25, 40], 'epsilon': [0.0, 0.005, 0.05], 'balanced_threshold': [0.8, 0.9]}
+    report = sweep.run(grid)
+    base_slugs, base_primary, _ = brute(SCENARIO_BONUS, EPSILON, BALANCED_THRESHOLD)
+
+    wrong = []
+    for point in report['points']:
+        params = point['params']
+        slugs, primary, balanced = brute(params['scenario_bonus'], params['epsilon'], params['balanced_threshold'])
+        expected = (Counter(slugs), sum(a != b for a, b in zip(slugs, base_slugs)),
+                    sum(a != b for a, b in zip(primary, base_primary)), balanced)
+        actual = (Counter({k: v for k, v in point['archetypes'].items() if v}), point['archetypeShifted'],
+                  point['communicationPrimaryShifted'], point['balanced'])
+        if expected != actual:
+            wrong.append(params)
+    results.append(run_test('sweep points match brute force (18)', [], wrong))
+    results.append(run_test('sweep states dedupe rows', True, report['states'] < len(rows)))
+    results.append(run_test('sweep caches per stage', {'communication': 3, 'primary': 3, 'archetype': 9, 'shift': 9,
+                                                       'balanced': 6},
+                            {stage: stats['misses'] for stage, stats in report['cache'].items()}))
+    baseline = sweep.evaluate()
+    results.append(run_test('sweep baseline has no shifts', (0, 0), (baseline['archetypeShifted'],
+                                                                  baseline['communicationPrimaryShifted'])))
+
+    return results
@@ -0,0 +1,115 @@
+"""Suites for quiz_scoring.audit."""
+
+import json
+import os
+import random
+import shutil
+import tempfile
+from typing import Iterator, List, Optional
+
+from ..core import compute_archetype, score_responses
+from ..batch import encode_answers
+from ..rescore import to_db_scores
+from ..audit import audit_export, audit_key, diff_scores, _raw_audit_key
+from ..testing import TestResult, random_responses, run_test
+
+def test_drift_audit() -> List[TestResult]:
+    """The audit flags drifted fields, advances its watermark and resumes cleanly after interruption."""
+    results = []
+    rng = random.Random(18)
+
+    def export_row(i: int, tamper: Optional[str] = None) -> bytes:
+        resp, key = random_responses(rng, 0.9)
+        scored = score_responses(resp, key)
+        scores = to_db_scores(scored)
+        slug = compute_archetype(scored['attachment']['scores'], scored['communication']['scores'])['slug']
+        if tamper == 'confidence':
+            scores['confidence'] = (scores['confidence'] + 5) % 101
+        elif tamper == 'slug':
+            slug = 'legacy-slug'
+        return json.dumps({'id': f'r{i:03d}', 'created_at': f'2025-03-01T00:{i // 60:02d}:{i % 60:02d}Z',
+                           'answers': encode_answers(resp, key), 'archetype_slug': slug,
+                           'scores': json.dumps(scores) if i % 2 else scores}).encode()
+
+    tampered = {3: 'confidence', 7: 'slug', 12: 'confidence'}
+    lines = [export_row(i, tampered.get(i)) for i in range(30)]
+    lines.insert(5, b'{"id": "no-date", "answers": {}}')
+
+    workdir = tempfile.mkdtemp(prefix='quiz-audit-')
+    try:
+        report, mark = os.path.join(workdir, 'report.jsonl'), os.path.join(workdir, 'mark.json')
+        first = audit_export(lines[:21], report, mark, chunk_size=8)
+        results.append(run_test('audit first run counts', {'audited': 20, 'mismatchedRows': 3, 'skipped': 0,
+                                                           'errors': 1, 'outOfOrder': 0}, first['run']))
+        results.append(run_test('audit per-field counts', {'confidence': 2, 'archetype_slug': 1}, first['fields']))
+        results.append(run_test('audit watermark at last row', {'created_at': '2025-03-01T00:00:19.000000+00:00',
+                                                                'id': 'r019'}, first['watermark']))
+        with open(report) as f:
+            records = [json.loads(line) for line in f]
+        results.append(run_test('audit report records', [('r003', ['confidence']), ('no-date', 'missing created_at/id'),
+                                                         ('r007', ['archetype_slug']), ('r012', ['confidence'])],
+                                [(r['id'], r.get('error') or sorted(r['fields'])) for r in records]))
+
+        second = audit_export(lines, report, mark, chunk_size=8)
+        results.append(run_test('audit rerun only sees new rows', (10, 20, 0), (second['run']['audited'],
+                                                                              second['run']['skipped'],
+                                                                              second['run']['mismatchedRows'])))
+        results.append(run_test('audit totals accumulate', (30, 3), (second['totals']['audited'],
+                                                                     second['totals']['mismatchedRows'])))
+        with open(report, 'rb') as f:
+            incremental = f.read()
+
+        # Interrupted run: fail after two chunks with a half-written report tail, then resume
+        os.remove(mark)
+
+        def interrupted() -> Iterator[bytes]:
+            yield from lines[:20]
+            with open(report, 'ab') as f:
+                f.write(b'{"id": "half-wri')
+            raise KeyboardInterrupt
+
+        try:
+            audit_export(interrupted(), report, mark, chunk_size=8)
+        except KeyboardInterrupt:
+            pass
+        resumed = audit_export(lines, report, mark, chunk_size=8)
+        with open(report, 'rb') as f:
+            results.append(run_test('audit resume matches uninterrupted report', incremental, f.read()))
+        results.append(run_test('audit resume skips checkpointed rows', 15, resumed['run']['skipped']))
+
+        # A report shorter than the checkpoint is refused rather than padded back out
+        with open(report, 'r+b') as f:
+            f.truncate(10)
+        try:
+            audit_export(lines, report, mark, chunk_size=8)
+            refused = None
+        except ValueError as e:
+            refused = str(e)
+        with open(report, 'rb') as f:
+            results.append(run_test('audit refuses a short report', (True, 10),
+                                    ('delete the watermark' in (refused or ''), len(f.read()))))
+
+        # Numeric ids order by value, so id 10 is past a watermark at id 9
+        os.remove(mark)
+        numeric = [json.dumps({'id': ident, 'created_at': '2025-03-02T00:00:00Z', 'answers': {}}).encode()
+                   for ident in (9, 10)]
+        audit_export(numeric[:1], report, mark)
+        rerun = audit_export(numeric, report, mark)
+        results.append(run_test('audit orders numeric ids by value', ({'skipped': 1, 'audited': 1}, 10),
+                                ({k: rerun['run'][k] for k in ('skipped', 'audited')}, rerun['watermark']['id'])))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    results.append(run_test('audit key normalizes timestamps', ('2025-01-02T10:11:12.123000+00:00', (1, 7)),
+                            audit_key({'created_at': '2025-01-02 12:11:12.123+02', 'id': 7})))
+    results.append(run_test('audit raw key matches parsed key', [audit_key(json.loads(line)) for line in lines[:4]],
+                            [_raw_audit_key(line) for line in lines[:4]]))
+    results.append(run_test('audit raw key defers ambiguous lines',
+                            [None, None, ('2025-01-01T00:00:00.000000+00:00', (1, 5))],
+                            [_raw_audit_key(b'{"id": 1, "created_at": "2025-01-01", "x": {"id": 2}}'),
+                             _raw_audit_key(b'{"id": 1.5, "created_at": "2025-01-01"}'),
+                             _raw_audit_key(b'{"id":5,"created_at":"2025-01-01"}')]))
+    results.append(run_test('audit diff reports one-sided fields', {'a.b': [1, 2], 'a.c': [None, 3], 'd': [4, None]},
+                            diff_scores({'a': {'b': 1}, 'd': 4}, {'a': {'b': 2, 'c': 3}})))
+
+    return results
@@ -0,0 +1,94 @@
+"""Suites for quiz_scoring.batch."""
+
+from typing import List
+
+from ..core import SCENARIO_BONUS, SCENARIO_QUESTION, average, normalize
+from ..batch import (
+    BATCH_COLUMNS, PLAN, RECORD_WIDTH, CompactResponse, ResponseTable, ScoringPlan, batch_row_result, encode_answers,
+    score_batch, score_packed, to_batch_row,
+)
+from ..testing import TestResult, _all_answer_vectors, random_cases, run_test
+
+def test_batch_scoring() -> List[TestResult]:
+    """Batch scoring keeps rows independent, breaks ties like the TS scorer and handles empty input.
+
+    Agreement with the per-dict scorer is checked over the shared fixture table (SCORING_PATHS).
+    """
+    results = []
+    cases = [({}, None), ({q: 3 for q in BATCH_COLUMNS}, None), ({q: 3 for q in BATCH_COLUMNS}, 'D')]
+    batch = score_batch([to_batch_row(resp) for resp, _ in cases], [key for _, key in cases])
+
+    results.append(run_test('batch all 3s tie->secure', 'secure', batch['attachment']['primary'][-2]))
+    results.append(run_test('batch scenario D primary', 'assertive', batch['communication']['primary'][-1]))
+    results.append(run_test('batch empty matrix', [], list(score_batch([])['confidence'])))
+    single = score_batch([to_batch_row(cases[-1][0])], ['D'])
+    results.append(run_test('batch rows do not affect each other', batch_row_result(single, 0),
+                            batch_row_result(batch, 2)))
+
+    return results
+
+def test_scoring_plan() -> List[TestResult]:
+    """Compiled lookup tables agree with normalize(average(...))."""
+    results = []
+    plan = PLAN
+
+    wrong = []
+    for count in range(1, 6):
+        for values in {tuple(sorted(v)) for v in _all_answer_vectors(count)}:
+            key = sum(values) + count * plan.count_unit
+            expected = normalize(average(list(values)))
+            if plan.score_table[key] != expected:
+                wrong.append((values, 'base'))
+            if plan.score_table[plan.bonus_offset + key] != min(100, expected + SCENARIO_BONUS):
+                wrong.append((values, 'bonus'))
+    results.append(run_test('plan table matches normalize(average)', [], wrong))
+    results.append(run_test('plan empty dimension scores 0', 0, plan.score_table[0]))
+    results.append(run_test('plan empty dimension + bonus', SCENARIO_BONUS, plan.score_table[plan.bonus_offset]))
+    results.append(run_test('plan columns match batch columns', BATCH_COLUMNS, plan.columns))
+
+    cases = random_cases(5, (0.85,), 50)
+    rows = [to_batch_row(resp) for resp, _ in cases]
+    keys = [key for _, key in cases]
+    results.append(run_test('plan blob input == row input', score_batch(rows, keys),
+                            score_batch(b''.join(rows), keys)))
+
+    neutral = to_batch_row({q: 3 for q in BATCH_COLUMNS})
+    lower_bonus = score_batch([neutral], ['A'], ScoringPlan(scenario_bonus=15))
+    results.append(run_test('plan custom bonus', 65, lower_bonus['communication']['scores']['passive'][0]))
+    results.append(run_test('plan out-of-range byte is unanswered', 0,
+                            score_batch([bytes([9] * len(BATCH_COLUMNS))])['confidence'][0]))
+
+    return results
+
+def test_compact_responses() -> List[TestResult]:
+    """Compact records round-trip DBAnswerMaps and pack into tables that score by slice."""
+    results = []
+    cases = random_cases(21, (1.0, 0.6), 60)
+
+    records = [CompactResponse.from_responses(resp, key) for resp, key in cases]
+    results.append(run_test('compact round-trips responses', [(r, k) for r, k in cases],
+                            [(rec.to_responses(), rec.scenario_key) for rec in records]))
+    results.append(run_test('compact round-trips answers', [encode_answers(r, k, 7) for r, k in cases],
+                            [rec.to_answers(7) for rec in records]))
+    results.append(run_test('compact from answers', records,
+                            [CompactResponse.from_answers(encode_answers(r, k)) for r, k in cases]))
+
+    # Mapping interface lets the per-dict functions take records directly
+    results.append(run_test('compact mapping reads like the dict', [(r, k) for r, k in cases],
+                            [({qid: rec[qid] for qid in rec if qid != SCENARIO_QUESTION}, rec.get(SCENARIO_QUESTION))
+                             for rec in records]))
+
+    table = ResponseTable()
+    for rec in records:
+        table.append(rec)
+    results.append(run_test('table bytes per row', RECORD_WIDTH, len(table.data) // len(table)))
+    results.append(run_test('table row access', records[-1], table[-1]))
+    results.append(run_test('table slice scoring', score_packed(records[10:20]), table.score(10, 20)))
+
+    legacy = CompactResponse.from_answers({SCENARIO_QUESTION: {'v': 3, 't': 1, 'k': 'C'}, 'S1': {'v': 9, 't': 1}})
+    results.append(run_test('compact legacy scenario and bad value', ({}, 'C'),
+                            (legacy.to_responses(), legacy.scenario_key)))
+    results.append(run_test('compact mapping view', ('C', 1, False),
+                            (legacy[SCENARIO_QUESTION], len(legacy), 'S1' in legacy)))
+
+    return results
@@ -0,0 +1,44 @@
+"""Suites for quiz_scoring.bench."""
+
+from io import StringIO
+from typing import List
+
+from ..rescore import rescore_stream
+from ..bench import _bench_cases, bench_metrics, compare_bench, synthetic_export
+from ..testing import TestResult, run_test
+
+def test_benchmarks() -> List[TestResult]:
+    """Synthetic exports are seeded, and baseline comparison flags only real regressions.
+
+    Structure only: nothing here is timed, so the suite stays fast and stable on loaded machines.
+    """
+    results = []
+
+    lines = list(synthetic_export(50, seed=3))
+    results.append(run_test('synthetic export seeded', lines, list(synthetic_export(50, seed=3))))
+    out = StringIO()
+    results.append(run_test('synthetic export rescores cleanly', {'rows': 50, 'errors': 0},
+                            rescore_stream(lines, out, chunk_size=16)))
+
+    cases = _bench_cases()
+    results.append(run_test('bench cases call their functions', sorted(cases),
+                            sorted(name for name, (func, args) in cases.items()
+                                   if func.__name__ == name and func(*args) is not None)))
+    report = {'micro': {name: 100.0 for name in cases},
+              'macro': {'200': {'rows': 200, 'seconds': 0.1, 'rowsPerSecond': 2000.0, 'peakBytes': 4096}}}
+    results.append(run_test('bench metrics shape',
+                            sorted([f'micro.{name}.nsPerOp' for name in cases] +
+                                   ['macro.200.peakBytes', 'macro.200.rowsPerSecond']),
+                            sorted(bench_metrics(report))))
+    results.append(run_test('bench self-comparison clean', [], compare_bench(report, report)))
+
+    baseline = {'micro': {'normalize': 100.0, 'get_value': 100.0},
+                'macro': {'10': {'rowsPerSecond': 1000.0, 'peakBytes': 1000}}}
+    current = {'micro': {'normalize': 110.0, 'get_value': 130.0, 'score_confidence': 5.0},
+               'macro': {'10': {'rowsPerSecond': 800.0, 'peakBytes': 500}}}
+    results.append(run_test('bench regressions beyond tolerance',
+                            ['macro.10.rowsPerSecond', 'micro.get_value.nsPerOp'],
+                            sorted(r['metric'] for r in compare_bench(baseline, current, 0.15))))
+    results.append(run_test('bench tolerance widens', [], compare_bench(baseline, current, 0.35)))
+
+    return results
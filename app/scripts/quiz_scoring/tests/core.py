@@ -0,0 +1,379 @@
+"""Suites for quiz_scoring.core."""
+
+import random
+from typing import List
+
+from ..core import (
+    ATTACHMENT_ORDER, ATTACHMENT_QUESTIONS, COMMUNICATION_ORDER, REVERSE_QUESTIONS, SCENARIO_KEY_MAP, _compare_cells,
+    compute_archetype, compute_archetype_batch, get_archetype, get_value, normalize, probabilities, score_attachment,
+    score_communication, score_confidence, score_emotional, score_intimacy, score_love_languages, _v8_sort,
+    _winning_cell,
+)
+from ..batch import score_batch, to_batch_row
+from ..testing import TestResult, random_responses, run_test
+
+def test_normalization() -> List[TestResult]:
+    """Test normalization formula."""
+    results = []
+    cases = [(1, 0), (2, 25), (3, 50), (4, 75), (5, 100)]
+    for raw, expected in cases:
+        actual = normalize(raw)
+        results.append(run_test(f'normalize({raw})', expected, actual))
+
+    # Halves round up like Math.round in scoring.ts, not to even like round()
+    for raw, expected in [(1.5, 13), (2.5, 38), (3.5, 63), (4.5, 88)]:
+        results.append(run_test(f'normalize({raw}) half up', expected, normalize(raw)))
+
+    return results
+
+def test_reverse_scoring() -> List[TestResult]:
+    """Test reverse scoring logic."""
+    results = []
+
+    # C2 reversed: raw 5 -> effective 1
+    resp = {'C2': 5}
+    actual = get_value(resp, 'C2')
+    results.append(run_test('C2 reversed (5->1)', 1.0, actual))
+
+    # Non-reversed: C1 raw 5 -> effective 5
+    resp = {'C1': 5}
+    actual = get_value(resp, 'C1')
+    results.append(run_test('C1 not reversed (5->5)', 5.0, actual))
+
+    # All reversed questions
+    for qid in REVERSE_QUESTIONS:
+        resp = {qid: 3}
+        actual = get_value(resp, qid)
+        results.append(run_test(f'{qid} reversed (3->3)', 3.0, actual))
+
+    return results
+
+def test_attachment() -> List[TestResult]:
+    """Test attachment scoring."""
+    results = []
+
+    # All 5s -> all 100
+    resp = {q: 5 for dim in ATTACHMENT_ORDER for q in ATTACHMENT_QUESTIONS[dim]}
+    result = score_attachment(resp)
+    for dim in ATTACHMENT_ORDER:
+        results.append(run_test(f'attachment all 5s: {dim}', 100, result['scores'][dim]))
+
+    # All 1s -> all 0
+    resp = {q: 1 for dim in ATTACHMENT_ORDER for q in ATTACHMENT_QUESTIONS[dim]}
+    result = score_attachment(resp)
+    for dim in ATTACHMENT_ORDER:
+        results.append(run_test(f'attachment all 1s: {dim}', 0, result['scores'][dim]))
+
+    # Secure highest -> primary secure
+    resp = {'S1': 5, 'S2': 5, 'S3': 5, 'AX1': 1, 'AX2': 1, 'AX3': 1,
+            'AV1': 1, 'AV2': 1, 'AV3': 1, 'D1': 1, 'D2': 1, 'D3': 1}
+    result = score_attachment(resp)
+    results.append(run_test('attachment primary=secure', 'secure', result['primary']))
+
+    # Tie -> first in order (secure)
+    resp = {q: 3 for dim in ATTACHMENT_ORDER for q in ATTACHMENT_QUESTIONS[dim]}
+    result = score_attachment(resp)
+    results.append(run_test('attachment tie->secure', 'secure', result['primary']))
+
+    # Mixed: S=5,4,3 avg=4->75
+    resp = {'S1': 5, 'S2': 4, 'S3': 3, 'AX1': 3, 'AX2': 3, 'AX3': 3,
+            'AV1': 1, 'AV2': 1, 'AV3': 1, 'D1': 1, 'D2': 1, 'D3': 1}
+    result = score_attachment(resp)
+    results.append(run_test('attachment mixed S=75', 75, result['scores']['secure']))
+    results.append(run_test('attachment mixed AX=50', 50, result['scores']['anxious']))
+
+    return results
+
+def test_communication() -> List[TestResult]:
+    """Test communication scoring with scenario bonus."""
+    results = []
+
+    # Base scores without scenario
+    resp = {'COM_PASSIVE_1': 5, 'COM_PASSIVE_2': 5,
+            'COM_AGGRESSIVE_1': 1, 'COM_AGGRESSIVE_2': 1,
+            'COM_PAGG_1': 1, 'COM_PAGG_2': 1,
+            'COM_ASSERTIVE_1': 1, 'COM_ASSERTIVE_2': 1}
+    result = score_communication(resp)
+    results.append(run_test('comm passive=100', 100, result['scores']['passive']))
+    results.append(run_test('comm primary=passive', 'passive', result['primary']))
+
+    # Scenario bonus +25
+    resp = {'COM_PASSIVE_1': 3, 'COM_PASSIVE_2': 3,
+            'COM_AGGRESSIVE_1': 3, 'COM_AGGRESSIVE_2': 3,
+            'COM_PAGG_1': 3, 'COM_PAGG_2': 3,
+            'COM_ASSERTIVE_1': 3, 'COM_ASSERTIVE_2': 3}
+    result = score_communication(resp, 'A')
+    results.append(run_test('comm scenario A: passive=75', 75, result['scores']['passive']))
+
+    result = score_communication(resp, 'D')
+    results.append(run_test('comm scenario D: assertive=75', 75, result['scores']['assertive']))
+
+    # Cap at 100
+    resp = {'COM_PASSIVE_1': 5, 'COM_PASSIVE_2': 5,
+            'COM_AGGRESSIVE_1': 1, 'COM_AGGRESSIVE_2': 1,
+            'COM_PAGG_1': 1, 'COM_PAGG_2': 1,
+            'COM_ASSERTIVE_1': 1, 'COM_ASSERTIVE_2': 1}
+    result = score_communication(resp, 'A')
+    results.append(run_test('comm cap at 100', 100, result['scores']['passive']))
+
+    # Each scenario key mapping
+    resp = {'COM_PASSIVE_1': 1, 'COM_PASSIVE_2': 1,
+            'COM_AGGRESSIVE_1': 1, 'COM_AGGRESSIVE_2': 1,
+            'COM_PAGG_1': 1, 'COM_PAGG_2': 1,
+            'COM_ASSERTIVE_1': 1, 'COM_ASSERTIVE_2': 1}
+    for key, style in SCENARIO_KEY_MAP.items():
+        result = score_communication(resp, key)
+        results.append(run_test(f'comm scenario {key}->{style}=25', 25, result['scores'][style]))
+
+    return results
+
+def test_confidence() -> List[TestResult]:
+    """Test confidence scoring with reverse scoring."""
+    results = []
+
+    # Max (C2,C4 need raw=1 to get effective=5)
+    resp = {'C1': 5, 'C2': 1, 'C3': 5, 'C4': 1, 'C5': 5}
+    results.append(run_test('confidence max=100', 100, score_confidence(resp)))
+
+    # Min (C2,C4 need raw=5 to get effective=1)
+    resp = {'C1': 1, 'C2': 5, 'C3': 1, 'C4': 5, 'C5': 1}
+    results.append(run_test('confidence min=0', 0, score_confidence(resp)))
+
+    # All 3s -> 50
+    resp = {'C1': 3, 'C2': 3, 'C3': 3, 'C4': 3, 'C5': 3}
+    results.append(run_test('confidence neutral=50', 50, score_confidence(resp)))
+
+    # All raw 5s -> [5,1,5,1,5] avg=3.4 -> 60
+    resp = {'C1': 5, 'C2': 5, 'C3': 5, 'C4': 5, 'C5': 5}
+    results.append(run_test('confidence all raw 5=60', 60, score_confidence(resp)))
+
+    # Empty
+    results.append(run_test('confidence empty=0', 0, score_confidence({})))
+
+    return results
+
+def test_emotional() -> List[TestResult]:
+    """Test emotional availability scoring."""
+    results = []
+
+    # Max (EA2,EA4 need raw=1)
+    resp = {'EA1': 5, 'EA2': 1, 'EA3': 5, 'EA4': 1, 'EA5': 5}
+    results.append(run_test('emotional max=100', 100, score_emotional(resp)))
+
+    # Min (EA2,EA4 need raw=5)
+    resp = {'EA1': 1, 'EA2': 5, 'EA3': 1, 'EA4': 5, 'EA5': 1}
+    results.append(run_test('emotional min=0', 0, score_emotional(resp)))
+
+    # All raw 5s -> 60
+    resp = {'EA1': 5, 'EA2': 5, 'EA3': 5, 'EA4': 5, 'EA5': 5}
+    results.append(run_test('emotional all raw 5=60', 60, score_emotional(resp)))
+
+    return results
+
+def test_intimacy() -> List[TestResult]:
+    """Test intimacy scoring."""
+    results = []
+
+    # Max both (BA3 needs raw=1)
+    resp = {'IC1': 5, 'IC2': 5, 'IC3': 5, 'BA1': 5, 'BA2': 5, 'BA3': 1}
+    result = score_intimacy(resp)
+    results.append(run_test('intimacy comfort=100', 100, result['comfort']))
+    results.append(run_test('intimacy boundary=100', 100, result['boundaries']))
+
+    # Min both (BA3 needs raw=5)
+    resp = {'IC1': 1, 'IC2': 1, 'IC3': 1, 'BA1': 1, 'BA2': 1, 'BA3': 5}
+    result = score_intimacy(resp)
+    results.append(run_test('intimacy comfort=0', 0, result['comfort']))
+    results.append(run_test('intimacy boundary=0', 0, result['boundaries']))
+
+    # BA3=5 -> effective 1, avg [5,5,1]=3.67 -> 67
+    resp = {'BA1': 5, 'BA2': 5, 'BA3': 5}
+    result = score_intimacy(resp)
+    results.append(run_test('intimacy BA3 reversed=67', 67, result['boundaries']))
+
+    # Independent dimensions
+    resp = {'IC1': 5, 'IC2': 5, 'IC3': 5, 'BA1': 1, 'BA2': 1, 'BA3': 5}
+    result = score_intimacy(resp)
+    results.append(run_test('intimacy independent comfort', 100, result['comfort']))
+    results.append(run_test('intimacy independent boundary', 0, result['boundaries']))
+
+    return results
+
+def test_love_languages() -> List[TestResult]:
+    """Test love languages scoring."""
+    results = []
+
+    # Clear ranking
+    resp = {'LL1': 5, 'LL2': 5, 'LL3': 4, 'LL4': 4, 'LL5': 3, 'LL6': 3,
+            'LL7': 2, 'LL8': 2, 'LL9': 1, 'LL10': 1}
+    result = score_love_languages(resp)
+    results.append(run_test('love ranked order', ['words', 'time', 'service', 'gifts', 'touch'], result['ranked']))
+    results.append(run_test('love words=100', 100, result['scores']['words']))
+    results.append(run_test('love touch=0', 0, result['scores']['touch']))
+
+    # Give/receive separate
+    resp = {'LL1': 5, 'LL2': 1, 'LL3': 1, 'LL4': 5,
+            'LL5': 3, 'LL6': 3, 'LL7': 3, 'LL8': 3, 'LL9': 3, 'LL10': 3}
+    result = score_love_languages(resp)
+    results.append(run_test('love words give=100', 100, result['giveReceive']['words']['give']))
+    results.append(run_test('love words receive=0', 0, result['giveReceive']['words']['receive']))
+    results.append(run_test('love time give=0', 0, result['giveReceive']['time']['give']))
+    results.append(run_test('love time receive=100', 100, result['giveReceive']['time']['receive']))
+
+    # Combined = normalize(avg(raw_give, raw_receive)) = normalize((5+1)/2) = normalize(3) = 50
+    results.append(run_test('love words combined=50', 50, result['scores']['words']))
+
+    return results
+
+def test_archetype() -> List[TestResult]:
+    """Test archetype determination."""
+    results = []
+
+    # Secure + high conf -> confident-anchor
+    results.append(run_test('archetype secure+high', 'confident-anchor',
+                           get_archetype('secure', 'passive', 70)))
+
+    # Secure + assertive -> confident-anchor
+    results.append(run_test('archetype secure+assertive', 'confident-anchor',
+                           get_archetype('secure', 'assertive', 40)))
+
+    # Secure + low + not assertive -> steady-connector
+    results.append(run_test('archetype secure+low', 'steady-connector',
+                           get_archetype('secure', 'passive', 50)))
+
+    # Anxious + high -> devoted-romantic
+    results.append(run_test('archetype anxious+high', 'devoted-romantic',
+                           get_archetype('anxious', 'passive', 70)))
+
+    # Anxious + low -> careful-romantic
+    results.append(run_test('archetype anxious+low', 'careful-romantic',
+                           get_archetype('anxious', 'passive', 50)))
+
+    # Avoidant + high -> independent-spirit
+    results.append(run_test('archetype avoidant+high', 'independent-spirit',
+                           get_archetype('avoidant', 'passive', 70)))
+
+    # Avoidant + assertive -> independent-spirit
+    results.append(run_test('archetype avoidant+assertive', 'independent-spirit',
+                           get_archetype('avoidant', 'assertive', 40)))
+
+    # Avoidant + low + not assertive -> private-protector
+    results.append(run_test('archetype avoidant+low', 'private-protector',
+                           get_archetype('avoidant', 'passive', 50)))
+
+    # Disorganized + high -> complex-soul
+    results.append(run_test('archetype disorg+high', 'complex-soul',
+                           get_archetype('disorganized', 'passive', 70)))
+
+    # Disorganized + low -> searching-soul
+    results.append(run_test('archetype disorg+low', 'searching-soul',
+                           get_archetype('disorganized', 'passive', 50)))
+
+    # Boundary: confidence=59 (low) vs 60 (high)
+    results.append(run_test('archetype boundary 59', 'careful-romantic',
+                           get_archetype('anxious', 'passive', 59)))
+    results.append(run_test('archetype boundary 60', 'devoted-romantic',
+                           get_archetype('anxious', 'passive', 60)))
+
+    return results
+
+def test_joint_probability() -> List[TestResult]:
+    """Test joint-probability archetype selection."""
+    results = []
+    zero_attach = {d: 0 for d in ATTACHMENT_ORDER}
+    zero_comm = {s: 0 for s in COMMUNICATION_ORDER}
+
+    # Peaked on both axes -> that cell, confidence 1
+    result = compute_archetype({**zero_attach, 'anxious': 100}, {**zero_comm, 'aggressive': 100})
+    results.append(run_test('joint anxious+aggressive', 'fiery-pursuer', result['slug']))
+    results.append(run_test('joint peaked confidence=1', 1.0, result['confidence']))
+    results.append(run_test('joint peaked not balanced', False, result['isBalanced']))
+
+    # All zero -> uniform fallback, every cell tied -> priority 0
+    result = compute_archetype(zero_attach, zero_comm)
+    results.append(run_test('joint all zero -> golden-partner', 'golden-partner', result['slug']))
+    results.append(run_test('joint all zero confidence=0', 0.0, result['confidence']))
+    results.append(run_test('joint all zero balanced', True, result['isBalanced']))
+
+    # Exact tie on attachment -> secure wins by priority
+    result = compute_archetype({**zero_attach, 'secure': 50, 'avoidant': 50}, {**zero_comm, 'passive': 100})
+    results.append(run_test('joint tie -> priority', 'gentle-peacekeeper', result['slug']))
+
+    # Within EPSILON counts as a tie: joint 0.5 vs 0.4975
+    result = compute_archetype({**zero_attach, 'secure': 200, 'disorganized': 199},
+                               {**zero_comm, 'aggressive': 100})
+    results.append(run_test('joint epsilon tie -> priority', 'direct-director', result['slug']))
+    result = compute_archetype({**zero_attach, 'secure': 40, 'disorganized': 60}, {**zero_comm, 'aggressive': 100})
+    results.append(run_test('joint outside epsilon', 'wild-storm', result['slug']))
+
+    # Assertive has top communication priority
+    result = compute_archetype({**zero_attach, 'avoidant': 80},
+                               {'passive': 50, 'aggressive': 0, 'passive_aggressive': 0, 'assertive': 50})
+    results.append(run_test('joint assertive priority', 'solo-voyager', result['slug']))
+
+    # Clear-winner shortcut agrees with the full V8 sort
+    rng = random.Random(99)
+    disagreements = 0
+    for _ in range(2000):
+        joints = [pa * pc for pa in probabilities([rng.choice((0, 25, 50, 75, 100)) for _ in range(4)])
+                  for pc in probabilities([rng.choice((0, 25, 50, 75, 100)) for _ in range(4)])]
+        full = _v8_sort([(j, i) for i, j in enumerate(joints)], _compare_cells)[0][1]
+        disagreements += _winning_cell(joints) != full
+    results.append(run_test('joint shortcut matches full sort', 0, disagreements))
+
+    # Batch matches per-row
+    cases = [random_responses(rng, 0.9) for _ in range(300)]
+    batch = score_batch([to_batch_row(resp) for resp, _ in cases], [key for _, key in cases])
+    archetypes = compute_archetype_batch(batch['attachment']['scores'], batch['communication']['scores'])
+    mismatches = 0
+    for i, (resp, key) in enumerate(cases):
+        single = compute_archetype(score_attachment(resp)['scores'], score_communication(resp, key)['scores'])
+        row = {'slug': archetypes['slug'][i], 'confidence': archetypes['confidence'][i],
+               'isBalanced': archetypes['isBalanced'][i]}
+        mismatches += single != row
+    results.append(run_test('joint batch matches per-row', 0, mismatches))
+
+    return results
+
+def test_integration() -> List[TestResult]:
+    """Integration test matching existing TypeScript test."""
+    results = []
+
+    resp = {
+        # Attachment
+        'S1': 5, 'S2': 5, 'S3': 5, 'AX1': 1, 'AX2': 1, 'AX3': 1,
+        'AV1': 1, 'AV2': 1, 'AV3': 1, 'D1': 1, 'D2': 1, 'D3': 1,
+        # Communication
+        'COM_PASSIVE_1': 1, 'COM_PASSIVE_2': 1,
+        'COM_AGGRESSIVE_1': 1, 'COM_AGGRESSIVE_2': 1,
+        'COM_PAGG_1': 1, 'COM_PAGG_2': 1,
+        'COM_ASSERTIVE_1': 5, 'COM_ASSERTIVE_2': 5,
+        # Confidence (reverse adjusted)
+        'C1': 5, 'C2': 1, 'C3': 5, 'C4': 1, 'C5': 5,
+        # Emotional (reverse adjusted)
+        'EA1': 5, 'EA2': 1, 'EA3': 5, 'EA4': 1, 'EA5': 5,
+        # Intimacy (reverse adjusted)
+        'IC1': 5, 'IC2': 5, 'IC3': 5, 'BA1': 5, 'BA2': 5, 'BA3': 1,
+        # Love Languages
+        'LL1': 5, 'LL2': 5, 'LL3': 3, 'LL4': 3, 'LL5': 3, 'LL6': 3,
+        'LL7': 3, 'LL8': 3, 'LL9': 3, 'LL10': 3,
+    }
+
+    att = score_attachment(resp)
+    results.append(run_test('integration attachment primary', 'secure', att['primary']))
+    results.append(run_test('integration attachment secure=100', 100, att['scores']['secure']))
+
+    comm = score_communication(resp)
+    results.append(run_test('integration comm primary', 'assertive', comm['primary']))
+
+    results.append(run_test('integration confidence', 100, score_confidence(resp)))
+    results.append(run_test('integration emotional', 100, score_emotional(resp)))
+
+    intimacy = score_intimacy(resp)
+    results.append(run_test('integration intimacy comfort', 100, intimacy['comfort']))
+    results.append(run_test('integration intimacy boundary', 100, intimacy['boundaries']))
+
+    love = score_love_languages(resp)
+    results.append(run_test('integration love #1', 'words', love['ranked'][0]))
+
+    return results
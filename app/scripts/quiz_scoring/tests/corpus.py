@@ -0,0 +1,67 @@
+"""Suites for quiz_scoring.corpus."""
+
+import json
+import os
+import tempfile
+from io import StringIO
+from typing import List
+
+from ..batch import BATCH_COLUMNS, CompactResponse, encode_answers, score_packed
+from ..rescore import rescore_stream
+from ..corpus import CORPUS_SCENARIO, Corpus, build_corpus, rescore_corpus
+from ..testing import TestResult, random_cases, run_test
+
+def test_corpus() -> List[TestResult]:
+    """Columnar corpus round-trips an export and rescores like the JSONL path."""
+    results = []
+    cases = random_cases(17, (1.0, 0.5), 60)
+    lines = [json.dumps({'id': f'row-{i}', 'public_slug': f's{i}', 'created_at': '2026-01-01T00:00:00Z',
+                         'answers': encode_answers(resp, key, 1700000000000 + i)}).encode()
+             for i, (resp, key) in enumerate(cases)]
+    lines += [b'{"id": "no-answers"}', b'not json']
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = os.path.join(tmp, 'corpus')
+        manifest = build_corpus(lines, directory, chunk_size=16)
+        results.append(run_test('corpus rows and errors', (122, 2, [120, 121]),
+                                (manifest['rows'], manifest['errors'], manifest['errorRows'])))
+
+        with Corpus(directory) as corpus:
+            results.append(run_test('corpus records', [CompactResponse.from_responses(r, k) for r, k in cases],
+                                    [corpus.record(i) for i in range(len(cases))]))
+            results.append(run_test('corpus timestamps', [1700000000000 + i if resp else 0
+                                                          for i, (resp, _) in enumerate(cases)] + [0, 0],
+                                    corpus.timestamps.tolist()))
+            results.append(run_test('corpus index slice', [{'id': 'row-41', 'created_at': '2026-01-01T00:00:00Z',
+                                                            'public_slug': 's41'}], corpus.index(41, 42)))
+            view = corpus.matrix(10, 20)
+            results.append(run_test('corpus slice is zero-copy', (True, 10 * len(BATCH_COLUMNS)),
+                                    (view.readonly and view.obj is corpus.answers.obj, len(view))))
+            view.release()
+            results.append(run_test('corpus score == packed', score_packed(
+                [CompactResponse.from_responses(r, k) for r, k in cases[30:50]]), corpus.score(30, 50)))
+
+            results.append(run_test('corpus error markers', [{'id': 'no-answers', 'error': 'missing answers'}],
+                                    corpus.index(120, 121)))
+
+        serial = StringIO()
+        expected = rescore_stream(lines, serial)
+        from_corpus = StringIO()
+        stats = rescore_corpus(directory, from_corpus, chunk_size=32)
+        results.append(run_test('corpus rescore matches JSONL', serial.getvalue(), from_corpus.getvalue()))
+        results.append(run_test('corpus rescore rows and errors', expected, stats))
+        pooled = StringIO()
+        stats = rescore_corpus(directory, pooled, workers=2, chunk_size=16)
+        results.append(run_test('corpus parallel rescore', (serial.getvalue(), expected),
+                                (pooled.getvalue(), {'rows': stats['rows'], 'errors': stats['errors']})))
+
+        with open(os.path.join(directory, CORPUS_SCENARIO), 'ab') as f:
+            f.write(b'\0')
+        try:
+            Corpus(directory)
+            truncated = None
+        except ValueError as e:
+            truncated = str(e)
+        results.append(run_test('corpus size mismatch rejected', True, 'truncated' in (truncated or '')))
+
+    return results
@@ -0,0 +1,58 @@
+"""Suites for quiz_scoring.daemon."""
+
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+from typing import Dict, List, Tuple, Any
+
+from ..daemon import ScoringDaemon, parse_address
+from ..testing import TestResult, generate_fixtures, run_test
+
+def test_scoring_daemon() -> List[TestResult]:
+    """The daemon answers pipelined and batched DBAnswerMaps with their fixture results, in order."""
+    results = []
+    cases = generate_fixtures(48, seed=17)
+    answers = [case['answers'] for case in cases]
+    expected = [case['expected'] for case in cases]
+
+    async def session(path: str) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        daemon = ScoringDaemon(window=0.05)
+        server = await daemon.start(path)
+        async with server:
+            reader, writer = await asyncio.open_unix_connection(path)
+            lines = [{'id': i, 'answers': a} for i, a in enumerate(answers[:40])]
+            lines.append({'id': 'batch', 'batch': answers[40:]})
+            lines += [{'id': 'bad', 'answers': [1, 2]}, {'id': 'op'}, {'id': 'stats', 'op': 'stats'}]
+            writer.write(b''.join(json.dumps(line).encode() + b'\n' for line in lines) + b'not json\n')
+            await writer.drain()
+            writer.write_eof()
+            replies = [json.loads(line) async for line in reader]
+            writer.close()
+            return replies, daemon.batcher.stats()
+
+    path = os.path.join(tempfile.mkdtemp(prefix='quiz-serve-'), 'scoring.sock')
+    try:
+        replies, stats = asyncio.run(session(path))
+    finally:
+        shutil.rmtree(os.path.dirname(path), ignore_errors=True)
+
+    results.append(run_test('daemon replies in request order', list(range(40)) + ['batch', 'bad', 'op', 'stats', None],
+                            [r.get('id') for r in replies]))
+    scored = replies[:40] + replies[40]['results']
+    results.append(run_test('daemon replies match their fixtures', expected,
+                            [{'scores': r['scores'], 'archetype': r['archetype']['slug']} for r in
+                             json.loads(json.dumps(scored))]))
+    results.append(run_test('daemon flags bad requests', [True, True, True],
+                            ['error' in r for r in (replies[41], replies[42], replies[44])]))
+    results.append(run_test('daemon micro-batches pipelined requests', (60, True),
+                            (stats['requests'], stats['batches'] < 10)))
+    results.append(run_test('daemon reports latency percentiles', True, 0 < stats['p50Ms'] <= stats['p99Ms']))
+    results.append(run_test('daemon stats op', ['batches', 'connections', 'errors', 'maxMs', 'meanBatch', 'p50Ms',
+                                                'p99Ms', 'requests'], sorted(replies[43]['stats'])))
+    results.append(run_test('daemon address parsing', [('unix', '/tmp/s.sock'), ('unix', 'rel/s.sock'),
+                                                       ('tcp', ('127.0.0.1', 8765)), ('tcp', ('::1', 9))],
+                            [parse_address(a) for a in ('unix:/tmp/s.sock', 'rel/s.sock', ':8765', '::1:9')]))
+
+    return results
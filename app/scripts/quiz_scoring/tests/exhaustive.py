@@ -0,0 +1,35 @@
+"""Suites for quiz_scoring.exhaustive."""
+
+from typing import List
+
+from ..core import ARCHETYPE_SLUGS, ATTACHMENT_ORDER, COMMUNICATION_ORDER, CONFIDENCE_QUESTIONS, compute_archetype
+from ..exhaustive import attachment_classes, communication_classes, dimension_score_counts, verify_archetype_space
+from ..testing import TestResult, run_test
+
+def test_exhaustive_space() -> List[TestResult]:
+    """Class-based exhaustive verification agrees with per-pair evaluation."""
+    results = []
+    values = (1, 5)
+    report = verify_archetype_space(values)
+
+    results.append(run_test('exhaustive invariants hold', True, report['passed']))
+    results.append(run_test('exhaustive attachment classes', 2 ** 8, report['attachmentClasses']))
+    results.append(run_test('exhaustive single all-1s fallback',
+                            {'attachment': 1, 'communication': 1}, report['fallbackRawVectors']))
+
+    # Brute force over class pairs with compute_archetype
+    expected = {slug: {'classPairs': 0, 'rawVectors': 0} for slug in ARCHETYPE_SLUGS}
+    for att, att_n in attachment_classes(values).items():
+        att_scores = dict(zip(ATTACHMENT_ORDER, att))
+        for comm, comm_n in communication_classes(values).items():
+            slug = compute_archetype(att_scores, dict(zip(COMMUNICATION_ORDER, comm)))['slug']
+            expected[slug]['classPairs'] += 1
+            expected[slug]['rawVectors'] += att_n * comm_n
+    results.append(run_test('exhaustive matches per-pair evaluation', expected, report['archetypes']))
+
+    # Raw vector counts per class
+    counts = dimension_score_counts(CONFIDENCE_QUESTIONS)
+    results.append(run_test('exhaustive C2/C4 reversed counts', 5 ** 5, sum(counts.values())))
+    results.append(run_test('exhaustive all-3s confidence class', True, counts[50] > 1))
+
+    return results
@@ -0,0 +1,93 @@
+"""Suites for quiz_scoring.fuzz."""
+
+import json
+import os
+import shutil
+import shlex
+import sys
+import tempfile
+from io import StringIO
+from typing import List
+
+from ..batch import QUESTION_INDEX, RECORD_WIDTH, SCENARIO_COLUMN, pack_answers
+from ..spec import APP_ROOT
+from ..fuzz import (
+    _FROM_DIGITS, _FUZZ_COMMUNICATION, FUZZ_KINDS, GOLDEN_FIELDS, _TO_DIGITS, TsOracle, check_golden, fuzz_answers,
+    fuzz_chunk, fuzz_tasks, run_fuzz, scalar_golden_row, vector_golden_rows, write_fuzz_inputs,
+)
+from ..testing import TestResult, run_test
+
+def test_differential_fuzz() -> List[TestResult]:
+    """Seeded fuzz rows cover every kind, agree between batch and scalar scoring, and shrink golden divergences."""
+    results = []
+    blocks = [block for task in fuzz_tasks(600, seed=3, chunk_size=300) for block in fuzz_chunk(task)]
+    results.append(run_test('fuzz rows are seeded', [b[2] for b in blocks],
+                            [b[2] for task in fuzz_tasks(600, seed=3, chunk_size=300) for b in fuzz_chunk(task)]))
+    results.append(run_test('fuzz covers every kind', set(FUZZ_KINDS), {b[0] for b in blocks}))
+    records = [(blob[i:i + RECORD_WIDTH], legacy[i // RECORD_WIDTH])
+               for _, _, blob, legacy in blocks for i in range(0, len(blob), RECORD_WIDTH)]
+    results.append(run_test('fuzz answer maps pack back to their records', True,
+                            all(pack_answers(fuzz_answers(r, v)) == r for r, v in records)))
+    legacy_rows = [(r, v) for r, v in records if v is not None]
+    results.append(run_test('fuzz legacy rows are scored from their answer maps on both paths', (True, True),
+                            (bool(legacy_rows),
+                             all(vector_golden_rows(r, [v])[0] == scalar_golden_row(r, v) for r, v in legacy_rows))))
+    scenario = [blob for kind, _, blob, _ in blocks if kind == 'scenario'][0]
+    span = _FUZZ_COMMUNICATION
+    results.append(run_test('fuzz scenario rows answer communication by scenario only', True,
+                            all(not any(scenario[i + span.start:i + span.stop]) and scenario[i + SCENARIO_COLUMN]
+                                for i in range(0, len(scenario), RECORD_WIDTH))))
+
+    out = StringIO()
+    stats = run_fuzz(600, seed=3, out=out, chunk_size=300)
+    results.append(run_test('fuzz batch matches scalar port', (600, 0, ''), (stats['rows'], stats['divergences'], out.getvalue())))
+
+    # A stand-in golden corpus from the scalar port, with one expectation broken
+    inputs = StringIO()
+    write_fuzz_inputs(inputs, 60, seed=4)
+    header, *rows = inputs.getvalue().splitlines()
+    golden = [header]
+    for line in rows:
+        digits, legacy = json.loads(line)
+        golden.append(json.dumps([digits, legacy, scalar_golden_row(digits.encode().translate(_FROM_DIGITS), legacy)]))
+    broken = json.loads(golden[5])
+    broken[2][GOLDEN_FIELDS.index('archetype')] = 'not-an-archetype'
+    golden[5] = json.dumps(broken)
+    out = StringIO()
+    stats = check_golden(golden, out, chunk_size=16)
+    report = [json.loads(line) for line in out.getvalue().splitlines()]
+    results.append(run_test('golden divergence found unshrunk without an oracle', (1, [4], [False]),
+                            (stats['divergences'], [r['index'] for r in report], ['answers' in r for r in report])))
+
+    # An oracle that over-scores confidence once C3 reaches 4 shrinks to that single answer
+    c3 = QUESTION_INDEX['C3']
+    workdir = tempfile.mkdtemp(prefix='quiz-fuzz-')
+    try:
+        script = os.path.join(workdir, 'oracle.py')
+        with open(script, 'w') as f:
+            f.write(f"""import json, sys
+sys.path.insert(0, {os.path.join(APP_ROOT, 'scripts')!r})
+from quiz_scoring import fuzz as v
+for line in sys.stdin:
+    row = json.loads(line)
+    if isinstance(row, list):
+        expected = v.scalar_golden_row(row[0].encode().translate(v._FROM_DIGITS), row[1])
+        expected[v.GOLDEN_FIELDS.index('confidence')] += row[0][{c3}] >= '4'
+        row.append(expected)
+    print(json.dumps(row), flush=True)
+""")
+        oracle = TsOracle(f'{shlex.quote(sys.executable)} {shlex.quote(script)}')
+        record = bytearray(RECORD_WIDTH)
+        record[c3] = 5
+        record[QUESTION_INDEX['S1']] = 2
+        golden = [header, json.dumps([bytes(record).translate(_TO_DIGITS).decode(), 3, oracle(bytes(record), 3)])]
+        out = StringIO()
+        stats = check_golden(golden, out, oracle)
+        oracle.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    report = json.loads(out.getvalue())
+    results.append(run_test('golden divergence shrinks through the oracle', {'C3': {'v': 4, 't': 0}}, report['answers']))
+    results.append(run_test('shrunk divergence keeps the field', {'confidence': [76, 75]}, report['shrunkDiff']))
+
+    return results
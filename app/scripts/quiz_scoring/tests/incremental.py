@@ -0,0 +1,73 @@
+"""Suites for quiz_scoring.incremental."""
+
+import json
+import random
+from typing import Dict, List, Optional, Any
+
+from ..core import SCENARIO_QUESTION, compute_archetype, score_responses
+from ..batch import BATCH_COLUMNS, encode_answers
+from ..incremental import IncrementalScorer, answer_events, replay_sessions
+from ..testing import TestResult, random_responses, run_test
+
+def test_incremental_scorer() -> List[TestResult]:
+    """Incremental updates equal a full rescore after every event."""
+    results = []
+    rng = random.Random(29)
+    likert = list(BATCH_COLUMNS)
+
+    def full(responses: Dict[str, int], key: Optional[str]) -> Dict[str, Any]:
+        expected = score_responses(responses, key)
+        expected['archetype'] = compute_archetype(expected['attachment']['scores'],
+                                                  expected['communication']['scores'])
+        return expected
+
+    mismatches = []
+    for session in range(40):
+        scorer = IncrementalScorer()
+        responses: Dict[str, int] = {}
+        key = None
+        for step in range(120):
+            roll = rng.random()
+            if roll < 0.1:
+                key = rng.choice([None, 'A', 'B', 'C', 'D'])
+                scorer.set(SCENARIO_QUESTION, key)
+            elif roll < 0.25 and responses:
+                qid = rng.choice(sorted(responses))
+                del responses[qid]
+                scorer.remove(qid)
+            else:
+                qid = rng.choice(likert)
+                responses[qid] = rng.randint(1, 5)
+                scorer.set(qid, responses[qid])
+            if scorer.result() != full(responses, key):
+                mismatches.append((session, step))
+    results.append(run_test('incremental == full rescore (4800 events)', [], mismatches))
+
+    scorer = IncrementalScorer()
+    results.append(run_test('incremental empty session', full({}, None), scorer.result()))
+    scorer.set('COM_PASSIVE_1', 5)
+    scorer.set(SCENARIO_QUESTION, 'A')
+    scorer.set(SCENARIO_QUESTION, 'B')
+    results.append(run_test('incremental scenario change moves bonus', (25, 100),
+                            (scorer.score('communication.aggressive'), scorer.score('communication.passive'))))
+    scorer.set('NOT_A_QUESTION', 3)
+    results.append(run_test('incremental ignores unknown questions', {'COM_PASSIVE_1': 5}, scorer.responses()))
+    try:
+        scorer.set('S1', 6)
+        rejected = False
+    except ValueError:
+        rejected = True
+    results.append(run_test('incremental rejects out-of-range', True, rejected))
+
+    answers = {'S2': {'v': 4, 't': 30}, 'S1': {'v': 2, 't': 10}, SCENARIO_QUESTION: {'t': 20, 'k': 'D'},
+               'S3': {'v': 9, 't': 5}}
+    results.append(run_test('answer events ordered by t', [(10, 'S1', 2), (20, SCENARIO_QUESTION, 'D'),
+                                                           (30, 'S2', 4)], answer_events(answers)))
+
+    lines = [json.dumps({'id': i, 'answers': encode_answers(*random_responses(rng, 0.8), i)}).encode()
+             for i in range(30)] + [b'not json']
+    report = replay_sessions(lines)
+    results.append(run_test('replay sessions match full rescore', (30, 1, 0),
+                            (report['sessions'], report['skipped'], report['mismatches'])))
+
+    return results
@@ -0,0 +1,51 @@
+"""Suites for quiz_scoring.profiling."""
+
+import json
+from io import StringIO
+from typing import List
+
+from ..profiling import _NULL_SPAN, PROFILER
+from ..batch import encode_answers
+from ..rescore import _parse_stage, rescore_stream
+from ..testing import TestResult, random_cases, run_test
+
+def test_stage_profiler() -> List[TestResult]:
+    """Profiling is free when off and times every rescore stage when on without changing output."""
+    results = []
+    lines = [json.dumps({'id': i, 'answers': encode_answers(resp, key)}).encode()
+             for i, (resp, key) in enumerate(random_cases(15, (0.9,), 40))]
+
+    plain = StringIO()
+    rescore_stream(lines, plain, chunk_size=16)
+    results.append(run_test('profiler disabled by default', False, PROFILER.enabled))
+    results.append(run_test('disabled span is shared no-op', True, PROFILER.span('x') is _NULL_SPAN))
+    results.append(run_test('disabled wrap returns function', True, PROFILER.wrap('parse', _parse_stage) is _parse_stage))
+
+    PROFILER.enable()
+    try:
+        profiled = StringIO()
+        rescore_stream(lines, profiled, chunk_size=16)
+        summary = PROFILER.summary()
+        stacks = PROFILER.collapsed()
+    finally:
+        PROFILER.disable()
+        PROFILER.reset()
+    results.append(run_test('profiled output unchanged', plain.getvalue(), profiled.getvalue()))
+    calls = {stage['stage']: stage['calls'] for stage in summary['stages']}
+    results.append(run_test('profile stage calls per chunk',
+                            {'parse': 3, 'decode': 3, 'score': 3, 'score;reverse': 3, 'score;normalize': 3,
+                             'score;rank': 3, 'archetype': 3, 'serialize': 3}, calls))
+    score = next(stage for stage in summary['stages'] if stage['stage'] == 'score')
+    nested = sum(stage['seconds'] for stage in summary['stages'] if stage['stage'].startswith('score;'))
+    results.append(run_test('profile self time excludes children', True,
+                            abs(score['seconds'] - score['selfSeconds'] - nested) < 1e-5))
+    results.append(run_test('collapsed stacks well-formed', True,
+                            all(line.startswith('main') and line.rsplit(' ', 1)[1].isdigit() for line in stacks)))
+    results.append(run_test('collapsed stacks nest under root', True, 'main;score;normalize' in
+                            {line.rsplit(' ', 1)[0] for line in stacks}))
+
+    with PROFILER.span('x'):
+        pass
+    results.append(run_test('disabled profiler records nothing', {}, PROFILER.stats))
+
+    return results
@@ -0,0 +1,112 @@
+"""Suites for quiz_scoring.rescore."""
+
+import json
+import multiprocessing
+import os
+import random
+import tempfile
+from io import StringIO
+from typing import Iterator, List
+
+from ..core import ATTACHMENT_ORDER, COMMUNICATION_ORDER, SCENARIO_QUESTION
+from ..batch import encode_answers
+from ..rescore import byte_shards, db_primary, imap_bounded, _record_id, rescore_parallel, rescore_stream
+from ..testing import TestResult, random_cases, random_responses, run_test
+
+def test_rescore_stream() -> List[TestResult]:
+    """Streaming rescore keeps rows in order, decodes legacy answers and flags bad rows."""
+    results = []
+    cases = random_cases(7, (1.0, 0.7), 40)
+    lines = [json.dumps({'id': f'row-{i}', 'answers': encode_answers(resp, key, 1700000000000 + i)}).encode()
+             for i, (resp, key) in enumerate(cases)]
+    # Legacy scenario entry carrying v, answers stored as a JSON string, bad rows, blank line
+    lines.append(json.dumps({'id': 'legacy', 'answers': json.dumps(
+        {'S1': {'v': 5, 't': 1}, SCENARIO_QUESTION: {'v': 3, 't': 1, 'k': 'B'}})}).encode())
+    lines += [b'{"id": "no-answers"}', b'not json', b'   ']
+
+    out = StringIO()
+    stats = rescore_stream(lines, out, chunk_size=7)
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+
+    results.append(run_test('rescore row/error counts', {'rows': 83, 'errors': 2}, stats))
+    results.append(run_test('rescore keeps input order', [f'row-{i}' for i in range(80)] + ['legacy', 'no-answers'],
+                            [r.get('id') for r in records[:82]]))
+    whole = StringIO()
+    rescore_stream(lines, whole, chunk_size=len(lines))
+    results.append(run_test('rescore output independent of chunk size', whole.getvalue(), out.getvalue()))
+    results.append(run_test('rescore legacy scenario uses k', 'aggressive',
+                            records[80]['scores']['communication']['primary']))
+    results.append(run_test('rescore missing answers', 'missing answers', records[81].get('error')))
+    results.append(run_test('rescore invalid JSON flagged', True, records[82].get('error', '').startswith('invalid JSON')))
+
+    # DBScores primary shape matches scoring.ts
+    results.append(run_test('db primary single', 'secure', db_primary({'secure': 9, 'anxious': 1, 'avoidant': 1,
+                                                                       'disorganized': 1}, ATTACHMENT_ORDER)))
+    results.append(run_test('db primary tie list', ['anxious', 'avoidant'],
+                            db_primary({'secure': 0, 'anxious': 5, 'avoidant': 5, 'disorganized': 0}, ATTACHMENT_ORDER)))
+    results.append(run_test('db primary mixed', 'mixed', db_primary({s: 50 for s in COMMUNICATION_ORDER},
+                                                                    COMMUNICATION_ORDER)))
+
+    return results
+
+def test_parallel_rescore() -> List[TestResult]:
+    """Sharded pool rescoring reproduces the serial output."""
+    results = []
+    rng = random.Random(11)
+    lines = [json.dumps({'id': f'{rng.getrandbits(32):08x}',
+                         'answers': encode_answers(*random_responses(rng, 0.9))}).encode() + b'\n'
+             for _ in range(300)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'export.jsonl')
+        with open(path, 'wb') as f:
+            f.writelines(lines)
+
+        shards = byte_shards(path, 7)
+        size = os.path.getsize(path)
+        with open(path, 'rb') as f:
+            data = f.read()
+        aligned = all(start == 0 or data[start - 1:start] == b'\n' for start, _ in shards)
+        contiguous = shards[0][0] == 0 and shards[-1][1] == size and all(
+            a[1] == b[0] for a, b in zip(shards, shards[1:]))
+        results.append(run_test('byte shards aligned and contiguous', True, aligned and contiguous))
+
+        serial = StringIO()
+        rescore_stream(lines, serial)
+        parallel = StringIO()
+        stats = rescore_parallel(path, parallel, workers=2, chunk_size=16)
+        results.append(run_test('parallel matches serial order', serial.getvalue(), parallel.getvalue()))
+        results.append(run_test('parallel row count', 300, stats['rows']))
+        results.append(run_test('parallel per-worker rows', 300, sum(w['rows'] for w in stats['workers'])))
+
+        by_id = StringIO()
+        rescore_parallel(path, by_id, workers=2, chunk_size=16, sort_by_id=True)
+        results.append(run_test('parallel sort by id', sorted(serial.getvalue().splitlines(), key=_record_id),
+                                by_id.getvalue().splitlines()))
+
+        # Numeric ids in numeric order ('10' after '9'), then strings, with missing ids first
+        numeric = os.path.join(tmp, 'numeric.jsonl')
+        idents = [10, 9, 'b', 100, None, 2.5, 'a', 1]
+        with open(numeric, 'wb') as f:
+            f.writelines(json.dumps({'id': ident, 'answers': encode_answers({'S1': 3})}).encode() + b'\n'
+                         for ident in idents)
+        by_id = StringIO()
+        rescore_parallel(numeric, by_id, workers=2, chunk_size=2, sort_by_id=True)
+        results.append(run_test('parallel sort by typed id', [None, 1, 2.5, 9, 10, 100, 'a', 'b'],
+                                [json.loads(line).get('id') for line in by_id.getvalue().splitlines()]))
+
+    # The stdin path reads shards only as the output takes their results
+    taken = []
+    def shards() -> Iterator[int]:
+        for n in range(20):
+            taken.append(n)
+            yield -n
+    with multiprocessing.Pool(2) as pool:
+        order, ahead = [], 0
+        for result in imap_bounded(pool, abs, shards(), 4):
+            order.append(result)
+            ahead = max(ahead, len(taken) - len(order))
+    results.append(run_test('bounded imap keeps order and reads at most limit ahead', (list(range(20)), 4),
+                            (order, ahead)))
+
+    return results
@@ -0,0 +1,128 @@
+"""Suites for quiz_scoring.runner."""
+
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+from typing import List
+
+from ..testing import (
+    FIXTURES_PATH, TestResult, check_fixtures, generate_fixtures, load_fixtures, run_test, write_fixtures,
+)
+from ..runner import ReportWriter, SuiteRun, run_tests, test_units
+
+def test_test_runner() -> List[TestResult]:
+    """Fixture tables round-trip and match the reference scorer; -k, fail-fast and workers select and run units."""
+    results = []
+    cases = generate_fixtures(6, seed=20)
+    workdir = tempfile.mkdtemp(prefix='quiz-fixtures-')
+    try:
+        path = os.path.join(workdir, 'cases.json')
+        write_fixtures(path, cases)
+        results.append(run_test('fixtures round-trip', cases, load_fixtures(path)))
+        checked = check_fixtures(load_fixtures(path))
+        results.append(run_test('fixtures pass on every scoring path', (len(cases), 0),
+                                (len(checked), sum(1 for r in checked if not r.passed))))
+
+        bad = json.loads(json.dumps(cases[0]))
+        bad['expected']['scores']['confidence'] += 1
+        results.append(run_test('fixtures catch a wrong expectation', [False], [r.passed for r in check_fixtures([bad])]))
+
+        results.append(run_test('-k selects suites by substring', ['reverse_scoring'],
+                                [name for name, _ in test_units(['REVERSE'], None)]))
+        units = list(test_units(['straight-line'], path, fixture_chunk=2))
+        results.append(run_test('-k selects fixture cases in chunks', ['fixtures[0:2]', 'fixtures[2:4]', 'fixtures[4:5]'],
+                                [name for name, _ in units]))
+
+        units = [('bad', [bad]), ('normalization', None)]
+        results.append(run_test('fail-fast stops after a failure', [['bad'], ['bad', 'normalization']],
+                                [[run.name for run in run_tests(units, fail_fast=fail_fast)] for fail_fast in (True, False)]))
+
+        units = list(test_units(['normalization', 'reverse'], path, fixture_chunk=4))
+        outcomes = [[(run.name, [(r.name, r.passed) for r in run.results]) for run in run_tests(units, workers)]
+                    for workers in (1, 2)]
+        results.append(run_test('parallel run matches serial', outcomes[0], outcomes[1]))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if os.path.exists(FIXTURES_PATH):
+        results.append(run_test('shared fixtures are current', generate_fixtures(), load_fixtures(FIXTURES_PATH)))
+    return results
+
+def test_report_writer() -> List[TestResult]:
+    """Reports stream per suite in every format, with failures-only filtering and a bounded line buffer."""
+    results = []
+    results.append(run_test('TestResult has no instance dict', False, hasattr(run_test('x', 1, 1), '__dict__')))
+
+    def runs() -> List[SuiteRun]:
+        return [SuiteRun('a', [run_test('a ok', 1, 1), run_test('a bad', {1}, {2})], 0.5),
+                SuiteRun('b', [run_test('b ok', 'x', 'x')], 0.25)]
+
+    out = StringIO()
+    writer = ReportWriter(out, 'ndjson')
+    first, second = runs()
+    writer.add(first)
+    results.append(run_test('report streams each suite as it finishes', ['test', 'test', 'suite'],
+                            [json.loads(line)['type'] for line in out.getvalue().splitlines()]))
+    writer.add(second)
+    results.append(run_test('report returns the failure count', 1, writer.close()))
+    lines = [json.loads(line) for line in out.getvalue().splitlines()]
+    results.append(run_test('ndjson summary', {'type': 'summary', 'total': 3, 'passed': 2, 'failed': 1}, lines[-1]))
+
+    out = StringIO()
+    writer = ReportWriter(out, 'ndjson', failures_only=True)
+    for run in runs():
+        writer.add(run)
+    writer.close()
+    lines = [json.loads(line) for line in out.getvalue().splitlines()]
+    results.append(run_test('failures-only keeps failed tests and full counts', (['a bad'], 3),
+                            ([l['name'] for l in lines if l['type'] == 'test'], lines[-1]['total'])))
+
+    out = StringIO()
+    writer = ReportWriter(out, 'json')
+    for run in runs():
+        writer.add(run)
+    writer.close()
+    report = json.loads(out.getvalue())
+    results.append(run_test('json report is one document', ({'total': 3, 'passed': 2, 'failed': 1}, ['a', 'b'], 3, '{1}'),
+                            (report['summary'], [s['name'] for s in report['suites']], len(report['tests']),
+                             report['tests'][1]['expected'])))
+    results.append(run_test('json report keeps the indent=2 layout', json.dumps(report, indent=2) + '\n', out.getvalue()))
+    out = StringIO()
+    ReportWriter(out, 'json', failures_only=True).close()
+    results.append(run_test('json report with no tests', {'tests': [], 'suites': [], 'summary': {'total': 0, 'passed': 0, 'failed': 0}},
+                            json.loads(out.getvalue())))
+
+    out = StringIO()
+    writer = ReportWriter(out, 'text', failures_only=True)
+    for run in runs():
+        writer.add(run)
+    writer.close()
+    text = out.getvalue()
+    results.append(run_test('text failures-only', (False, True, True), ('a ok' in text, '❌ a bad' in text, 'TOTAL: 2/3' in text)))
+
+    class LineCounter:
+        def __init__(self):
+            self.most = 0
+
+        def write(self, text: str) -> None:
+            self.most = max(self.most, text.count('\n'))
+
+        def flush(self) -> None:
+            pass
+
+    sink = LineCounter()
+    writer = ReportWriter(sink, 'ndjson', buffer_lines=10)
+    writer.add(SuiteRun('big', [run_test(f'case {i}', i, i) for i in range(1000)], 0.0))
+    writer.close()
+    results.append(run_test('report buffer holds at most buffer_lines', 10, sink.most))
+
+    writer = ReportWriter(LineCounter(), 'ndjson', buffer_lines=10)
+    pending = []
+    for n in range(100):
+        writer.add(SuiteRun(f's{n}', [run_test(f'case {i}', [i], [i]) for i in range(50)], 0.0))
+        pending.append(len(writer.buffer))
+    results.append(run_test('report buffer is empty after every suite', [0] * 100, pending))
+
+    return results
@@ -0,0 +1,81 @@
+"""Suites for quiz_scoring.spec."""
+
+import os
+import shutil
+import tempfile
+from typing import List
+
+from ..batch import PLAN, QUESTION_IDS
+from ..spec import APP_ROOT, SPEC_SOURCES, load_spec, parse_questions_ts, parse_scored_ts, plan_from_spec, spec_drift
+from ..testing import TestResult, run_test
+
+def test_spec_loader() -> List[TestResult]:
+    """The TS spec compiles to the built-in constants and plan, and the cache follows source content."""
+    results = []
+    root = tempfile.mkdtemp(prefix='quiz-spec-')
+    try:
+        for rel in SPEC_SOURCES.values():
+            os.makedirs(os.path.dirname(os.path.join(root, rel)), exist_ok=True)
+            shutil.copyfile(os.path.join(APP_ROOT, rel), os.path.join(root, rel))
+        cache = os.path.join(root, 'cache')
+
+        spec, cached = load_spec(root, cache)
+        results.append(run_test('spec cold load parses', False, cached))
+        results.append(run_test('spec matches script constants', [], spec_drift(spec)))
+        # Every question the script scores, plus the ones scoring.ts collects but never lists
+        results.append(run_test('spec counts every question', sorted(QUESTION_IDS + tuple(spec['unscored'])),
+                                sorted(spec['questions'])))
+        results.append(run_test('spec unscored questions stay out of scoring', (True, []),
+                                (bool(spec['unscored']), sorted(set(spec['unscored']) & set(QUESTION_IDS)))))
+        plan = plan_from_spec(spec)
+        results.append(run_test('spec compiles to built-in plan', True,
+                                (plan.columns, plan.contributions, plan.score_table, plan.scenario_bonus_keys)
+                                == (PLAN.columns, PLAN.contributions, PLAN.score_table, PLAN.scenario_bonus_keys)))
+        results.append(run_test('spec warm load from cache', (spec, True), load_spec(root, cache)))
+
+        questions = os.path.join(root, SPEC_SOURCES['questions'])
+        with open(questions, encoding='utf-8') as f:
+            text = f.read()
+        with open(questions, 'w', encoding='utf-8') as f:
+            f.write(text.replace("scoring: { section: 'confidence' },\n  },", "scoring: { section: 'confidence' },\n    reverse: true,\n  },", 1))
+        edited, cached = load_spec(root, cache)
+        results.append(run_test('spec edit misses cache', (False, True), (cached, edited['hash'] != spec['hash'])))
+        results.append(run_test('spec drift names reverse flag', ['reverse'],
+                                [line.split(':')[0] for line in spec_drift(edited)]))
+
+        with open(os.path.join(cache, f"spec-{edited['hash']}.json"), 'w') as f:
+            f.write('{truncated')
+        results.append(run_test('spec corrupt cache reparses', (edited, False), load_spec(root, cache)))
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    snippet = """
+const qs = [
+  {
+    id: 'X1',
+    text: 'It\\'s fine, {really}.',
+    type: 'likert',
+    scoring: { section: 'attachment', dimension: 'secure' },
+    reverse: true,
+  },
+];
+export const quizSections = [
+  {
+    id: 'attachment',
+    questions: qs,
+  },
+];
+"""
+    expected = [{'id': 'X1', 'type': 'likert', 'scoring': {'section': 'attachment', 'dimension': 'secure'},
+                 'reverse': True, 'options': {}}]
+    results.append(run_test('spec parses TS question objects', expected, parse_questions_ts(snippet)))
+    reflowed = "const qs=[{id:'X1',text:'It\\'s fine, {really}.', // }\n type:'likert',scoring:{section:'attachment'," \
+               "dimension:'secure'},/* } */reverse:true}];"
+    results.append(run_test('spec parser ignores layout', expected, parse_questions_ts(reflowed)))
+    results.append(run_test('spec scored lists skip EXPECTED_', ['C1', 'LL1', 'LL2'], parse_scored_ts(
+        "const EXPECTED_REVERSED_QUESTIONS = ['C9'] as const;\n"
+        "const CONFIDENCE_QUESTIONS = ['C1'];\n"
+        "const LOVE_LANGUAGE_QUESTIONS: Record<LoveLanguage, { give: string; receive: string }> = "
+        "{ words: { give: 'LL1', receive: 'LL2' } };")))
+
+    return results
@@ -0,0 +1,97 @@
+"""Suites for quiz_scoring.store."""
+
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+from io import StringIO
+from typing import List
+
+from ..core import COMMUNICATION_ORDER
+from ..batch import encode_answers
+from ..rescore import rescore_stream
+from ..store import STORE_COLUMNS, STORE_INDEXES, STORE_TABLE, archetype_utm_breakdown, ingest_store
+from ..testing import TestResult, random_cases, run_test
+
+def test_sqlite_store() -> List[TestResult]:
+    """Serial and parallel ingest store the rescored rows as flat columns with the schema.sql indexes rebuilt."""
+    results = []
+    cases = random_cases(19, (1.0, 0.7), 60)
+    utm = [None, 'tiktok', 'instagram']
+    lines = [json.dumps({'id': f'r{i:03d}', 'created_at': f'2025-04-{1 + i % 28:02d}T00:00:00Z',
+                         'utm_source': utm[i % 3], 'utm_campaign': 'spring' if i % 3 else None,
+                         'answers': encode_answers(resp, key)}).encode() for i, (resp, key) in enumerate(cases)]
+    lines.append(b'{"id": "broken"}')
+    # r000 again mid-export and at the end, in later shards: the last one is kept
+    for at, source in ((60, 'replayed-early'), (len(lines), 'replayed')):
+        lines.insert(at, json.dumps({'id': 'r000', 'created_at': '2025-04-01T00:00:00Z', 'utm_source': source,
+                                     'answers': encode_answers(*cases[1])}).encode())
+    # A valid row with no id cannot be keyed, so it is counted as an error
+    lines.insert(90, json.dumps({'answers': encode_answers(*cases[2])}).encode())
+
+    workdir = tempfile.mkdtemp(prefix='quiz-store-')
+    try:
+        export = os.path.join(workdir, 'export.jsonl')
+        with open(export, 'wb') as f:
+            f.write(b'\n'.join(lines) + b'\n')
+        serial_db, parallel_db = os.path.join(workdir, 'serial.db'), os.path.join(workdir, 'parallel.db')
+        serial = ingest_store(export, serial_db, chunk_size=16)
+        parallel = ingest_store(export, parallel_db, workers=2, chunk_size=16)
+        results.append(run_test('store ingest counts', [(123, 2), (123, 2)],
+                                [(serial['rows'], serial['errors']), (parallel['rows'], parallel['errors'])]))
+
+        conn = sqlite3.connect(serial_db)
+        stored = {row[0]: row for row in conn.execute(f'SELECT * FROM {STORE_TABLE}')}
+        # Columns flatten the rescored JSONL record of the same row (the last one for a repeated id)
+        rescored = StringIO()
+        rescore_stream(lines, rescored)
+        records = {record['id']: record for record in map(json.loads, rescored.getvalue().splitlines())
+                   if record.get('id') is not None and 'error' not in record}
+        mismatches = []
+        for ident, record in records.items():
+            row = dict(zip(STORE_COLUMNS, stored[ident]))
+            db = record['scores']
+            primary = db['attachment']['primary']
+            if (row['archetype_slug'] != record['archetype_slug'] or row['is_balanced'] != record['isBalanced']
+                    or row['confidence'] != db['confidence'] or row['love_primary'] != db['loveLanguages']['ranked'][0]
+                    or row['attachment_primary'] != (primary if isinstance(primary, str) else json.dumps(primary))
+                    or [row[f'communication_{s}'] for s in COMMUNICATION_ORDER]
+                    != [db['communication']['scores'][s] for s in COMMUNICATION_ORDER]):
+                mismatches.append(ident)
+        results.append(run_test('store columns flatten the rescored rows', ([], 120), (mismatches, len(records))))
+        results.append(run_test('store keeps the last row of a repeated id', ('replayed', 121),
+                                (dict(zip(STORE_COLUMNS, stored['r000']))['utm_source'], len(stored))))
+        results.append(run_test('store keeps error rows', ('missing answers', None),
+                                (dict(zip(STORE_COLUMNS, stored['broken']))['error'],
+                                 dict(zip(STORE_COLUMNS, stored['broken']))['archetype_slug'])))
+        indexes = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        results.append(run_test('store rebuilds schema.sql indexes', True, set(STORE_INDEXES) <= indexes))
+        plan = ' '.join(str(step) for step in conn.execute(
+            f'EXPLAIN QUERY PLAN SELECT archetype_slug, utm_source, utm_campaign, COUNT(*) FROM {STORE_TABLE} '
+            'WHERE error IS NULL GROUP BY archetype_slug, utm_source, utm_campaign'))
+        results.append(run_test('store breakdown uses covering index', True, 'idx_rescored_archetype_utm' in plan))
+        breakdown = archetype_utm_breakdown(conn)
+        results.append(run_test('store breakdown totals', 120, sum(r['rows'] for r in breakdown)))
+        results.append(run_test('store breakdown since', sum(1 for i in range(120) if 1 + i % 28 >= 20),
+                                sum(r['rows'] for r in archetype_utm_breakdown(conn, '2025-04-20'))))
+        serial_rows = sorted(conn.execute(f'SELECT * FROM {STORE_TABLE}'))
+        conn.close()
+        conn = sqlite3.connect(parallel_db)
+        results.append(run_test('store parallel matches serial', serial_rows,
+                                sorted(conn.execute(f'SELECT * FROM {STORE_TABLE}'))))
+        results.append(run_test('store parallel removes parts', ['export.jsonl', 'parallel.db', 'serial.db'],
+                                sorted(os.listdir(workdir))))
+        conn.close()
+
+        # Ingesting again (serially and in parallel) replaces rows by id instead of appending
+        ingest_store(export, serial_db, chunk_size=16)
+        ingest_store(export, serial_db, workers=2, chunk_size=16)
+        conn = sqlite3.connect(serial_db)
+        results.append(run_test('store re-ingest keeps one row per id', serial_rows,
+                                sorted(conn.execute(f'SELECT * FROM {STORE_TABLE}'))))
+        conn.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return results
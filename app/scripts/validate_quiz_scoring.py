@@ -7,550 +7,373 @@ Independently validates all quiz scoring algorithms by:
 2. Running comprehensive test cases
 3. Outputting JSON report
 
+The scoring port, tools and test suites live in the quiz_scoring package next to this script.
+
 Usage: python validate_quiz_scoring.py [--json]
+       python validate_quiz_scoring.py <any mode> --profile stacks.txt   (e.g. flamegraph.pl stacks.txt > profile.svg)
+       python validate_quiz_scoring.py --rescore export.jsonl [-o rescored.jsonl] [--workers N [--sort-by-id]]
+       python validate_quiz_scoring.py --build-corpus export.jsonl -o corpus/
+       python validate_quiz_scoring.py --rescore corpus/ [-o rescored.jsonl] [--workers N]
+       python validate_quiz_scoring.py --replay export.jsonl
+       python validate_quiz_scoring.py --sensitivity export.jsonl|corpus/ [-o summary.json] [--rows rows.jsonl]
+       python validate_quiz_scoring.py --sweep export.jsonl|corpus/ [--bonus 15,25] [--epsilon 0.005,0.01] [--balanced 0.85,0.9]
+       python validate_quiz_scoring.py --audit export.jsonl -o mismatches.jsonl --watermark audit.watermark.json
+       python validate_quiz_scoring.py --ingest export.jsonl|corpus/ --db results.db [--workers N]
+       python validate_quiz_scoring.py --breakdown --db results.db [--since 2025-01-01] [-o breakdown.json]
+       python validate_quiz_scoring.py --aggregate export.jsonl|corpus/ [...] [-o stats.json] [--workers N]
+       python validate_quiz_scoring.py --bench [--bench-rows 10000,1000000] [--baseline bench.json [--update-baseline]] [--tolerance 0.25]
+       python validate_quiz_scoring.py --serve /tmp/quiz-scoring.sock|127.0.0.1:8765 [--batch-window 2]
+       python validate_quiz_scoring.py --spec-check [--spec-root app/] [--spec-cache DIR]
+       python validate_quiz_scoring.py --exhaustive [--workers N] [--classes classes.jsonl]
 """
 
+import argparse
+import asyncio
 import json
+import os
+import sqlite3
 import sys
-from typing import Dict, List, Optional, Tuple, Any
-
-# =============================================================================
-# CONSTANTS (matching questions.ts)
-# =============================================================================
-
-REVERSE_QUESTIONS = frozenset(['C2', 'C4', 'EA2', 'EA4', 'BA3'])
-
-ATTACHMENT_QUESTIONS = {
-    'secure': ['S1', 'S2', 'S3'],
-    'anxious': ['AX1', 'AX2', 'AX3'],
-    'avoidant': ['AV1', 'AV2', 'AV3'],
-    'disorganized': ['D1', 'D2', 'D3'],
-}
-ATTACHMENT_ORDER = ['secure', 'anxious', 'avoidant', 'disorganized']
-
-COMMUNICATION_QUESTIONS = {
-    'passive': ['COM_PASSIVE_1', 'COM_PASSIVE_2'],
-    'aggressive': ['COM_AGGRESSIVE_1', 'COM_AGGRESSIVE_2'],
-    'passive_aggressive': ['COM_PAGG_1', 'COM_PAGG_2'],
-    'assertive': ['COM_ASSERTIVE_1', 'COM_ASSERTIVE_2'],
-}
-COMMUNICATION_ORDER = ['passive', 'aggressive', 'passive_aggressive', 'assertive']
-SCENARIO_KEY_MAP = {'A': 'passive', 'B': 'aggressive', 'C': 'passive_aggressive', 'D': 'assertive'}
-
-CONFIDENCE_QUESTIONS = ['C1', 'C2', 'C3', 'C4', 'C5']
-EMOTIONAL_QUESTIONS = ['EA1', 'EA2', 'EA3', 'EA4', 'EA5']
-INTIMACY_COMFORT = ['IC1', 'IC2', 'IC3']
-INTIMACY_BOUNDARY = ['BA1', 'BA2', 'BA3']
-
-LOVE_LANGUAGE_QUESTIONS = {
-    'words': ('LL1', 'LL2'),
-    'time': ('LL3', 'LL4'),
-    'service': ('LL5', 'LL6'),
-    'gifts': ('LL7', 'LL8'),
-    'touch': ('LL9', 'LL10'),
-}
-LOVE_LANGUAGE_ORDER = ['words', 'time', 'service', 'gifts', 'touch']
-
-CONFIDENCE_THRESHOLD = 60
-SCENARIO_BONUS = 25
-
-# =============================================================================
-# CORE FUNCTIONS
-# =============================================================================
-
-def normalize(raw: float) -> int:
-    """Convert 1-5 scale to 0-100."""
-    return round(((raw - 1) / 4) * 100)
-
-def get_value(responses: Dict[str, int], qid: str) -> Optional[float]:
-    """Get response value with reverse scoring applied."""
-    if qid not in responses:
-        return None
-    val = responses[qid]
-    return (6 - val) if qid in REVERSE_QUESTIONS else val
-
-def average(values: List[float]) -> float:
-    """Calculate average of non-empty list."""
-    return sum(values) / len(values) if values else 0
-
-# =============================================================================
-# SCORING FUNCTIONS
-# =============================================================================
-
-def score_attachment(responses: Dict[str, int]) -> Dict[str, Any]:
-    """Score attachment dimensions, return scores dict and primary."""
-    scores = {}
-    for dim in ATTACHMENT_ORDER:
-        qids = ATTACHMENT_QUESTIONS[dim]
-        values = [v for qid in qids if (v := get_value(responses, qid)) is not None]
-        scores[dim] = normalize(average(values)) if values else 0
-
-    # Primary: highest score, tie goes to first in order
-    primary = max(ATTACHMENT_ORDER, key=lambda d: scores[d])
-    return {'scores': scores, 'primary': primary}
-
-def score_communication(responses: Dict[str, int], scenario_key: Optional[str] = None) -> Dict[str, Any]:
-    """Score communication styles with scenario bonus."""
-    scores = {}
-    for style in COMMUNICATION_ORDER:
-        qids = COMMUNICATION_QUESTIONS[style]
-        values = [v for qid in qids if (v := get_value(responses, qid)) is not None]
-        scores[style] = normalize(average(values)) if values else 0
-
-    # Apply scenario bonus
-    if scenario_key and scenario_key in SCENARIO_KEY_MAP:
-        style = SCENARIO_KEY_MAP[scenario_key]
-        scores[style] = min(100, scores[style] + SCENARIO_BONUS)
-
-    # Primary: highest score, tie goes to first in order
-    primary = max(COMMUNICATION_ORDER, key=lambda s: scores[s])
-    return {'scores': scores, 'primary': primary}
-
-def score_confidence(responses: Dict[str, int]) -> int:
-    """Score confidence (C2, C4 reversed)."""
-    values = [v for qid in CONFIDENCE_QUESTIONS if (v := get_value(responses, qid)) is not None]
-    return normalize(average(values)) if values else 0
-
-def score_emotional(responses: Dict[str, int]) -> int:
-    """Score emotional availability (EA2, EA4 reversed)."""
-    values = [v for qid in EMOTIONAL_QUESTIONS if (v := get_value(responses, qid)) is not None]
-    return normalize(average(values)) if values else 0
-
-def score_intimacy(responses: Dict[str, int]) -> Dict[str, int]:
-    """Score intimacy comfort and boundaries (BA3 reversed)."""
-    comfort_vals = [v for qid in INTIMACY_COMFORT if (v := get_value(responses, qid)) is not None]
-    boundary_vals = [v for qid in INTIMACY_BOUNDARY if (v := get_value(responses, qid)) is not None]
-    return {
-        'comfort': normalize(average(comfort_vals)) if comfort_vals else 0,
-        'boundaries': normalize(average(boundary_vals)) if boundary_vals else 0,
-    }
-
-def score_love_languages(responses: Dict[str, int]) -> Dict[str, Any]:
-    """Score love languages with give/receive breakdown."""
-    scores = {}
-    give_receive = {}
-
-    for lang in LOVE_LANGUAGE_ORDER:
-        give_qid, receive_qid = LOVE_LANGUAGE_QUESTIONS[lang]
-        give_val = get_value(responses, give_qid)
-        receive_val = get_value(responses, receive_qid)
-
-        give_receive[lang] = {
-            'give': normalize(give_val) if give_val else 0,
-            'receive': normalize(receive_val) if receive_val else 0,
-        }
-
-        values = [v for v in [give_val, receive_val] if v is not None]
-        scores[lang] = normalize(average(values)) if values else 0
-
-    # Rank by combined score (stable sort, highest first)
-    ranked = sorted(LOVE_LANGUAGE_ORDER, key=lambda l: scores[l], reverse=True)
-
-    return {'ranked': ranked, 'scores': scores, 'giveReceive': give_receive}
-
-def get_archetype(attachment: str, communication: str, confidence: int) -> str:
-    """Determine archetype from attachment, communication, and confidence."""
-    high_conf = confidence >= CONFIDENCE_THRESHOLD
-
-    if attachment == 'secure':
-        return 'confident-anchor' if (communication == 'assertive' or high_conf) else 'steady-connector'
-    if attachment == 'anxious':
-        return 'devoted-romantic' if high_conf else 'careful-romantic'
-    if attachment == 'avoidant':
-        return 'independent-spirit' if (high_conf or communication == 'assertive') else 'private-protector'
-    if attachment == 'disorganized':
-        return 'complex-soul' if high_conf else 'searching-soul'
-
-    # Communication-based fallbacks
-    return {
-        'passive': 'diplomatic-dater',
-        'aggressive': 'fiery-heart',
-        'passive_aggressive': 'subtle-communicator',
-        'assertive': 'clear-voice',
-    }.get(communication, 'steady-connector')
-
-# =============================================================================
-# TEST FRAMEWORK
-# =============================================================================
-
-class TestResult:
-    def __init__(self, name: str, passed: bool, expected: Any, actual: Any, details: str = ''):
-        self.name = name
-        self.passed = passed
-        self.expected = expected
-        self.actual = actual
-        self.details = details
-
-def run_test(name: str, expected: Any, actual: Any) -> TestResult:
-    passed = expected == actual
-    return TestResult(name, passed, expected, actual)
-
-# =============================================================================
-# TEST CASES
-# =============================================================================
-
-def test_normalization() -> List[TestResult]:
-    """Test normalization formula."""
-    results = []
-    cases = [(1, 0), (2, 25), (3, 50), (4, 75), (5, 100)]
-    for raw, expected in cases:
-        actual = normalize(raw)
-        results.append(run_test(f'normalize({raw})', expected, actual))
-    return results
-
-def test_reverse_scoring() -> List[TestResult]:
-    """Test reverse scoring logic."""
-    results = []
-
-    # C2 reversed: raw 5 -> effective 1
-    resp = {'C2': 5}
-    actual = get_value(resp, 'C2')
-    results.append(run_test('C2 reversed (5->1)', 1.0, actual))
-
-    # Non-reversed: C1 raw 5 -> effective 5
-    resp = {'C1': 5}
-    actual = get_value(resp, 'C1')
-    results.append(run_test('C1 not reversed (5->5)', 5.0, actual))
-
-    # All reversed questions
-    for qid in REVERSE_QUESTIONS:
-        resp = {qid: 3}
-        actual = get_value(resp, qid)
-        results.append(run_test(f'{qid} reversed (3->3)', 3.0, actual))
-
-    return results
-
-def test_attachment() -> List[TestResult]:
-    """Test attachment scoring."""
-    results = []
-
-    # All 5s -> all 100
-    resp = {q: 5 for dim in ATTACHMENT_ORDER for q in ATTACHMENT_QUESTIONS[dim]}
-    result = score_attachment(resp)
-    for dim in ATTACHMENT_ORDER:
-        results.append(run_test(f'attachment all 5s: {dim}', 100, result['scores'][dim]))
-
-    # All 1s -> all 0
-    resp = {q: 1 for dim in ATTACHMENT_ORDER for q in ATTACHMENT_QUESTIONS[dim]}
-    result = score_attachment(resp)
-    for dim in ATTACHMENT_ORDER:
-        results.append(run_test(f'attachment all 1s: {dim}', 0, result['scores'][dim]))
-
-    # Secure highest -> primary secure
-    resp = {'S1': 5, 'S2': 5, 'S3': 5, 'AX1': 1, 'AX2': 1, 'AX3': 1,
-            'AV1': 1, 'AV2': 1, 'AV3': 1, 'D1': 1, 'D2': 1, 'D3': 1}
-    result = score_attachment(resp)
-    results.append(run_test('attachment primary=secure', 'secure', result['primary']))
-
-    # Tie -> first in order (secure)
-    resp = {q: 3 for dim in ATTACHMENT_ORDER for q in ATTACHMENT_QUESTIONS[dim]}
-    result = score_attachment(resp)
-    results.append(run_test('attachment tie->secure', 'secure', result['primary']))
-
-    # Mixed: S=5,4,3 avg=4->75
-    resp = {'S1': 5, 'S2': 4, 'S3': 3, 'AX1': 3, 'AX2': 3, 'AX3': 3,
-            'AV1': 1, 'AV2': 1, 'AV3': 1, 'D1': 1, 'D2': 1, 'D3': 1}
-    result = score_attachment(resp)
-    results.append(run_test('attachment mixed S=75', 75, result['scores']['secure']))
-    results.append(run_test('attachment mixed AX=50', 50, result['scores']['anxious']))
-
-    return results
-
-def test_communication() -> List[TestResult]:
-    """Test communication scoring with scenario bonus."""
-    results = []
-
-    # Base scores without scenario
-    resp = {'COM_PASSIVE_1': 5, 'COM_PASSIVE_2': 5,
-            'COM_AGGRESSIVE_1': 1, 'COM_AGGRESSIVE_2': 1,
-            'COM_PAGG_1': 1, 'COM_PAGG_2': 1,
-            'COM_ASSERTIVE_1': 1, 'COM_ASSERTIVE_2': 1}
-    result = score_communication(resp)
-    results.append(run_test('comm passive=100', 100, result['scores']['passive']))
-    results.append(run_test('comm primary=passive', 'passive', result['primary']))
-
-    # Scenario bonus +25
-    resp = {'COM_PASSIVE_1': 3, 'COM_PASSIVE_2': 3,
-            'COM_AGGRESSIVE_1': 3, 'COM_AGGRESSIVE_2': 3,
-            'COM_PAGG_1': 3, 'COM_PAGG_2': 3,
-            'COM_ASSERTIVE_1': 3, 'COM_ASSERTIVE_2': 3}
-    result = score_communication(resp, 'A')
-    results.append(run_test('comm scenario A: passive=75', 75, result['scores']['passive']))
-
-    result = score_communication(resp, 'D')
-    results.append(run_test('comm scenario D: assertive=75', 75, result['scores']['assertive']))
-
-    # Cap at 100
-    resp = {'COM_PASSIVE_1': 5, 'COM_PASSIVE_2': 5,
-            'COM_AGGRESSIVE_1': 1, 'COM_AGGRESSIVE_2': 1,
-            'COM_PAGG_1': 1, 'COM_PAGG_2': 1,
-            'COM_ASSERTIVE_1': 1, 'COM_ASSERTIVE_2': 1}
-    result = score_communication(resp, 'A')
-    results.append(run_test('comm cap at 100', 100, result['scores']['passive']))
-
-    # Each scenario key mapping
-    resp = {'COM_PASSIVE_1': 1, 'COM_PASSIVE_2': 1,
-            'COM_AGGRESSIVE_1': 1, 'COM_AGGRESSIVE_2': 1,
-            'COM_PAGG_1': 1, 'COM_PAGG_2': 1,
-            'COM_ASSERTIVE_1': 1, 'COM_ASSERTIVE_2': 1}
-    for key, style in SCENARIO_KEY_MAP.items():
-        result = score_communication(resp, key)
-        results.append(run_test(f'comm scenario {key}->{style}=25', 25, result['scores'][style]))
-
-    return results
-
-def test_confidence() -> List[TestResult]:
-    """Test confidence scoring with reverse scoring."""
-    results = []
-
-    # Max (C2,C4 need raw=1 to get effective=5)
-    resp = {'C1': 5, 'C2': 1, 'C3': 5, 'C4': 1, 'C5': 5}
-    results.append(run_test('confidence max=100', 100, score_confidence(resp)))
-
-    # Min (C2,C4 need raw=5 to get effective=1)
-    resp = {'C1': 1, 'C2': 5, 'C3': 1, 'C4': 5, 'C5': 1}
-    results.append(run_test('confidence min=0', 0, score_confidence(resp)))
-
-    # All 3s -> 50
-    resp = {'C1': 3, 'C2': 3, 'C3': 3, 'C4': 3, 'C5': 3}
-    results.append(run_test('confidence neutral=50', 50, score_confidence(resp)))
-
-    # All raw 5s -> [5,1,5,1,5] avg=3.4 -> 60
-    resp = {'C1': 5, 'C2': 5, 'C3': 5, 'C4': 5, 'C5': 5}
-    results.append(run_test('confidence all raw 5=60', 60, score_confidence(resp)))
-
-    # Empty
-    results.append(run_test('confidence empty=0', 0, score_confidence({})))
-
-    return results
-
-def test_emotional() -> List[TestResult]:
-    """Test emotional availability scoring."""
-    results = []
-
-    # Max (EA2,EA4 need raw=1)
-    resp = {'EA1': 5, 'EA2': 1, 'EA3': 5, 'EA4': 1, 'EA5': 5}
-    results.append(run_test('emotional max=100', 100, score_emotional(resp)))
-
-    # Min (EA2,EA4 need raw=5)
-    resp = {'EA1': 1, 'EA2': 5, 'EA3': 1, 'EA4': 5, 'EA5': 1}
-    results.append(run_test('emotional min=0', 0, score_emotional(resp)))
-
-    # All raw 5s -> 60
-    resp = {'EA1': 5, 'EA2': 5, 'EA3': 5, 'EA4': 5, 'EA5': 5}
-    results.append(run_test('emotional all raw 5=60', 60, score_emotional(resp)))
-
-    return results
-
-def test_intimacy() -> List[TestResult]:
-    """Test intimacy scoring."""
-    results = []
-
-    # Max both (BA3 needs raw=1)
-    resp = {'IC1': 5, 'IC2': 5, 'IC3': 5, 'BA1': 5, 'BA2': 5, 'BA3': 1}
-    result = score_intimacy(resp)
-    results.append(run_test('intimacy comfort=100', 100, result['comfort']))
-    results.append(run_test('intimacy boundary=100', 100, result['boundaries']))
-
-    # Min both (BA3 needs raw=5)
-    resp = {'IC1': 1, 'IC2': 1, 'IC3': 1, 'BA1': 1, 'BA2': 1, 'BA3': 5}
-    result = score_intimacy(resp)
-    results.append(run_test('intimacy comfort=0', 0, result['comfort']))
-    results.append(run_test('intimacy boundary=0', 0, result['boundaries']))
-
-    # BA3=5 -> effective 1, avg [5,5,1]=3.67 -> 67
-    resp = {'BA1': 5, 'BA2': 5, 'BA3': 5}
-    result = score_intimacy(resp)
-    results.append(run_test('intimacy BA3 reversed=67', 67, result['boundaries']))
-
-    # Independent dimensions
-    resp = {'IC1': 5, 'IC2': 5, 'IC3': 5, 'BA1': 1, 'BA2': 1, 'BA3': 5}
-    result = score_intimacy(resp)
-    results.append(run_test('intimacy independent comfort', 100, result['comfort']))
-    results.append(run_test('intimacy independent boundary', 0, result['boundaries']))
-
-    return results
-
-def test_love_languages() -> List[TestResult]:
-    """Test love languages scoring."""
-    results = []
-
-    # Clear ranking
-    resp = {'LL1': 5, 'LL2': 5, 'LL3': 4, 'LL4': 4, 'LL5': 3, 'LL6': 3,
-            'LL7': 2, 'LL8': 2, 'LL9': 1, 'LL10': 1}
-    result = score_love_languages(resp)
-    results.append(run_test('love ranked order', ['words', 'time', 'service', 'gifts', 'touch'], result['ranked']))
-    results.append(run_test('love words=100', 100, result['scores']['words']))
-    results.append(run_test('love touch=0', 0, result['scores']['touch']))
-
-    # Give/receive separate
-    resp = {'LL1': 5, 'LL2': 1, 'LL3': 1, 'LL4': 5,
-            'LL5': 3, 'LL6': 3, 'LL7': 3, 'LL8': 3, 'LL9': 3, 'LL10': 3}
-    result = score_love_languages(resp)
-    results.append(run_test('love words give=100', 100, result['giveReceive']['words']['give']))
-    results.append(run_test('love words receive=0', 0, result['giveReceive']['words']['receive']))
-    results.append(run_test('love time give=0', 0, result['giveReceive']['time']['give']))
-    results.append(run_test('love time receive=100', 100, result['giveReceive']['time']['receive']))
-
-    # Combined = normalize(avg(raw_give, raw_receive)) = normalize((5+1)/2) = normalize(3) = 50
-    results.append(run_test('love words combined=50', 50, result['scores']['words']))
-
-    return results
-
-def test_archetype() -> List[TestResult]:
-    """Test archetype determination."""
-    results = []
-
-    # Secure + high conf -> confident-anchor
-    results.append(run_test('archetype secure+high', 'confident-anchor',
-                           get_archetype('secure', 'passive', 70)))
-
-    # Secure + assertive -> confident-anchor
-    results.append(run_test('archetype secure+assertive', 'confident-anchor',
-                           get_archetype('secure', 'assertive', 40)))
-
-    # Secure + low + not assertive -> steady-connector
-    results.append(run_test('archetype secure+low', 'steady-connector',
-                           get_archetype('secure', 'passive', 50)))
-
-    # Anxious + high -> devoted-romantic
-    results.append(run_test('archetype anxious+high', 'devoted-romantic',
-                           get_archetype('anxious', 'passive', 70)))
-
-    # Anxious + low -> careful-romantic
-    results.append(run_test('archetype anxious+low', 'careful-romantic',
-                           get_archetype('anxious', 'passive', 50)))
-
-    # Avoidant + high -> independent-spirit
-    results.append(run_test('archetype avoidant+high', 'independent-spirit',
-                           get_archetype('avoidant', 'passive', 70)))
-
-    # Avoidant + assertive -> independent-spirit
-    results.append(run_test('archetype avoidant+assertive', 'independent-spirit',
-                           get_archetype('avoidant', 'assertive', 40)))
-
-    # Avoidant + low + not assertive -> private-protector
-    results.append(run_test('archetype avoidant+low', 'private-protector',
-                           get_archetype('avoidant', 'passive', 50)))
-
-    # Disorganized + high -> complex-soul
-    results.append(run_test('archetype disorg+high', 'complex-soul',
-                           get_archetype('disorganized', 'passive', 70)))
-
-    # Disorganized + low -> searching-soul
-    results.append(run_test('archetype disorg+low', 'searching-soul',
-                           get_archetype('disorganized', 'passive', 50)))
-
-    # Boundary: confidence=59 (low) vs 60 (high)
-    results.append(run_test('archetype boundary 59', 'careful-romantic',
-                           get_archetype('anxious', 'passive', 59)))
-    results.append(run_test('archetype boundary 60', 'devoted-romantic',
-                           get_archetype('anxious', 'passive', 60)))
-
-    return results
-
-def test_integration() -> List[TestResult]:
-    """Integration test matching existing TypeScript test."""
-    results = []
-
-    resp = {
-        # Attachment
-        'S1': 5, 'S2': 5, 'S3': 5, 'AX1': 1, 'AX2': 1, 'AX3': 1,
-        'AV1': 1, 'AV2': 1, 'AV3': 1, 'D1': 1, 'D2': 1, 'D3': 1,
-        # Communication
-        'COM_PASSIVE_1': 1, 'COM_PASSIVE_2': 1,
-        'COM_AGGRESSIVE_1': 1, 'COM_AGGRESSIVE_2': 1,
-        'COM_PAGG_1': 1, 'COM_PAGG_2': 1,
-        'COM_ASSERTIVE_1': 5, 'COM_ASSERTIVE_2': 5,
-        # Confidence (reverse adjusted)
-        'C1': 5, 'C2': 1, 'C3': 5, 'C4': 1, 'C5': 5,
-        # Emotional (reverse adjusted)
-        'EA1': 5, 'EA2': 1, 'EA3': 5, 'EA4': 1, 'EA5': 5,
-        # Intimacy (reverse adjusted)
-        'IC1': 5, 'IC2': 5, 'IC3': 5, 'BA1': 5, 'BA2': 5, 'BA3': 1,
-        # Love Languages
-        'LL1': 5, 'LL2': 5, 'LL3': 3, 'LL4': 3, 'LL5': 3, 'LL6': 3,
-        'LL7': 3, 'LL8': 3, 'LL9': 3, 'LL10': 3,
-    }
-
-    att = score_attachment(resp)
-    results.append(run_test('integration attachment primary', 'secure', att['primary']))
-    results.append(run_test('integration attachment secure=100', 100, att['scores']['secure']))
-
-    comm = score_communication(resp)
-    results.append(run_test('integration comm primary', 'assertive', comm['primary']))
-
-    results.append(run_test('integration confidence', 100, score_confidence(resp)))
-    results.append(run_test('integration emotional', 100, score_emotional(resp)))
-
-    intimacy = score_intimacy(resp)
-    results.append(run_test('integration intimacy comfort', 100, intimacy['comfort']))
-    results.append(run_test('integration intimacy boundary', 100, intimacy['boundaries']))
-
-    love = score_love_languages(resp)
-    results.append(run_test('integration love #1', 'words', love['ranked'][0]))
-
-    return results
-
-# =============================================================================
-# MAIN
-# =============================================================================
-
-def run_all_tests() -> Tuple[int, int, List[TestResult]]:
-    """Run all tests and return (passed, failed, results)."""
-    all_results = []
-
-    all_results.extend(test_normalization())
-    all_results.extend(test_reverse_scoring())
-    all_results.extend(test_attachment())
-    all_results.extend(test_communication())
-    all_results.extend(test_confidence())
-    all_results.extend(test_emotional())
-    all_results.extend(test_intimacy())
-    all_results.extend(test_love_languages())
-    all_results.extend(test_archetype())
-    all_results.extend(test_integration())
-
-    passed = sum(1 for r in all_results if r.passed)
-    failed = len(all_results) - passed
-
-    return passed, failed, all_results
-
-def main():
-    json_output = '--json' in sys.argv
-
-    passed, failed, results = run_all_tests()
-
-    if json_output:
-        output = {
-            'summary': {'total': len(results), 'passed': passed, 'failed': failed},
-            'tests': [
-                {'name': r.name, 'passed': r.passed, 'expected': r.expected, 'actual': r.actual}
-                for r in results
-            ]
-        }
-        print(json.dumps(output, indent=2))
-    else:
-        print(f"\n{'='*60}")
-        print(f"QUIZ SCORING VALIDATION")
-        print(f"{'='*60}\n")
-
-        for r in results:
-            status = '✅' if r.passed else '❌'
-            print(f"{status} {r.name}")
-            if not r.passed:
-                print(f"   Expected: {r.expected}")
-                print(f"   Actual:   {r.actual}")
-
-        print(f"\n{'='*60}")
-        print(f"TOTAL: {passed}/{len(results)} passed")
-        if failed > 0:
-            print(f"FAILED: {failed} tests")
+import time
+from typing import List, Optional
+
+from quiz_scoring.profiling import PROFILER
+from quiz_scoring.batch import PLAN
+from quiz_scoring.spec import APP_ROOT, SPEC_CACHE_DIR, load_spec, plan_from_spec, spec_drift
+from quiz_scoring.incremental import replay_sessions
+from quiz_scoring.rescore import RESCORE_CHUNK_SIZE, rescore_parallel, rescore_stream
+from quiz_scoring.corpus import Corpus, build_corpus, rescore_corpus
+from quiz_scoring.audit import audit_export
+from quiz_scoring.store import archetype_utm_breakdown, ingest_store
+from quiz_scoring.analysis import ParameterSweep, aggregate_paths, sensitivity_corpus, sensitivity_stream, sweep_input
+from quiz_scoring.exhaustive import ANSWER_VALUES, verify_archetype_space
+from quiz_scoring.fuzz import TsOracle, check_golden, run_fuzz, write_fuzz_inputs
+from quiz_scoring.daemon import SERVE_BATCH_WINDOW, serve
+from quiz_scoring.bench import BENCH_MACRO_ROWS, BENCH_TOLERANCE, compare_bench, run_benchmarks
+from quiz_scoring.files import open_input, open_output, write_json
+from quiz_scoring.testing import FIXTURE_COUNT, FIXTURES_PATH, generate_fixtures, write_fixtures
+from quiz_scoring.runner import report_tests
+
+def run_rescore(args: argparse.Namespace) -> int:
+    start = time.perf_counter()
+    if args.sort_by_id and (os.path.isdir(args.rescore) or args.workers <= 1):
+        print('--sort-by-id needs an export file and --workers > 1', file=sys.stderr)
+        return 2
+    with open_output(args.output) as out:
+        if os.path.isdir(args.rescore):
+            stats = rescore_corpus(args.rescore, out, args.workers, args.chunk_size)
+        elif args.workers > 1:
+            stats = rescore_parallel(args.rescore, out, args.workers, args.chunk_size, args.sort_by_id)
         else:
-            print("ALL TESTS PASSED ✅")
-        print(f"{'='*60}\n")
-
-    sys.exit(0 if failed == 0 else 1)
+            with open_input(args.rescore) as infile:
+                stats = rescore_stream(infile, out, args.chunk_size)
+    elapsed = time.perf_counter() - start
+    print(f"rescored {stats['rows']} rows ({stats['errors']} errors) in {elapsed:.2f}s "
+          f"({stats['rows'] / elapsed if elapsed else 0:,.0f} rows/s)", file=sys.stderr)
+    for w in stats.get('workers', []):
+        print(f"  worker {w['pid']}: {w['shards']} shards, {w['rows']} rows in {w['seconds']:.2f}s "
+              f"({w['rowsPerSecond']:,.0f} rows/s)", file=sys.stderr)
+    return 0
+
+def run_build_corpus(args: argparse.Namespace) -> int:
+    if args.output == '-':
+        print('--build-corpus needs -o DIR', file=sys.stderr)
+        return 2
+    start = time.perf_counter()
+    with open_input(args.build_corpus) as infile:
+        manifest = build_corpus(infile, args.output, args.chunk_size)
+    print(f"wrote {manifest['rows']} rows ({manifest['errors']} errors) to {args.output} "
+          f"in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    return 0
+
+def run_replay(args: argparse.Namespace) -> int:
+    with open_input(args.replay) as infile:
+        report = replay_sessions(infile)
+    print(json.dumps(report, indent=2))
+    return 0 if report['mismatches'] == 0 else 1
+
+def run_audit(args: argparse.Namespace) -> int:
+    if args.output == '-' or not args.watermark:
+        print('--audit needs -o REPORT and --watermark PATH', file=sys.stderr)
+        return 2
+    start = time.perf_counter()
+    try:
+        with open_input(args.audit) as infile:
+            summary = audit_export(infile, args.output, args.watermark, args.chunk_size)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    summary['seconds'] = round(time.perf_counter() - start, 3)
+    print(json.dumps(summary, indent=2))
+    return 1 if summary['run']['mismatchedRows'] else 0
+
+def run_ingest(args: argparse.Namespace) -> int:
+    if not args.db:
+        print('--ingest needs --db PATH', file=sys.stderr)
+        return 2
+    try:
+        stats = ingest_store(args.ingest, args.db, args.workers, args.chunk_size)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    print(f"stored {stats['rows']} rows ({stats['errors']} errors) in {args.db}: load {stats['loadSeconds']:.2f}s, "
+          f"indexes {stats['indexSeconds']:.2f}s", file=sys.stderr)
+    return 0
+
+def run_breakdown(args: argparse.Namespace) -> int:
+    if not args.db or not os.path.exists(args.db):
+        print('--breakdown needs --db PATH of an ingested store', file=sys.stderr)
+        return 2
+    conn = sqlite3.connect(args.db)
+    try:
+        rows = archetype_utm_breakdown(conn, args.since)
+    finally:
+        conn.close()
+    write_json(args.output, rows)
+    return 0
+
+def run_aggregate(args: argparse.Namespace) -> int:
+    start = time.perf_counter()
+    stats = aggregate_paths(args.aggregate, args.workers, args.chunk_size)
+    write_json(args.output, stats.to_dict())
+    print(f'aggregated {stats.rows} rows ({stats.errors} errors) in {time.perf_counter() - start:.2f}s',
+          file=sys.stderr)
+    return 0
+
+def run_sensitivity(args: argparse.Namespace) -> int:
+    start = time.perf_counter()
+    with open_output(args.rows) as rows_out:
+        if os.path.isdir(args.sensitivity):
+            with Corpus(args.sensitivity) as corpus:
+                stats = sensitivity_corpus(corpus, rows_out, args.chunk_size)
+        else:
+            with open_input(args.sensitivity) as infile:
+                stats = sensitivity_stream(infile, rows_out, args.chunk_size)
+    write_json(args.output, stats.to_dict())
+    print(f'analyzed {stats.rows} rows ({stats.errors} errors) in {time.perf_counter() - start:.2f}s',
+          file=sys.stderr)
+    return 0
+
+def run_sweep(args: argparse.Namespace) -> int:
+    start = time.perf_counter()
+    grid = {
+        'scenario_bonus': [int(v) for v in args.bonus.split(',')] if args.bonus else None,
+        'epsilon': [float(v) for v in args.epsilon.split(',')] if args.epsilon else None,
+        'balanced_threshold': [float(v) for v in args.balanced.split(',')] if args.balanced else None,
+    }
+    states, errors = sweep_input(args.sweep, args.chunk_size)
+    loaded = time.perf_counter()
+    report = ParameterSweep(states).run(grid)
+    report['errors'] = errors
+    report['seconds'] = {'load': loaded - start, 'sweep': time.perf_counter() - loaded}
+    write_json(args.output, report)
+    return 0
+
+def run_bench(args: argparse.Namespace) -> int:
+    if args.update_baseline and not args.baseline:
+        print('--update-baseline needs --baseline PATH', file=sys.stderr)
+        return 2
+    if args.baseline and not args.update_baseline and not os.path.exists(args.baseline):
+        print(f'baseline {args.baseline} not found; pass --update-baseline to create it', file=sys.stderr)
+        return 2
+    macro_rows = [int(v) for v in args.bench_rows.split(',')] if args.bench_rows else BENCH_MACRO_ROWS
+    report = run_benchmarks(macro_rows)
+    if args.baseline and not args.update_baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        report['regressions'] = compare_bench(baseline, report, args.tolerance)
+    write_json(args.output, report)
+    if args.update_baseline:
+        write_json(args.baseline, report)
+        print(f'wrote baseline {args.baseline}', file=sys.stderr)
+        return 0
+    for r in report.get('regressions', []):
+        print(f"regression: {r['metric']} {r['baseline']} -> {r['current']} ({r['change']:+.1%})", file=sys.stderr)
+    return 1 if report.get('regressions') else 0
+
+def run_serve(args: argparse.Namespace) -> int:
+    asyncio.run(serve(args.serve, args.batch_window / 1000))
+    return 0
+
+def run_spec_check(args: argparse.Namespace) -> int:
+    start = time.perf_counter()
+    spec, cached = load_spec(args.spec_root, args.spec_cache or None)
+    plan = plan_from_spec(spec)
+    drift = spec_drift(spec)
+    if plan.columns != PLAN.columns or plan.score_table != PLAN.score_table or plan.contributions != PLAN.contributions:
+        drift.append('compiled scoring plan differs from the built-in PLAN')
+    print(json.dumps({'hash': spec['hash'], 'cached': cached, 'seconds': round(time.perf_counter() - start, 6),
+                      'questions': len(spec['questions']), 'drift': drift}, indent=2))
+    return 1 if drift else 0
+
+def run_exhaustive(args: argparse.Namespace) -> int:
+    values = tuple(int(v) for v in args.answer_values.split(','))
+    with open_output(args.classes) as sink:
+        report = verify_archetype_space(values, args.workers, sink)
+    print(json.dumps(report, indent=2))
+    return 0 if report['passed'] else 1
+
+def run_fuzz_command(args: argparse.Namespace) -> int:
+    with open_output(args.output) as out:
+        if args.fuzz_inputs:
+            write_fuzz_inputs(out, args.fuzz, args.seed)
+            return 0
+        stats = run_fuzz(args.fuzz, args.seed, out, args.workers)
+    print(json.dumps(stats, indent=2), file=sys.stderr)
+    return 1 if stats['divergences'] else 0
+
+def run_golden(args: argparse.Namespace) -> int:
+    oracle = TsOracle(args.oracle) if args.oracle else None
+    try:
+        with open_output(args.output) as out, open_input(args.golden) as infile:
+            stats = check_golden(infile, out, oracle)
+    finally:
+        if oracle is not None:
+            oracle.close()
+    print(json.dumps(stats, indent=2), file=sys.stderr)
+    return 1 if stats['divergences'] else 0
+
+def run_write_fixtures(args: argparse.Namespace) -> int:
+    cases = generate_fixtures(args.fixture_count)
+    write_fixtures(args.write_fixtures, cases)
+    print(f'fixtures: {len(cases)} cases -> {args.write_fixtures}', file=sys.stderr)
+    return 0
+
+def run_tests_command(args: argparse.Namespace) -> int:
+    fmt = 'ndjson' if args.ndjson else 'json' if args.json else 'text'
+    failed = report_tests(fmt, args.keywords, args.fail_fast, args.workers, args.fixtures, args.failures_only,
+                          args.report)
+    return 0 if failed == 0 else 1
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Validate and rescore quiz scoring.')
+    # One mode per run; with none of them, run the validation suite
+    modes = parser.add_mutually_exclusive_group()
+    report_format = parser.add_mutually_exclusive_group()
+    report_format.add_argument('--json', action='store_true', help='write the test report as one JSON document')
+    report_format.add_argument('--ndjson', action='store_true', help='write the test report as one JSON object per line')
+    parser.add_argument('--failures-only', action='store_true',
+                        help='leave passing tests out of the report (summary counts still cover them)')
+    parser.add_argument('--report', default='-', metavar='PATH',
+                        help="test report path ('-' for stdout), written as suites finish")
+    modes.add_argument('--rescore', metavar='EXPORT',
+                        help="rescore a quiz_results JSONL export ('-' for stdin) or corpus directory to NDJSON")
+    modes.add_argument('--build-corpus', metavar='EXPORT',
+                        help='convert a quiz_results JSONL export into a columnar corpus directory at -o')
+    parser.add_argument('-o', '--output', default='-', metavar='PATH', help="output path ('-' for stdout)")
+    parser.add_argument('--chunk-size', type=int, default=RESCORE_CHUNK_SIZE, metavar='N',
+                        help='rows per pipeline chunk')
+    parser.add_argument('--workers', type=int, default=1, metavar='N',
+                        help='rescore shards (or run test suites) on N worker processes')
+    parser.add_argument('-k', dest='keywords', action='append', metavar='SUBSTRING',
+                        help='run only suites/fixture cases whose name contains SUBSTRING (repeatable)')
+    parser.add_argument('-x', '--fail-fast', action='store_true', help='stop starting suites after the first failure')
+    parser.add_argument('--fixtures', default=FIXTURES_PATH, metavar='PATH',
+                        help="JSON fixture table checked with the suites ('' to skip)")
+    modes.add_argument('--write-fixtures', nargs='?', const=FIXTURES_PATH, metavar='PATH',
+                        help='regenerate the shared fixture table from the reference scorer')
+    parser.add_argument('--fixture-count', type=int, default=FIXTURE_COUNT, metavar='N',
+                        help='with --write-fixtures, seeded random cases after the edge cases')
+    parser.add_argument('--sort-by-id', action='store_true',
+                        help='with --workers, order output by id instead of input order')
+    modes.add_argument('--sweep', metavar='INPUT',
+                        help='report archetype/primary shifts over a grid of scoring constants')
+    parser.add_argument('--bonus', metavar='LIST', help='with --sweep, SCENARIO_BONUS values (e.g. 15,20,25)')
+    parser.add_argument('--epsilon', metavar='LIST', help='with --sweep, EPSILON values')
+    parser.add_argument('--balanced', metavar='LIST', help='with --sweep, BALANCED_THRESHOLD values')
+    modes.add_argument('--audit', metavar='EXPORT',
+                        help='diff stored scores/archetype_slug against rescored answers, mismatches to -o')
+    parser.add_argument('--watermark', metavar='PATH',
+                        help='with --audit, checkpoint of the last audited (created_at, id); resumes from it')
+    modes.add_argument('--ingest', metavar='INPUT',
+                        help='rescore an export or corpus directory into the SQLite store at --db')
+    modes.add_argument('--breakdown', action='store_true',
+                        help='print archetype x utm_source/utm_campaign row counts from the store at --db')
+    parser.add_argument('--db', metavar='PATH', help='SQLite store for --ingest/--breakdown')
+    parser.add_argument('--since', metavar='CREATED_AT', help='with --breakdown, only rows created at or after this')
+    modes.add_argument('--aggregate', nargs='+', metavar='INPUT',
+                        help='one-pass population statistics over exports and/or corpus directories')
+    modes.add_argument('--sensitivity', metavar='INPUT',
+                        help='count single-answer changes that flip each row (export or corpus directory)')
+    parser.add_argument('--rows', metavar='PATH', help='with --sensitivity, write per-row results as NDJSON')
+    modes.add_argument('--replay', metavar='EXPORT',
+                        help='replay each row of an export answer by answer through the incremental scorer')
+    modes.add_argument('--bench', action='store_true',
+                        help='run micro/macro benchmarks and peak-memory measurements')
+    parser.add_argument('--bench-rows', metavar='LIST',
+                        help='with --bench, synthetic corpus sizes for macro runs (default 10000,1000000)')
+    parser.add_argument('--baseline', metavar='PATH',
+                        help='with --bench, compare against this JSON baseline (fails if missing)')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='with --bench, write the results to --baseline instead of comparing')
+    parser.add_argument('--tolerance', type=float, default=BENCH_TOLERANCE, metavar='FRACTION',
+                        help='with --baseline, relative slack before a metric counts as a regression')
+    modes.add_argument('--serve', metavar='ADDRESS',
+                        help="score DBAnswerMap NDJSON requests on a Unix socket path or 'host:port'")
+    parser.add_argument('--batch-window', type=float, default=SERVE_BATCH_WINDOW * 1000, metavar='MS',
+                        help='with --serve, how long to gather requests into one scoring batch')
+    modes.add_argument('--spec-check', action='store_true',
+                        help='compile the spec from questions.ts/matrix.ts and report drift from these constants')
+    parser.add_argument('--spec-root', default=APP_ROOT, metavar='DIR', help='app root holding src/lib/quiz')
+    parser.add_argument('--spec-cache', default=SPEC_CACHE_DIR, metavar='DIR',
+                        help="compiled spec cache, keyed by source hash ('' to disable)")
+    parser.add_argument('--profile', metavar='STACKS',
+                        help="time each pipeline stage; summary to stderr, collapsed stacks to STACKS ('-' for stdout)")
+    modes.add_argument('--exhaustive', action='store_true',
+                        help='verify archetype selection over every full-answer score class')
+    parser.add_argument('--answer-values', default=','.join(map(str, ANSWER_VALUES)), metavar='LIST',
+                        help='Likert values to enumerate in --exhaustive (e.g. 1,3,5 for a quick run)')
+    parser.add_argument('--classes', metavar='PATH',
+                        help='with --exhaustive, write raw answer vectors per score class as NDJSON')
+    modes.add_argument('--fuzz', type=int, metavar='N',
+                        help='diff N seeded answer maps between batch scoring and the scalar port, shrunk divergences to -o')
+    parser.add_argument('--seed', type=int, default=0, metavar='N', help='with --fuzz, generator seed')
+    parser.add_argument('--fuzz-inputs', action='store_true',
+                        help='with --fuzz, write the rows to -o as input for scripts/export-golden-corpus.ts instead')
+    modes.add_argument('--golden', metavar='CORPUS',
+                        help='diff batch scoring against a golden corpus exported from the TS scorer')
+    parser.add_argument('--oracle', metavar='COMMAND',
+                        help="with --golden, shrink through the TS exporter (e.g. 'npx tsx scripts/export-golden-corpus.ts')")
+    return parser.parse_args(argv)
+
+# Mode flag (argparse dest) -> handler; parse_args makes the modes mutually exclusive
+COMMANDS = [
+    ('rescore', run_rescore), ('build_corpus', run_build_corpus), ('replay', run_replay), ('audit', run_audit),
+    ('ingest', run_ingest), ('breakdown', run_breakdown), ('aggregate', run_aggregate),
+    ('sensitivity', run_sensitivity), ('sweep', run_sweep), ('bench', run_bench), ('serve', run_serve),
+    ('spec_check', run_spec_check), ('exhaustive', run_exhaustive), ('fuzz', run_fuzz_command),
+    ('golden', run_golden), ('write_fixtures', run_write_fixtures),
+]
+
+def run_command(args: argparse.Namespace) -> int:
+    for dest, handler in COMMANDS:
+        if getattr(args, dest):
+            return handler(args)
+    return run_tests_command(args)
+
+def write_profile(path: str) -> None:
+    """Per-stage summary to stderr, collapsed stacks to path."""
+    summary = PROFILER.summary()
+    print(f"profile: {summary['seconds']:.3f}s total", file=sys.stderr)
+    print(f"  {'stage':<28} {'calls':>8} {'seconds':>10} {'self':>10} {'%':>6} {'netBlocks':>10}", file=sys.stderr)
+    for stage in summary['stages']:
+        print(f"  {stage['stage']:<28} {stage['calls']:>8} {stage['seconds']:>10.3f} {stage['selfSeconds']:>10.3f} "
+              f"{stage['percent']:>6.1f} {stage['netBlocks']:>10}", file=sys.stderr)
+    with open_output(path) as out:
+        out.write(''.join(line + '\n' for line in PROFILER.collapsed()))
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+
+    if args.profile:
+        if args.workers > 1:
+            print('--profile only sees this process; run it with --workers 1', file=sys.stderr)
+            sys.exit(2)
+        PROFILER.enable()
+    code = run_command(args)
+    if args.profile:
+        PROFILER.disable()
+        write_profile(args.profile)
+    sys.exit(code)
 
 if __name__ == '__main__':
     main()
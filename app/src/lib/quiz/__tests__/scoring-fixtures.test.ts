@@ -0,0 +1,22 @@
+import { describe, it, expect } from 'vitest';
+import { scoreQuizFromAnswers } from '../server/score-quiz';
+import { sanitizeScoresForDb } from '../utils/answer-transform';
+import type { DBAnswerMap } from '../types';
+import cases from './fixtures/scoring-cases.json';
+
+// Shared with scripts/validate_quiz_scoring.py, which checks the same table
+// against its port; regenerate with `python3 scripts/validate_quiz_scoring.py --write-fixtures`.
+
+interface ScoringCase {
+  name: string;
+  answers: DBAnswerMap;
+  expected: { scores: unknown; archetype: string };
+}
+
+describe('shared scoring fixtures', () => {
+  it.each((cases as unknown as ScoringCase[]).map((c) => [c.name, c] as const))('%s', (_name, c) => {
+    const scored = scoreQuizFromAnswers(c.answers);
+    expect(sanitizeScoresForDb(scored.results)).toEqual(c.expected.scores);
+    expect(scored.archetypeSlug).toBe(c.expected.archetype);
+  });
+});